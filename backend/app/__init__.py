@@ -6,7 +6,7 @@ Educational platform for children ages 5-10 using 3D shape-based math visualizat
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
-import os
+import threading
 
 def create_app(config_name='development'):
     """
@@ -18,23 +18,77 @@ def create_app(config_name='development'):
     # Create Flask app
     app = Flask(__name__)
     
-    # Configure CORS for frontend communication
-    CORS(app, origins=[
-        'http://localhost:5173',  # Vite dev server
-        'http://localhost:3000',  # Alternative dev port
-        os.getenv('FRONTEND_URL', 'http://localhost:5173')
-    ])
-    
     # Configuration
-    app.config['DEBUG'] = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    from .config import config
+    app.config.from_object(config.get(config_name, config['development'])())
+    
+    # Configure CORS for frontend communication
+    CORS(app, origins=app.config['CORS_ORIGINS'])
     
     # Register blueprints (routes)
-    from .routes.api import api_bp
+    from .routes.api import api_bp, get_math_engine, shape_response_cache, warm_up_payloads
     from .routes.health import health_bp
+    from .routes.lessons import lessons_bp
+    from .routes.progress import progress_bp
+    from .routes.worksheets import worksheets_bp
+    from .services.adaptive_practice import AdaptiveSelector
+    from .services.learner_progress import LearnerProgressRegistry
+    from .services.lesson_sessions import init_lesson_sessions
+    from .services.progress_store import init_progress_store
+    from .services.worksheet_jobs import init_worksheet_jobs
     
     app.register_blueprint(health_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(progress_bp, url_prefix='/api/progress')
+    app.register_blueprint(worksheets_bp, url_prefix='/api/worksheets')
+    app.register_blueprint(lessons_bp, url_prefix='/api/lessons')
+    
+    # Stored answers, plus running progress statistics per learner: built from the store,
+    # then updated from this process's answers as they arrive and other processes' as stored
+    progress_store = init_progress_store(app)
+    app.extensions['learner_progress'] = LearnerProgressRegistry(
+        loader=progress_store.fetch_new_answers,
+        update_loader=progress_store.fetch_others_answers,
+        max_learners=app.config['PROGRESS_MAX_LEARNERS']
+    )
+    # Per-fact mastery for adaptive practice, rebuilt from the same stored answers
+    app.extensions['adaptive_selector'] = AdaptiveSelector(
+        loader=progress_store.fetch_new_answers,
+        max_learners=app.config['ADAPTIVE_MAX_LEARNERS']
+    )
+    # Worksheet exports, built in a process pool and stored under WORKSHEET_DIR
+    worksheet_jobs = init_worksheet_jobs(app)
+    # Guided lesson state and events, kept in the progress database so any process can serve them
+    init_lesson_sessions(app, progress_store.path)
+    # Lesson streams served by Flask hold a thread each, so only so many may be open at once
+    app.extensions['lesson_stream_slots'] = threading.BoundedSemaphore(app.config['LESSON_MAX_STREAMS'])
+    
+    # Per-endpoint latency, size and cache metrics, served at /metrics; set up
+    # before compression so recorded sizes are the bytes actually sent
+    if app.config['METRICS_ENABLED']:
+        from .utils.metrics import init_metrics
+        metrics = init_metrics(app)
+        metrics.add_cache_collector(lambda: get_math_engine().cache_info())
+        metrics.add_cache_collector(lambda: {"shape_payloads": shape_response_cache.cache_info()})
+        metrics.add_gauge_collector(worksheet_jobs.gauges)
+    
+    # Per-client token buckets and a cap on requests in flight (429/503 when exceeded)
+    from .utils.rate_limit import init_rate_limiting
+    init_rate_limiting(app)
+    
+    # Opt-in cProfile sampling and slow-request stack sampling
+    from .utils.profiling import init_profiling
+    init_profiling(app)
+    
+    # Negotiate gzip/brotli for JSON responses
+    from .utils.compression import init_compression
+    init_compression(app)
+    
+    # Build the engine, its transformation table and the static payloads up front
+    if app.config['ENGINE_WARM_UP']:
+        get_math_engine().warm_up()
+        with app.app_context():
+            warm_up_payloads()
     
     # Global error handlers
     @app.errorhandler(404)
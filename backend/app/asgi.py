@@ -0,0 +1,299 @@
+"""
+ASGI application for ShapeLearn
+Serves lesson event streams natively on asyncio, so open streams don't each
+hold a thread, and hands every other route to the Flask app, run on a bounded
+pool of threads with all its request hooks
+"""
+
+import asyncio
+import json
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+from .routes.lessons import LessonStream, open_lesson_stream
+from .utils.wire_format import JSON_MIMETYPE
+
+HandlerResult = Tuple[Union[Dict[str, Any], 'EventStream'], int]
+Handler = Callable[..., Awaitable[HandlerResult]]
+
+
+class EventStream:
+    """Handler payload for a text/event-stream response, sent chunk by chunk"""
+
+    def __init__(self, chunks: AsyncIterator[str]):
+        self.chunks = chunks
+
+
+def _closing(wsgi_application):
+    """
+    Wrap a WSGI app so its response is closed once sent, which asgiref's adapter
+    doesn't do; Flask's call_on_close callbacks (e.g. freeing a concurrency slot) rely on it
+    """
+    def application(environ, start_response):
+        response = wsgi_application(environ, start_response)
+        try:
+            # Not yield from, which would also close the response when this generator is closed
+            for chunk in response:
+                yield chunk
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+    return application
+
+
+class ShapeLearnASGI:
+    """
+    ASGI entry point sharing state (progress store, lesson sessions) with a Flask app
+    Native handlers run blocking storage calls in a bounded thread pool without holding the event loop
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(_closing(flask_app))
+        # Flask routes run as many at once as a gthread worker's threads
+        self.wsgi_threads = flask_app.config.get('ASGI_WSGI_THREADS', 16)
+        self._wsgi_slots: Optional[asyncio.Semaphore] = None
+        self.cors_origins = set(flask_app.config.get('CORS_ORIGINS', []))
+        self.store = flask_app.extensions['progress_store']
+        self.lessons = flask_app.extensions['lesson_sessions']
+        # Set (and replaced) whenever this process changes a lesson; see _watch_lessons
+        self._lessons_changed: Optional[asyncio.Event] = None
+        self.metrics = flask_app.extensions.get('metrics')
+        self.admission = flask_app.extensions.get('admission')
+        self.key_header = flask_app.config.get('RATE_LIMIT_KEY_HEADER', '').lower().encode('latin-1')
+        self.executor = ThreadPoolExecutor(
+            max_workers=flask_app.config.get('ASGI_IO_WORKERS', 16),
+            thread_name_prefix='shapelearn-io'
+        )
+        # (method, path pattern, Flask rule used as the metrics endpoint label, handler)
+        self.routes: List[Tuple[str, re.Pattern, str, Handler]] = [
+            # Served natively so open streams don't tie up the Flask fallback's threads
+            ('GET', re.compile(r'^/api/lessons/(?P<session_id>[^/]+)/events$'),
+             '/api/lessons/<session_id>/events', self.stream_lesson_events),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http':
+            for method, pattern, endpoint, handler in self.routes:
+                if scope['method'] != method:
+                    continue
+                match = pattern.match(scope['path'])
+                if match:
+                    started = time.perf_counter()
+                    status, size = await self._admit_and_dispatch(
+                        endpoint, handler, match.groupdict(), scope, receive, send
+                    )
+                    if self.metrics is not None:
+                        self.metrics.observe_request(
+                            endpoint, method, status, time.perf_counter() - started, size
+                        )
+                    return
+
+        # Everything else (including CORS preflight) goes through Flask
+        await self._run_wsgi(scope, receive, send)
+
+    async def _run_wsgi(self, scope, receive, send):
+        """Serve a request with the Flask app on a thread of its own, at most wsgi_threads at once"""
+        if self._wsgi_slots is None:
+            self._wsgi_slots = asyncio.Semaphore(self.wsgi_threads)
+        async with self._wsgi_slots:
+            # asgiref otherwise runs every WSGI request on one shared thread
+            async with ThreadSensitiveContext():
+                await self.wsgi_app(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.run_io(self.store.flush)
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def run_io(self, func, *args, **kwargs):
+        """Run a blocking call in the I/O thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    def _client_key(self, scope) -> str:
+        """Same client key as the Flask hooks: RATE_LIMIT_KEY_HEADER, else the peer address"""
+        if self.key_header:
+            value = _header(scope, self.key_header)
+            if value:
+                return value.split(',')[0].strip()
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+
+    async def _admit_and_dispatch(self, endpoint: str, handler: Handler, params: Dict[str, str],
+                                  scope, receive, send) -> Tuple[int, int]:
+        """Apply the app's rate limit, then dispatch"""
+        if self.admission is not None:
+            # Native handlers don't hold a server thread, so they take no concurrency slot
+            rejection = self.admission.admit(self._client_key(scope), endpoint, take_slot=False)
+            if rejection is not None:
+                status, error, retry_after = rejection
+                retry_header = (b'retry-after', str(max(1, math.ceil(retry_after))).encode('latin-1'))
+                return await self._send_payload(
+                    scope, send, {"success": False, "error": error}, status, [retry_header]
+                )
+
+        return await self._dispatch(handler, params, scope, receive, send)
+
+    async def _dispatch(self, handler: Handler, params: Dict[str, str],
+                        scope, receive, send) -> Tuple[int, int]:
+        """Run a native handler and send its response; returns (status, body size)"""
+        try:
+            payload, status = await handler(scope, receive, **params)
+        except Exception as e:
+            payload, status = {"success": False, "error": str(e)}, 500
+        if isinstance(payload, EventStream):
+            return await self._send_stream(scope, receive, send, payload)
+        return await self._send_payload(scope, send, payload, status)
+
+    async def _send_stream(self, scope, receive, send, stream: EventStream) -> Tuple[int, Optional[int]]:
+        """Send an event stream until it ends or the client disconnects; body size is not recorded"""
+        headers = [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]
+        origin = _header(scope, b'origin')
+        if origin and origin in self.cors_origins:
+            headers.append((b'access-control-allow-origin', origin.encode('latin-1')))
+            headers.append((b'vary', b'Origin'))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+
+        async def send_chunks():
+            async for chunk in stream.chunks:
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        sender = asyncio.ensure_future(send_chunks())
+        watcher = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await asyncio.wait((sender, watcher), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sender, watcher):
+                task.cancel()
+        if sender.done() and not sender.cancelled() and sender.exception() is None:
+            await send({'type': 'http.response.body', 'body': b''})
+        return 200, None
+
+    async def _send_payload(self, scope, send, payload: Dict[str, Any], status: int,
+                            extra_headers: Optional[List[Tuple[bytes, bytes]]] = None) -> Tuple[int, int]:
+        """Send a JSON response; returns (status, body size)"""
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8') + b'\n'
+        headers = [
+            (b'content-type', JSON_MIMETYPE.encode('latin-1')),
+            (b'content-length', str(len(body)).encode('latin-1')),
+            *(extra_headers or []),
+        ]
+        origin = _header(scope, b'origin')
+        if origin and origin in self.cors_origins:
+            headers.append((b'access-control-allow-origin', origin.encode('latin-1')))
+            headers.append((b'vary', b'Origin'))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+        return status, len(body)
+
+    # Native handlers
+
+    async def stream_lesson_events(self, scope, receive, session_id: str) -> HandlerResult:
+        """
+        GET /api/lessons/<session_id>/events, sending the same events as the Flask view
+        Waits for lesson changes on the event loop rather than on a thread
+        """
+        session = await self.run_io(self.lessons.get, session_id)
+        if session is None:
+            return {"success": False, "error": "Lesson not found"}, 404
+
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        stream = await self.run_io(
+            open_lesson_stream, self.lessons, session, _header(scope, b'last-event-id'),
+            _query_value(query, 'pace', str), self.flask_app.config
+        )
+        self._watch_lessons()
+        return EventStream(self._lesson_events(stream)), 200
+
+    def _watch_lessons(self) -> None:
+        """Wake lesson streams on this event loop whenever this process changes a lesson"""
+        if self._lessons_changed is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._lessons_changed = asyncio.Event()
+
+        def wake():
+            changed, self._lessons_changed = self._lessons_changed, asyncio.Event()
+            changed.set()
+
+        def listener():
+            try:
+                loop.call_soon_threadsafe(wake)
+            except RuntimeError:
+                # The loop has shut down
+                pass
+
+        self.lessons.add_listener(listener)
+
+    async def _lesson_events(self, stream: LessonStream) -> AsyncIterator[str]:
+        """Yield a lesson's events until it is over, waiting without holding a thread"""
+        session_id = stream.session["id"]
+
+        yield stream.opening
+        while True:
+            changed = self._lessons_changed
+            events = await self.run_io(self.lessons.events, session_id, stream.after)
+            for delay, chunk in stream.chunks(events):
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk
+            if stream.heartbeat_due():
+                yield stream.heartbeat(await self.run_io(self.lessons.get, session_id) is not None)
+            if stream.finished:
+                return
+
+            try:
+                await asyncio.wait_for(changed.wait(), stream.wait_timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _query_value(query: Dict[str, List[str]], name: str, cast):
+    """First value of a query parameter converted with cast; invalid values count as missing"""
+    values = query.get(name)
+    if not values:
+        return None
+    try:
+        return cast(values[0])
+    except ValueError:
+        return None
+
+
+def create_asgi_app(flask_app) -> ShapeLearnASGI:
+    """Wrap a Flask app from create_app in the ShapeLearn ASGI application"""
+    return ShapeLearnASGI(flask_app)
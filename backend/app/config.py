@@ -0,0 +1,140 @@
+"""
+ShapeLearn Backend - Configuration
+Settings per environment; each can be overridden by the environment variable of the same name
+"""
+
+import os
+
+
+def env_bool(name, default):
+    return os.getenv(name, str(default)).lower() == 'true'
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+class Config:
+    """
+    Settings shared by every environment
+    Read when the app is created, so .env files and test overrides apply
+    """
+
+    # Server processes when WEB_CONCURRENCY isn't set
+    default_server_workers = 1
+
+    def __init__(self):
+        self.DEBUG = env_bool('FLASK_DEBUG', False)
+        self.TESTING = False
+        self.SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+        self.CORS_ORIGINS = [
+            'http://localhost:5173',  # Vite dev server
+            'http://localhost:3000',  # Alternative dev port
+            os.getenv('FRONTEND_URL', 'http://localhost:5173')
+        ]
+
+        # How the app is served: processes, and request threads in each; gunicorn.conf.py
+        # starts gunicorn with these, and the per-process pools and caps below follow them
+        self.SERVER_WORKERS = env_int('WEB_CONCURRENCY', self.default_server_workers)
+        self.SERVER_THREADS = env_int('GUNICORN_THREADS', 4)
+
+        # Engine and static payloads
+        self.ENGINE_WARM_UP = env_bool('ENGINE_WARM_UP', True)
+        self.STATIC_PAYLOAD_MAX_AGE = env_int('STATIC_PAYLOAD_MAX_AGE', 3600)
+        self.COMPRESSION_MIN_SIZE = env_int('COMPRESSION_MIN_SIZE', 1024)
+        self.COMPRESSION_LEVEL = env_int('COMPRESSION_LEVEL', 6)
+
+        # Request size caps
+        self.OPERATION_BATCH_MAX_SIZE = env_int('OPERATION_BATCH_MAX_SIZE', 100)
+        self.PRACTICE_MAX_COUNT = env_int('PRACTICE_MAX_COUNT', 100)
+        self.PRACTICE_STREAM_MAX_COUNT = env_int('PRACTICE_STREAM_MAX_COUNT', 10000)
+        self.PRACTICE_STREAM_CHUNK_SIZE = env_int('PRACTICE_STREAM_CHUNK_SIZE', 256)
+
+        # Learner progress; the database defaults to the instance folder
+        self.PROGRESS_DB_PATH = os.getenv('PROGRESS_DB_PATH')
+        self.PROGRESS_WRITE_BATCH_SIZE = env_int('PROGRESS_WRITE_BATCH_SIZE', 100)
+        self.PROGRESS_FLUSH_INTERVAL = env_float('PROGRESS_FLUSH_INTERVAL', 1.0)
+        self.PROGRESS_MAX_LEARNERS = env_int('PROGRESS_MAX_LEARNERS', 10000)
+        self.ADAPTIVE_MAX_LEARNERS = env_int('ADAPTIVE_MAX_LEARNERS', 1000)
+
+        # ASGI entry point; Flask routes get as many threads as a gunicorn worker
+        self.ASGI_IO_WORKERS = env_int('ASGI_IO_WORKERS', 16)
+        self.ASGI_WSGI_THREADS = env_int('ASGI_WSGI_THREADS', self.SERVER_THREADS)
+
+        # Metrics and profiling; profiles default to the instance folder
+        self.METRICS_ENABLED = env_bool('METRICS_ENABLED', True)
+        self.PROFILE_SAMPLE_RATE = env_float('PROFILE_SAMPLE_RATE', 0.0)
+        self.PROFILE_SLOW_MS = env_float('PROFILE_SLOW_MS', 0)
+        self.PROFILE_SAMPLE_INTERVAL_MS = env_float('PROFILE_SAMPLE_INTERVAL_MS', 10)
+        self.PROFILE_DIR = os.getenv('PROFILE_DIR')
+        self.PROFILE_MAX_FILES = env_int('PROFILE_MAX_FILES', 50)
+        self.PROFILE_ENDPOINTS = os.getenv('PROFILE_ENDPOINTS', '/api/operation,/api/practice')
+
+        # Admission control
+        self.RATE_LIMIT_ENABLED = env_bool('RATE_LIMIT_ENABLED', True)
+        self.RATE_LIMIT_RATE = env_float('RATE_LIMIT_RATE', 20)
+        self.RATE_LIMIT_BURST = env_float('RATE_LIMIT_BURST', 40)
+        self.RATE_LIMITS = os.getenv(
+            'RATE_LIMITS', '/api/practice=5:10,/api/operations/batch=5:10,/api/worksheets=1:5'
+        )
+        self.RATE_LIMIT_MAX_KEYS = env_int('RATE_LIMIT_MAX_KEYS', 10000)
+        self.RATE_LIMIT_KEY_HEADER = os.getenv('RATE_LIMIT_KEY_HEADER', '')
+        # One fewer than the threads, so a free thread can turn requests away while the rest are busy
+        self.MAX_CONCURRENT_REQUESTS = env_int(
+            'MAX_CONCURRENT_REQUESTS', max(1, self.SERVER_THREADS - 1)
+        )
+
+        # Worksheet exports; files default to the instance folder
+        self.WORKSHEET_DIR = os.getenv('WORKSHEET_DIR')
+        # Every server process starts its own pool, so the CPUs are split between them
+        self.WORKSHEET_WORKERS = env_int(
+            'WORKSHEET_WORKERS', max(1, (os.cpu_count() or 1) // self.SERVER_WORKERS)
+        )
+        self.WORKSHEET_MAX_PENDING = env_int('WORKSHEET_MAX_PENDING', 100)
+        self.WORKSHEET_MAX_JOBS = env_int('WORKSHEET_MAX_JOBS', 200)
+        self.WORKSHEET_MAX_AGE = env_float('WORKSHEET_MAX_AGE', 86400)
+        self.WORKSHEET_MAX_PROBLEMS = env_int('WORKSHEET_MAX_PROBLEMS', 500)
+
+        # Guided lessons
+        self.LESSON_MAX_PROBLEMS = env_int('LESSON_MAX_PROBLEMS', 50)
+        self.LESSON_SESSION_TTL = env_float('LESSON_SESSION_TTL', 3600)
+        self.LESSON_HEARTBEAT_INTERVAL = env_float('LESSON_HEARTBEAT_INTERVAL', 15)
+        self.LESSON_POLL_INTERVAL = env_float('LESSON_POLL_INTERVAL', 0.5)
+        # Flask-served streams each hold a server thread; by default use at most half of them
+        self.LESSON_MAX_STREAMS = env_int('LESSON_MAX_STREAMS', max(1, self.SERVER_THREADS // 2))
+
+
+class DevelopmentConfig(Config):
+    """Local development with the Flask server"""
+
+
+class ProductionConfig(Config):
+    """Serving with gunicorn or an ASGI server; debug is always off"""
+
+    default_server_workers = min((os.cpu_count() or 1) * 2 + 1, 8)
+
+    def __init__(self):
+        super().__init__()
+        self.DEBUG = False
+
+
+class TestingConfig(Config):
+    """Test runs: no rate limits, concurrency cap or engine warm-up unless set"""
+
+    def __init__(self):
+        super().__init__()
+        self.TESTING = True
+        self.ENGINE_WARM_UP = env_bool('ENGINE_WARM_UP', False)
+        self.RATE_LIMIT_ENABLED = env_bool('RATE_LIMIT_ENABLED', False)
+        self.MAX_CONCURRENT_REQUESTS = env_int('MAX_CONCURRENT_REQUESTS', 0)
+
+
+config = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
@@ -0,0 +1,239 @@
+"""
+Class Analytics - Progress statistics for many learners in one columnar pass
+Answers for a whole class are held as parallel columns and reduced with
+bincount, instead of analyzing each learner's answer list separately
+"""
+
+from __future__ import annotations
+
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Sequence
+
+from .mastery import FACT_SIZE
+from .operations import practice_operations
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+FACT_COUNT = FACT_SIZE * FACT_SIZE
+
+# A fact needs this many attempts before it can be reported as weak
+WEAK_FACT_MIN_ATTEMPTS = 2
+WEAK_FACTS_PER_LEARNER = 3
+
+
+def columns_from_answers(answers_by_learner: Dict[str, List[Dict[str, Any]]]) -> Dict[str, list]:
+    """Flatten {learner_id: [answer, ...]} into the column layout used by analyze_class"""
+    columns: Dict[str, list] = {
+        "learner_id": [], "operation": [], "operand1": [], "operand2": [],
+        "correct": [], "response_time": []
+    }
+    for learner_id, answers in answers_by_learner.items():
+        for answer in answers:
+            columns["learner_id"].append(learner_id)
+            columns["operation"].append(answer.get("operation"))
+            columns["operand1"].append(answer.get("operand1"))
+            columns["operand2"].append(answer.get("operand2"))
+            columns["correct"].append(bool(answer.get("correct", False)))
+            columns["response_time"].append(answer.get("response_time"))
+    return columns
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise numerator / denominator, 0 where the denominator is 0"""
+    return np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator > 0)
+
+
+def _operand_column(values: Sequence[Optional[int]]) -> np.ndarray:
+    """Operands as ints, with missing or out-of-grid values as -1"""
+    try:
+        column = np.array(values, dtype=np.int64)
+    except (TypeError, ValueError, OverflowError):
+        column = np.array([
+            value if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < FACT_SIZE else -1
+            for value in values
+        ], dtype=np.int64)
+    column[(column < 0) | (column >= FACT_SIZE)] = -1
+    return column
+
+
+def _time_column(values: Sequence[Optional[float]]) -> np.ndarray:
+    """Response times as floats, with missing, zero or non-numeric values as NaN"""
+    return np.array([
+        value if isinstance(value, (int, float)) and not isinstance(value, bool) and value else np.nan
+        for value in values
+    ], dtype=np.float64)
+
+
+def _codes(values: Sequence[Any], index: Dict[Any, int]) -> np.ndarray:
+    """Map values to their index positions, -1 when absent"""
+    return np.fromiter(map(index.get, values, repeat(-1)), dtype=np.int64, count=len(values))
+
+
+def analyze_class(learner_ids: Sequence[str], columns: Dict[str, list]) -> Dict[str, Any]:
+    """
+    Per-learner statistics, class aggregates and weak-fact heatmaps
+    columns holds parallel learner_id, operation, operand1, operand2, correct and
+    response_time lists (see columns_from_answers or ProgressStore.fetch_columns);
+    statistics match LearningProgressAggregator (zero or missing times are ignored)
+    """
+    learner_count = len(learner_ids)
+    operations = practice_operations()
+    position = {learner_id: index for index, learner_id in enumerate(learner_ids)}
+    learner = _codes(columns["learner_id"], position)
+    operation = _codes(columns["operation"], {name: index for index, name in enumerate(operations)})
+    correct = np.fromiter(columns["correct"], dtype=bool, count=len(columns["correct"])).astype(np.float64)
+    response_time = _time_column(columns["response_time"])
+    operand1 = _operand_column(columns["operand1"])
+    operand2 = _operand_column(columns["operand2"])
+
+    # Answers for learners that weren't asked for are dropped
+    keep = learner >= 0
+    learner, operation, correct = learner[keep], operation[keep], correct[keep]
+    response_time, operand1, operand2 = response_time[keep], operand1[keep], operand2[keep]
+
+    # Per learner totals and accuracy
+    totals = np.bincount(learner, minlength=learner_count)
+    corrects = np.bincount(learner, weights=correct, minlength=learner_count)
+
+    # Per learner and operation
+    operation_count = len(operations)
+    known = operation >= 0
+    cell = learner[known] * operation_count + operation[known]
+    size = learner_count * operation_count
+    operation_totals = np.bincount(cell, minlength=size).reshape(learner_count, operation_count)
+    operation_corrects = np.bincount(
+        cell, weights=correct[known], minlength=size
+    ).reshape(learner_count, operation_count)
+
+    # Response times: count, sum and sum of squares per learner
+    timed = ~np.isnan(response_time)
+    timed_counts = np.bincount(learner[timed], minlength=learner_count)
+    time_sums = np.bincount(learner[timed], weights=response_time[timed], minlength=learner_count)
+    time_squares = np.bincount(learner[timed], weights=response_time[timed] ** 2, minlength=learner_count)
+    time_means = _ratio(time_sums, timed_counts)
+    time_stds = np.sqrt(np.maximum(_ratio(time_squares, timed_counts) - time_means ** 2, 0))
+
+    # Fact attempts and corrects per learner, only for the (learner, fact) cells that occur
+    in_grid = known & (operand1 >= 0) & (operand2 >= 0)
+    fact = operation[in_grid] * FACT_COUNT + operand1[in_grid] * FACT_SIZE + operand2[in_grid]
+    fact_cell = learner[in_grid] * (operation_count * FACT_COUNT) + fact
+    cells, cell_index, fact_attempts = np.unique(fact_cell, return_inverse=True, return_counts=True)
+    fact_corrects = np.bincount(cell_index.reshape(-1), weights=correct[in_grid], minlength=len(cells))
+
+    accuracy = _ratio(corrects, totals)
+    operation_accuracy = _ratio(operation_corrects, operation_totals)
+
+    learners = []
+    weak_facts = _weak_facts(operations, learner_count, cells, fact_attempts, fact_corrects)
+    for index, learner_id in enumerate(learner_ids):
+        row = {
+            "learner_id": learner_id,
+            "total_problems": int(totals[index]),
+            "accuracy": float(accuracy[index]),
+            "average_response_time": float(time_means[index]),
+            "response_time_std": float(time_stds[index]),
+            "weak_facts": weak_facts[index]
+        }
+        for op_index, op in enumerate(operations):
+            row[f"{op}_accuracy"] = float(operation_accuracy[index, op_index])
+        learners.append(row)
+
+    return {
+        "learners": learners,
+        "class": _class_aggregates(
+            operations, totals, corrects, operation_totals, operation_corrects,
+            timed_counts, time_sums, time_squares, accuracy
+        ),
+        "heatmaps": _heatmaps(
+            operations,
+            np.bincount(fact, minlength=operation_count * FACT_COUNT),
+            np.bincount(fact, weights=correct[in_grid], minlength=operation_count * FACT_COUNT)
+        )
+    }
+
+
+def _weak_facts(operations: Sequence[str], learner_count: int, cells: np.ndarray,
+                attempts: np.ndarray, corrects: np.ndarray) -> List[List[Dict[str, Any]]]:
+    """
+    Each learner's facts with the highest error rates (ties go to more attempts)
+    cells are sorted learner * facts-per-learner + fact codes with their attempt and correct counts
+    """
+    error_rate = 1 - corrects / attempts
+    candidate = (attempts >= WEAK_FACT_MIN_ATTEMPTS) & (error_rate > 0)
+    cells, attempts, error_rate = cells[candidate], attempts[candidate], error_rate[candidate]
+
+    learner, fact = np.divmod(cells, len(operations) * FACT_COUNT)
+    order = np.lexsort((-attempts, -error_rate, learner))
+    learner, fact, attempts, error_rate = learner[order], fact[order], attempts[order], error_rate[order]
+
+    # Rank within each learner's run of candidates, keeping the first few
+    starts = np.searchsorted(learner, learner, side="left")
+    keep = np.arange(len(learner)) - starts < WEAK_FACTS_PER_LEARNER
+
+    weak: List[List[Dict[str, Any]]] = [[] for _ in range(learner_count)]
+    for index, code, count, rate in zip(learner[keep].tolist(), fact[keep].tolist(),
+                                        attempts[keep].tolist(), error_rate[keep].tolist()):
+        op_index, pair = divmod(code, FACT_COUNT)
+        a, b = divmod(pair, FACT_SIZE)
+        weak[index].append({
+            "operation": operations[op_index],
+            "operand1": a,
+            "operand2": b,
+            "attempts": count,
+            "accuracy": 1 - rate
+        })
+    return weak
+
+
+def _class_aggregates(operations, totals, corrects, operation_totals, operation_corrects,
+                      timed_counts, time_sums, time_squares, accuracy) -> Dict[str, Any]:
+    """Class-wide statistics from the per-learner sums"""
+    total = int(totals.sum())
+    timed = int(timed_counts.sum())
+    time_mean = float(time_sums.sum() / timed) if timed else 0.0
+    time_variance = float(time_squares.sum() / timed - time_mean ** 2) if timed else 0.0
+    active = accuracy[totals > 0]
+
+    aggregates = {
+        "learner_count": len(totals),
+        "active_learners": int((totals > 0).sum()),
+        "total_problems": total,
+        "accuracy": float(corrects.sum() / total) if total else 0.0,
+        "average_response_time": time_mean,
+        "response_time_std": float(np.sqrt(max(time_variance, 0))),
+        "learner_accuracy": {
+            "mean": float(active.mean()) if len(active) else 0.0,
+            "median": float(np.median(active)) if len(active) else 0.0,
+            "min": float(active.min()) if len(active) else 0.0,
+            "max": float(active.max()) if len(active) else 0.0
+        }
+    }
+    operation_total = operation_totals.sum(axis=0)
+    operation_correct = operation_corrects.sum(axis=0)
+    for op_index, op in enumerate(operations):
+        aggregates[f"{op}_accuracy"] = (
+            float(operation_correct[op_index] / operation_total[op_index])
+            if operation_total[op_index] else 0.0
+        )
+    return aggregates
+
+
+def _heatmaps(operations: Sequence[str], attempts: np.ndarray,
+              corrects: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    """
+    Class attempts and accuracy per fact, as [operand1][operand2] grids per operation
+    Accuracy is None for facts nobody attempted
+    """
+    attempts = attempts.reshape(len(operations), FACT_SIZE, FACT_SIZE)
+    corrects = corrects.reshape(attempts.shape)
+    accuracy = np.round(_ratio(corrects, attempts), 4)
+
+    heatmaps = {}
+    for op_index, op in enumerate(operations):
+        grid_attempts = attempts[op_index]
+        heatmaps[op] = {
+            "attempts": grid_attempts.astype(int).tolist(),
+            "accuracy": np.where(grid_attempts > 0, accuracy[op_index], None).tolist()
+        }
+    return heatmaps
@@ -0,0 +1,163 @@
+"""
+Shape Geometry - Server-side tessellation for curved number shapes
+Sweeps a circular cross-section along each shape's centerline with NumPy,
+producing vertex/normal/index buffers the 3D frontend can upload directly
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Centerline samples and tube cross-section segments per level of detail
+LOD_LEVELS = {
+    "low": {"path_segments": 24, "radial_segments": 6},
+    "medium": {"path_segments": 64, "radial_segments": 10},
+    "high": {"path_segments": 160, "radial_segments": 16}
+}
+
+DEFAULT_THICKNESS = 0.3
+
+
+def _catmull_rom(points: np.ndarray, samples: int) -> np.ndarray:
+    """Uniform Catmull-Rom curve through the control points, with clamped ends"""
+    padded = np.vstack([points[0], points, points[-1]])
+    segment_count = len(points) - 1
+    t = np.linspace(0, segment_count, samples)
+    index = np.minimum(t.astype(int), segment_count - 1)
+    local = (t - index)[:, None]
+
+    p0, p1, p2, p3 = padded[index], padded[index + 1], padded[index + 2], padded[index + 3]
+    return 0.5 * (
+        2 * p1
+        + (p2 - p0) * local
+        + (2 * p0 - 5 * p1 + 4 * p2 - p3) * local ** 2
+        + (3 * p1 - p0 - 3 * p2 + p3) * local ** 3
+    )
+
+
+def _curved_path(geometry: Dict[str, Any], samples: int) -> np.ndarray:
+    points = np.asarray(geometry["points"], dtype=np.float64)
+    return _catmull_rom(points, samples)
+
+
+def _spiral(geometry: Dict[str, Any], samples: int) -> np.ndarray:
+    radius = geometry.get("radius", 1)
+    angle = np.linspace(0, geometry.get("turns", 1.5) * 2 * np.pi, samples)
+    # Radius opens up from the center outwards
+    r = radius * (0.2 + 0.8 * angle / angle[-1])
+    return np.column_stack([r * np.cos(angle), r * np.sin(angle), np.zeros(samples)])
+
+
+def _double_loop(geometry: Dict[str, Any], samples: int) -> np.ndarray:
+    radius = geometry.get("radius", 0.7)
+    t = np.linspace(0, 2 * np.pi, samples)
+    # Vertical figure eight: one loop above the other
+    return np.column_stack([radius * np.sin(2 * t), 2 * radius * np.sin(t), np.zeros(samples)])
+
+
+def _double_curve(geometry: Dict[str, Any], samples: int) -> np.ndarray:
+    radius = geometry.get("radius", 0.8)
+    half = samples // 2
+    angle = np.linspace(np.pi / 2, -np.pi / 2, half)
+    upper = np.column_stack([radius * np.cos(angle), radius + radius * np.sin(angle)])
+    angle = np.linspace(np.pi / 2, -np.pi / 2, samples - half)
+    lower = np.column_stack([radius * np.cos(angle), -radius + radius * np.sin(angle)])
+    curve = np.vstack([upper, lower])
+    return np.column_stack([curve, np.zeros(samples)])
+
+
+def _curved_tail(geometry: Dict[str, Any], samples: int) -> np.ndarray:
+    head_radius = geometry.get("head_radius", 0.8)
+    tail_length = geometry.get("tail_length", 1.5)
+    head_samples = (samples * 2) // 3
+
+    # Closed head loop, starting and ending at its rightmost point
+    angle = np.linspace(0, 2 * np.pi, head_samples)
+    center_y = tail_length / 2
+    head = np.column_stack([head_radius * np.cos(angle), center_y + head_radius * np.sin(angle)])
+
+    # Tail curls down and slightly inwards from the head
+    t = np.linspace(0, 1, samples - head_samples + 1)[1:]
+    tail = np.column_stack([
+        head_radius * (1 - 0.4 * t ** 2),
+        center_y - (tail_length + head_radius) * t
+    ])
+    curve = np.vstack([head, tail])
+    return np.column_stack([curve, np.zeros(samples)])
+
+
+CENTERLINES: Dict[str, Callable[[Dict[str, Any], int], np.ndarray]] = {
+    "curved_path": _curved_path,
+    "spiral": _spiral,
+    "double_loop": _double_loop,
+    "double_curve": _double_curve,
+    "curved_tail": _curved_tail
+}
+
+
+def can_tessellate(shape_type: str) -> bool:
+    """Whether the shape type has a server-side tessellation (others are Three.js primitives)"""
+    return shape_type in CENTERLINES
+
+
+def tessellate_tube(centerline: np.ndarray, radius: float, radial_segments: int) -> Dict[str, np.ndarray]:
+    """
+    Sweep a circle of the given radius along a planar (z = 0) centerline
+    Returns float32 vertices and normals (n x 3) and uint32 triangle indices
+    """
+    tangents = np.gradient(centerline, axis=0)
+    tangents /= np.maximum(np.linalg.norm(tangents, axis=1, keepdims=True), 1e-9)
+
+    # For curves in the XY plane the in-plane normal and the z axis form a stable frame
+    normals = np.column_stack([-tangents[:, 1], tangents[:, 0], np.zeros(len(centerline))])
+    binormal = np.array([0.0, 0.0, 1.0])
+
+    theta = np.linspace(0, 2 * np.pi, radial_segments, endpoint=False)
+    ring = (np.cos(theta)[None, :, None] * normals[:, None, :]
+            + np.sin(theta)[None, :, None] * binormal[None, None, :])
+
+    vertices = centerline[:, None, :] + radius * ring
+    path_count = len(centerline)
+
+    # Two triangles per quad between consecutive rings
+    i, j = np.meshgrid(np.arange(path_count - 1), np.arange(radial_segments), indexing="ij")
+    a = i * radial_segments + j
+    b = (i + 1) * radial_segments + j
+    c = (i + 1) * radial_segments + (j + 1) % radial_segments
+    d = i * radial_segments + (j + 1) % radial_segments
+    indices = np.stack([a, b, d, b, c, d], axis=-1).reshape(-1)
+
+    return {
+        "vertices": vertices.reshape(-1, 3).astype(np.float32),
+        "normals": ring.reshape(-1, 3).astype(np.float32),
+        "indices": indices.astype(np.uint32)
+    }
+
+
+def tessellate_shape(shape: Dict[str, Any], lod: str = "medium") -> Dict[str, np.ndarray]:
+    """Tessellate a curved base shape definition at a level of detail"""
+    if lod not in LOD_LEVELS:
+        raise ValueError(f"Level of detail must be one of {', '.join(LOD_LEVELS)}")
+    if not can_tessellate(shape["type"]):
+        raise ValueError(f"Shape type {shape['type']} is rendered as a primitive on the client")
+
+    detail = LOD_LEVELS[lod]
+    geometry = shape["geometry"]
+    centerline = CENTERLINES[shape["type"]](geometry, detail["path_segments"])
+    radius = geometry.get("thickness", DEFAULT_THICKNESS) / 2
+    return tessellate_tube(centerline, radius, detail["radial_segments"])
+
+
+def mesh_to_dict(mesh: Dict[str, np.ndarray], decimals: int = 4) -> Dict[str, Any]:
+    """Flat, JSON-ready buffers for a tessellated mesh"""
+    return {
+        "vertices": np.round(mesh["vertices"], decimals).reshape(-1).tolist(),
+        "normals": np.round(mesh["normals"], decimals).reshape(-1).tolist(),
+        "indices": mesh["indices"].tolist(),
+        "vertex_count": len(mesh["vertices"]),
+        "index_count": len(mesh["indices"])
+    }
@@ -0,0 +1,139 @@
+"""
+Keyframe Tracks - Precomputed animation frames for transformation steps
+Samples every shape's position, scale and opacity at a fixed frame rate in
+one batched NumPy pass, so clients only index into arrays while animating
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List
+
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+MIN_FPS = 1
+MAX_FPS = 120
+
+EASINGS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t ** 3,
+    "ease_out": lambda t: 1 - (1 - t) ** 3,
+    "ease_in_out": lambda t: np.where(t < 0.5, 4 * t ** 3, 1 - (-2 * t + 2) ** 3 / 2)
+}
+
+# Channel layout of a shape's state vector: position xyz, scale xyz, opacity
+POSITION = slice(0, 3)
+SCALE = slice(3, 6)
+OPACITY = 6
+CHANNELS = 7
+
+DEFAULT_STATE = (0.0, 0.0, 0.0, 1.0, 1.0, 1.0, 1.0)
+
+
+def _step_states(steps: List[Dict[str, Any]], names: List[str]):
+    """
+    Start and end state of every shape for every step, shape (shapes, steps, channels)
+    A shape fades in on the step that first mentions it; when a step introduces a
+    new shape (e.g. the result), shapes it doesn't mention fade out
+    """
+    default = np.array(DEFAULT_STATE)
+    starts = np.empty((len(names), len(steps), CHANNELS))
+    ends = np.empty_like(starts)
+    state: Dict[str, Any] = {name: None for name in names}
+
+    for s, step in enumerate(steps):
+        shapes = step.get("shapes", {})
+        introduces = any(state[name] is None for name in shapes)
+
+        for k, name in enumerate(names):
+            previous = state[name]
+            spec = shapes.get(name)
+
+            if spec is None:
+                if previous is None:
+                    begin = default.copy()
+                    begin[OPACITY] = 0
+                    target = begin
+                else:
+                    begin = previous
+                    target = previous.copy()
+                    if introduces:
+                        target[OPACITY] = 0
+            else:
+                target = (previous if previous is not None else default).copy()
+                if "position" in spec:
+                    target[POSITION] = spec["position"]
+                if "scale" in spec:
+                    target[SCALE] = spec["scale"]
+                if "opacity" in spec:
+                    target[OPACITY] = spec["opacity"]
+
+                if previous is None:
+                    # Appear in place and fade in
+                    begin = target.copy()
+                    begin[OPACITY] = 0
+                else:
+                    begin = previous
+
+                if "target_position" in spec:
+                    begin = begin.copy()
+                    begin[POSITION] = spec.get("position", begin[POSITION])
+                    target[POSITION] = spec["target_position"]
+
+            starts[k, s] = begin
+            ends[k, s] = target
+            if spec is not None or previous is not None:
+                # A shape stays unintroduced (hidden) until a step mentions it
+                state[name] = target
+
+    return starts, ends
+
+
+def build_keyframe_tracks(steps: List[Dict[str, Any]], fps: int = 30,
+                          easing: str = "ease_in_out") -> Dict[str, Any]:
+    """
+    Sample transformation steps into per-shape keyframe tracks
+    Tracks hold frame_count samples: position and scale flattened as xyz triples,
+    opacity as one value per frame
+    """
+    if easing not in EASINGS:
+        raise ValueError(f"Easing must be one of {', '.join(EASINGS)}")
+    if not MIN_FPS <= fps <= MAX_FPS:
+        raise ValueError(f"Frame rate must be between {MIN_FPS} and {MAX_FPS}")
+
+    names = list(dict.fromkeys(name for step in steps for name in step.get("shapes", {})))
+    durations = np.array([step["duration"] for step in steps], dtype=np.float64)
+    step_ends = np.cumsum(durations)
+    step_starts = step_ends - durations
+    total = float(step_ends[-1]) if len(steps) else 0.0
+
+    frame_count = int(round(total / 1000 * fps)) + 1
+    times = np.minimum(np.arange(frame_count) * 1000 / fps, total)
+
+    # Which step each frame falls in, and how far through it (eased)
+    step_index = np.minimum(np.searchsorted(step_ends, times, side="right"), len(steps) - 1)
+    progress = np.clip(
+        (times - step_starts[step_index]) / np.maximum(durations[step_index], 1), 0, 1
+    )
+    eased = EASINGS[easing](progress)
+
+    # All shapes and channels in one pass: (shapes, frames, channels)
+    starts, ends = _step_states(steps, names)
+    frames = starts[:, step_index] + (ends - starts)[:, step_index] * eased[None, :, None]
+    frames = np.round(frames, 4)
+
+    return {
+        "fps": fps,
+        "easing": easing,
+        "duration": total,
+        "frame_count": frame_count,
+        "tracks": {
+            name: {
+                "position": frames[k, :, POSITION].reshape(-1).tolist(),
+                "scale": frames[k, :, SCALE].reshape(-1).tolist(),
+                "opacity": frames[k, :, OPACITY].tolist()
+            }
+            for k, name in enumerate(names)
+        }
+    }
@@ -0,0 +1,189 @@
+"""
+Learning Progress Aggregator - Running statistics over a child's answers
+Keeps accuracy, response-time and streak statistics up to date in constant
+time per answer, so progress analysis no longer rescans the full history
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from .operations import practice_operations
+
+
+class LearningProgressAggregator:
+    """
+    Running statistics for one learner (or a merged group of learners)
+    Answers use the same dict shape as analyze_learning_progress:
+    {"operation": "addition", "correct": True, "response_time": 4.2, ...}
+    """
+
+    __slots__ = (
+        "total", "correct", "operation_totals", "operation_correct",
+        "timed_count", "response_time_mean", "response_time_m2",
+        "current_streak", "longest_streak", "leading_streak"
+    )
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.operation_totals: Dict[str, int] = {}
+        self.operation_correct: Dict[str, int] = {}
+
+        # Welford running mean / sum of squared deviations for response times
+        self.timed_count = 0
+        self.response_time_mean = 0.0
+        self.response_time_m2 = 0.0
+
+        # Correct-answer streaks; the leading streak lets ordered shards merge exactly
+        self.current_streak = 0
+        self.longest_streak = 0
+        self.leading_streak = 0
+
+    @classmethod
+    def from_answers(cls, answers: Iterable[Dict[str, Any]]) -> "LearningProgressAggregator":
+        """Build an aggregator from an existing list of answers in one pass"""
+        aggregator = cls()
+        for answer in answers:
+            aggregator.add(answer)
+        return aggregator
+
+    def add(self, answer: Dict[str, Any]) -> None:
+        """Record one submitted answer"""
+        self.record(
+            operation=answer.get("operation"),
+            correct=bool(answer.get("correct", False)),
+            response_time=answer.get("response_time")
+        )
+
+    def record(self, operation: Optional[str], correct: bool,
+               response_time: Optional[float] = None) -> None:
+        """Record one answer from its fields"""
+        self.total += 1
+        if operation is not None:
+            self.operation_totals[operation] = self.operation_totals.get(operation, 0) + 1
+
+        if correct:
+            self.correct += 1
+            if operation is not None:
+                self.operation_correct[operation] = self.operation_correct.get(operation, 0) + 1
+            self.current_streak += 1
+            if self.current_streak > self.longest_streak:
+                self.longest_streak = self.current_streak
+            if self.leading_streak == self.total - 1:
+                self.leading_streak = self.total
+        else:
+            self.current_streak = 0
+
+        # Missing or zero response times are left out, matching the batch analysis
+        if response_time:
+            self.timed_count += 1
+            delta = response_time - self.response_time_mean
+            self.response_time_mean += delta / self.timed_count
+            self.response_time_m2 += delta * (response_time - self.response_time_mean)
+
+    def merge(self, other: "LearningProgressAggregator") -> "LearningProgressAggregator":
+        """
+        Combine two aggregators into a new one, as if other's answers came after self's
+        Counts and response-time statistics are order independent; streaks assume that order
+        """
+        merged = LearningProgressAggregator()
+        merged.total = self.total + other.total
+        merged.correct = self.correct + other.correct
+
+        merged.operation_totals = dict(self.operation_totals)
+        for operation, count in other.operation_totals.items():
+            merged.operation_totals[operation] = merged.operation_totals.get(operation, 0) + count
+        merged.operation_correct = dict(self.operation_correct)
+        for operation, count in other.operation_correct.items():
+            merged.operation_correct[operation] = merged.operation_correct.get(operation, 0) + count
+
+        # Chan et al. parallel combination of mean and M2
+        merged.timed_count = self.timed_count + other.timed_count
+        if merged.timed_count:
+            delta = other.response_time_mean - self.response_time_mean
+            merged.response_time_mean = (
+                self.response_time_mean + delta * other.timed_count / merged.timed_count
+            )
+            merged.response_time_m2 = (
+                self.response_time_m2 + other.response_time_m2
+                + delta * delta * self.timed_count * other.timed_count / merged.timed_count
+            )
+
+        other_all_correct = other.leading_streak == other.total
+        merged.current_streak = (
+            self.current_streak + other.total if other_all_correct else other.current_streak
+        )
+        merged.leading_streak = (
+            self.total + other.leading_streak if self.leading_streak == self.total
+            else self.leading_streak
+        )
+        merged.longest_streak = max(
+            self.longest_streak,
+            other.longest_streak,
+            self.current_streak + other.leading_streak
+        )
+        return merged
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.total if self.total else 0
+
+    def operation_accuracy(self, operation: str) -> float:
+        """Accuracy for one operation, or 0 when it has not been practiced"""
+        total = self.operation_totals.get(operation, 0)
+        return self.operation_correct.get(operation, 0) / total if total else 0
+
+    @property
+    def response_time_variance(self) -> float:
+        return self.response_time_m2 / self.timed_count if self.timed_count else 0
+
+    def analysis(self) -> Dict[str, Any]:
+        """
+        Summarize progress and suggest next steps
+        Returns the same dict as MathShapeEngine.analyze_learning_progress, plus
+        response-time spread and streaks
+        """
+        if not self.total:
+            return {"status": "no_data", "recommendation": "start_with_basics"}
+
+        accuracy = self.accuracy
+        avg_response_time = self.response_time_mean if self.timed_count else 0
+
+        analysis = {
+            "total_problems": self.total,
+            "accuracy": accuracy,
+            **{
+                f"{operation}_accuracy": self.operation_accuracy(operation)
+                for operation in practice_operations()
+            },
+            "average_response_time": avg_response_time,
+            "response_time_std": math.sqrt(self.response_time_variance),
+            "current_streak": self.current_streak,
+            "longest_streak": self.longest_streak,
+            "strengths": [],
+            "areas_for_improvement": [],
+            "next_skill_level": "beginner",
+            "recommended_practice": []
+        }
+
+        # Determine strengths and areas for improvement
+        for operation in practice_operations():
+            operation_accuracy = analysis[f"{operation}_accuracy"]
+            if operation_accuracy > 0.8:
+                analysis["strengths"].append(operation)
+            elif operation_accuracy < 0.6:
+                analysis["areas_for_improvement"].append(operation)
+
+        # Recommend next skill level
+        if accuracy > 0.8 and avg_response_time < 10:  # 10 seconds
+            analysis["next_skill_level"] = "intermediate" if self.total > 10 else "beginner"
+
+        return analysis
+
+
+def merge_aggregators(aggregators: List[LearningProgressAggregator]) -> LearningProgressAggregator:
+    """Fold several aggregators (e.g. one per learner) into a class-level rollup"""
+    merged = LearningProgressAggregator()
+    for aggregator in aggregators:
+        merged = merged.merge(aggregator)
+    return merged
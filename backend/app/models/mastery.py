@@ -0,0 +1,192 @@
+"""
+Fact Mastery - Dense per-learner mastery estimates over the operand grid
+Each learner has an Elo-style rating for every (operation, operand1, operand2)
+fact; problems are drawn with weights favouring weak and long-unseen facts,
+for many learners at once in a single vectorized step
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence, Tuple
+
+from .math_operations import MAX_OPERAND, PRACTICE_RANGES
+from .operations import get_operation, practice_operations
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+FACT_SIZE = MAX_OPERAND + 1
+
+# Rating step per answer; larger values adapt faster but are noisier
+ELO_K = 0.4
+
+# Weight kept by fully mastered facts so they still come up occasionally
+EXPLORATION_WEIGHT = 0.05
+
+# Answers since a fact was last seen at which its review boost saturates
+SPACING_HORIZON = 50
+
+
+def operation_index(operation: str) -> Optional[int]:
+    """
+    Position of a practiced operation on the operations axis, or None
+    Operations are only ever added to the registry, so positions never change
+    """
+    operations = practice_operations()
+    return operations.index(operation) if operation in operations else None
+
+
+def fact_difficulty() -> np.ndarray:
+    """
+    Prior difficulty of every fact, shape (operations, operand1, operand2)
+    From each practiced operation's rules, e.g. growing with the numbers involved
+    """
+    return _fact_difficulty(practice_operations())
+
+
+@lru_cache(maxsize=None)
+def _fact_difficulty(operations: Tuple[str, ...]) -> np.ndarray:
+    a, b = np.meshgrid(np.arange(FACT_SIZE), np.arange(FACT_SIZE), indexing="ij")
+    difficulty = np.stack([get_operation(name).practice.difficulty(a, b) for name in operations])
+    difficulty.setflags(write=False)
+    return difficulty
+
+
+@lru_cache(maxsize=None)
+def valid_facts(operation: str, skill_level: str) -> np.ndarray:
+    """
+    Boolean (operand1, operand2) mask of facts practiced at a skill level
+    Uses the practice generator's operand ranges, limited by the operation's
+    rules to results the visualizations support
+    """
+    min_num, max_num = PRACTICE_RANGES[skill_level]
+    a, b = np.meshgrid(np.arange(FACT_SIZE), np.arange(FACT_SIZE), indexing="ij")
+    mask = get_operation(operation).practice.facts(a, b, min_num, max_num)
+    mask.setflags(write=False)
+    return mask
+
+
+class MasteryTable:
+    """
+    Ratings, attempt counts and recency for many learners as dense arrays
+    Learners are rows; arrays grow by doubling as learners are added, and by a
+    column per operation registered later. Not thread-safe: callers serialize
+    access (see AdaptiveSelector)
+    """
+
+    def __init__(self, capacity: int = 64):
+        shape = (capacity, len(practice_operations()), FACT_SIZE, FACT_SIZE)
+        self.ratings = np.zeros(shape, dtype=np.float32)
+        self.attempts = np.zeros(shape, dtype=np.int32)
+        # Learner's answer count when each fact was last answered
+        self.last_seen = np.zeros(shape, dtype=np.int64)
+        self.answer_counts = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+    def add_learner(self) -> int:
+        """Allocate a row for a new learner and return its index"""
+        if self.size == len(self.ratings):
+            self._grow()
+        row = self.size
+        self.size += 1
+        return row
+
+    def reset(self, row: int) -> None:
+        """Clear a row so it can be reused for another learner"""
+        for array in (self.ratings, self.attempts, self.last_seen, self.answer_counts):
+            array[row] = 0
+
+    def _grow(self) -> None:
+        for name in ("ratings", "attempts", "last_seen", "answer_counts"):
+            array = getattr(self, name)
+            grown = np.zeros((len(array) * 2,) + array.shape[1:], dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def _fit_operations(self) -> None:
+        """Add columns for operations registered since the arrays were allocated"""
+        count = len(practice_operations())
+        if self.ratings.shape[1] == count:
+            return
+        for name in ("ratings", "attempts", "last_seen"):
+            array = getattr(self, name)
+            grown = np.zeros((len(array), count) + array.shape[2:], dtype=array.dtype)
+            grown[:, :array.shape[1]] = array
+            setattr(self, name, grown)
+
+    def mastery(self, rows) -> np.ndarray:
+        """Probability of answering each fact correctly, shape (rows, operations, a, b)"""
+        self._fit_operations()
+        return 1 / (1 + np.exp(fact_difficulty() - self.ratings[rows]))
+
+    def update(self, row: int, operations: Sequence[int], operand1: Sequence[int],
+               operand2: Sequence[int], correct: Sequence[bool]) -> None:
+        """
+        Apply a batch of one learner's answers in one vectorized pass
+        Expected scores use the ratings from before the batch (batch Elo)
+        """
+        operations = np.asarray(operations, dtype=np.intp)
+        operand1 = np.asarray(operand1, dtype=np.intp)
+        operand2 = np.asarray(operand2, dtype=np.intp)
+        if not len(operations):
+            return
+
+        self._fit_operations()
+        index = (row, operations, operand1, operand2)
+        difficulty = fact_difficulty()[operations, operand1, operand2]
+        expected = 1 / (1 + np.exp(difficulty - self.ratings[index]))
+        np.add.at(self.ratings, index, ELO_K * (np.asarray(correct, dtype=np.float32) - expected))
+        np.add.at(self.attempts, index, 1)
+
+        # Sequence numbers of the answers, so a repeated fact keeps its latest
+        sequence = self.answer_counts[row] + np.arange(1, len(operations) + 1)
+        np.maximum.at(self.last_seen, index, sequence)
+        self.answer_counts[row] += len(operations)
+
+    def weights(self, rows, operation: str, mask: np.ndarray) -> np.ndarray:
+        """
+        Draw weights, shape (rows, FACT_SIZE * FACT_SIZE)
+        Weak facts weigh more, and facts unseen for a while get a review boost
+        """
+        self._fit_operations()
+        op = operation_index(operation)
+        ratings = self.ratings[rows, op]
+        mastery = 1 / (1 + np.exp(fact_difficulty()[op] - ratings))
+
+        gap = self.answer_counts[rows, None, None] - self.last_seen[rows, op]
+        seen = self.attempts[rows, op] > 0
+        spacing = np.where(seen, 1 + np.minimum(gap / SPACING_HORIZON, 1), 1)
+
+        weights = ((1 - mastery) + EXPLORATION_WEIGHT) * spacing * mask
+        return weights.reshape(len(rows), -1)
+
+    def sample(self, rows: Iterable[int], operation: str, skill_level: str, count: int,
+               rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Draw count facts per learner row, all rows at once
+        Returns operand1, operand2 and current mastery arrays of shape (rows, count);
+        facts are distinct within a row while count allows it
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        rows = np.asarray(list(rows), dtype=np.intp)
+        mask = valid_facts(operation, skill_level)
+        weights = self.weights(rows, operation, mask)
+
+        if count <= int(mask.sum()):
+            # Gumbel top-k: weighted sampling without replacement for every row in one pass
+            with np.errstate(divide="ignore"):
+                keys = np.log(weights) - np.log(-np.log(rng.random(weights.shape)))
+            chosen = np.argpartition(-keys, count - 1, axis=1)[:, :count]
+            order = np.argsort(-np.take_along_axis(keys, chosen, axis=1), axis=1)
+            chosen = np.take_along_axis(chosen, order, axis=1)
+        else:
+            # More problems than facts: draw with replacement by inverse CDF
+            cdf = np.cumsum(weights, axis=1)
+            targets = rng.random((len(rows), count)) * cdf[:, -1:]
+            chosen = (cdf[:, None, :] <= targets[:, :, None]).sum(axis=2)
+
+        operand1, operand2 = np.divmod(chosen, FACT_SIZE)
+        op = operation_index(operation)
+        mastery = self.mastery(rows)[np.arange(len(rows))[:, None], op, operand1, operand2]
+        return operand1, operand2, mastery
@@ -3,9 +3,104 @@ Math Shape Engine - Core logic for number shape transformations
 Handles the mathematical concepts behind ShapeLearn's visualization system
 """
 
+from __future__ import annotations
+
 import random
-from typing import Dict, List, Tuple, Any
-import numpy as np
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Any, Iterable, Iterator, Mapping, Optional
+
+from .geometry import LOD_LEVELS, can_tessellate, mesh_to_dict, tessellate_shape
+from .keyframes import build_keyframe_tracks
+from .learning_progress import LearningProgressAggregator
+from .operations import (
+    MAX_OPERAND, OPERATIONS, Operation, get_operation, get_practice_operation, unsupported_operation_message
+)
+from .shape_records import ComponentRef, CompoundShapeRecord
+from ..utils.lazy_import import lazy_import
+
+# NumPy is only needed by the vectorized paths; import it on first use
+np = lazy_import("numpy")
+
+TransformationKey = Tuple[str, int, int]
+
+# Largest number with a shape definition
+MAX_SHAPE_NUMBER = 100
+
+# Compound shape layout by digit count
+PLACE_LABELS = ("hundreds", "tens", "ones")
+COMPONENT_OFFSETS = {
+    2: (-1.5, 1.5),
+    3: (-3, 0, 3)
+}
+
+# Operand ranges for practice problems by skill level
+PRACTICE_RANGES = {
+    "beginner": (1, 5),
+    "intermediate": (1, 10),
+    "advanced": (1, 20)
+}
+
+# Problem counts at or above this use the vectorized generator
+VECTORIZED_PRACTICE_THRESHOLD = 64
+
+
+def _refuse_change(self, *args, **kwargs):
+    raise TypeError("Precomputed transformations are shared between requests and read-only")
+
+
+class _ReadOnlyDict(dict):
+    """A dict that refuses changes; it still serializes, compares and copies like a dict"""
+
+    __setitem__ = __delitem__ = __ior__ = _refuse_change
+    clear = pop = popitem = setdefault = update = _refuse_change
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+
+class _ReadOnlyList(list):
+    """A list that refuses changes; it still serializes, compares and copies like a list"""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _refuse_change
+    append = extend = insert = pop = remove = clear = sort = reverse = _refuse_change
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+def _freeze(value: Any, memo: Dict[int, Any]) -> Any:
+    """Read-only copy of a transformation; parts shared between transformations are frozen once"""
+    if not isinstance(value, (dict, list)):
+        return value
+    frozen = memo.get(id(value))
+    if frozen is None:
+        if isinstance(value, dict):
+            frozen = _ReadOnlyDict((key, _freeze(item, memo)) for key, item in value.items())
+        else:
+            frozen = _ReadOnlyList(_freeze(item, memo) for item in value)
+        # Keep value alive so its id isn't reused while the table is built
+        memo[id(value)] = frozen, value
+        return frozen
+    return frozen[0]
+
+
+def _practice_operation(operation_type: str) -> Operation:
+    """The registered operation to practice, or ValueError if it can't be practiced"""
+    operation = get_practice_operation(operation_type)
+    if operation is None:
+        raise ValueError(unsupported_operation_message(practice=True))
+    return operation
+
+def _lru_info(cached_function) -> Dict[str, int]:
+    """cache_info() of an lru_cache-wrapped function as a dict"""
+    info = cached_function.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize
+    }
 
 class MathShapeEngine:
     """
@@ -13,17 +108,29 @@ class MathShapeEngine:
     Based on visual-spatial relationships between numbers
     """
     
-    def __init__(self):
+    def __init__(self, warm_up: bool = False, shape_cache_size: int = 64,
+                 keyframe_cache_size: int = 256):
         """Initialize the math shape engine with base shape definitions"""
         self.shape_definitions = self._initialize_shapes()
+        # Compound shapes (10-100) are built on demand and memoized per engine
+        self._compound_shape = lru_cache(maxsize=shape_cache_size)(self._build_compound_shape)
+        # Tessellated meshes per (digit, level of detail); a small, fixed set
+        self._shape_mesh = lru_cache(maxsize=None)(self._build_shape_mesh)
+        # Sampled animation tracks per (operation, operands, fps, easing)
+        self._keyframes = lru_cache(maxsize=keyframe_cache_size)(self._build_keyframes)
         self.complementary_pairs = {
             1: 9, 2: 8, 3: 7, 4: 6, 5: 5,
             6: 4, 7: 3, 8: 2, 9: 1
         }
+        # Built on first lookup, or eagerly via warm_up()
+        self._transformation_table: Optional[Mapping[TransformationKey, Dict[str, Any]]] = None
+        
+        if warm_up:
+            self.warm_up()
     
     def _initialize_shapes(self) -> Dict[int, Dict[str, Any]]:
         """
-        Initialize 3D shape definitions for numbers 0-20
+        Initialize 3D shape definitions for the digits 0-9
         Each shape has geometric properties for Three.js rendering
         """
         shapes = {}
@@ -117,271 +224,312 @@ class MathShapeEngine:
         # Add base shapes to our collection
         shapes.update(base_shapes)
         
-        # Generate compound shapes for numbers 10-20
-        for num in range(10, 21):
-            tens_digit = num // 10
-            ones_digit = num % 10
-            
-            shapes[num] = {
-                "type": "compound",
-                "components": [
-                    {
-                        "shape": shapes[tens_digit].copy(),
-                        "position": [-1.5, 0, 0],
-                        "label": "tens"
-                    },
-                    {
-                        "shape": shapes[ones_digit].copy(),
-                        "position": [1.5, 0, 0],
-                        "label": "ones"
-                    } if ones_digit != 0 else None
-                ],
-                "color": "#A8E6CF",
-                "description": f"Compound number combining {tens_digit} and {ones_digit}"
-            }
-        
         return shapes
     
+    def _build_compound_shape(self, number: int) -> CompoundShapeRecord:
+        """
+        Build the compound shape record for a multi-digit number from its digits
+        Leading digits always appear; later zero digits leave an empty (None) slot
+        """
+        digits = [int(digit) for digit in str(number)]
+        labels = PLACE_LABELS[-len(digits):]
+        offsets = COMPONENT_OFFSETS[len(digits)]
+        
+        components = tuple(
+            ComponentRef(shape_id=digit, position=(offset, 0, 0), label=label)
+            if index == 0 or digit != 0 else None
+            for index, (digit, label, offset) in enumerate(zip(digits, labels, offsets))
+        )
+        
+        digit_list = ", ".join(str(digit) for digit in digits[:-1])
+        return CompoundShapeRecord(
+            number=number,
+            components=components,
+            color="#A8E6CF",
+            description=f"Compound number combining {digit_list} and {digits[-1]}"
+        )
+    
     def get_number_shapes(self) -> Dict[int, Dict[str, Any]]:
-        """Return all shape definitions"""
-        return self.shape_definitions
+        """Return shape definitions for all numbers 0-20"""
+        return {number: self.get_shape_for_number(number) for number in range(MAX_OPERAND + 1)}
     
     def get_shape_for_number(self, number: int) -> Dict[str, Any]:
-        """Get shape definition for a specific number"""
-        if number not in self.shape_definitions:
+        """
+        Get shape definition for a specific number
+        Digits 0-9 are resident; larger numbers are built on first request and kept in an LRU
+        """
+        if number in self.shape_definitions:
+            return self.shape_definitions[number]
+        return self.get_compound_record(number).to_dict(self.shape_definitions)
+    
+    def get_compound_record(self, number: int) -> CompoundShapeRecord:
+        """Get the compact, reference-based record for a compound number (10-100)"""
+        if (not isinstance(number, int) or number in self.shape_definitions
+                or number < 0 or number > MAX_SHAPE_NUMBER):
             raise ValueError(f"Shape not defined for number {number}")
-        return self.shape_definitions[number]
+        return self._compound_shape(number)
     
-    def get_addition_transformation(self, operand1: int, operand2: int) -> Dict[str, Any]:
+    def get_compact_shapes(self, numbers: Iterable[int]) -> Dict[str, Any]:
         """
-        Generate transformation steps for addition visualization
-        Based on the concept that complementary numbers have natural linking points
+        Compact shape table: each referenced base shape is sent once, digits 0-9
+        point at it by shape_ref, and compounds carry shape_ref ids per component
         """
-        result = operand1 + operand2
-        
-        # Check if this is a complementary pair (adds to 10)
-        is_complementary = (operand1 + operand2 == 10)
+        shapes = {}
+        base_ids = set()
+        for number in numbers:
+            if number in self.shape_definitions:
+                shapes[number] = {"shape_ref": number}
+                base_ids.add(number)
+            else:
+                record = self.get_compound_record(number)
+                shapes[number] = record.to_dict()
+                base_ids.update(record.base_shape_ids)
         
-        transformation = {
-            "type": "addition",
-            "operand1": operand1,
-            "operand2": operand2,
-            "result": result,
-            "is_complementary": is_complementary,
-            "steps": []
+        return {
+            "base_shapes": {shape_id: self.shape_definitions[shape_id] for shape_id in sorted(base_ids)},
+            "shapes": shapes
         }
+    
+    def get_tessellated_shape(self, number: int, lod: str = "medium") -> Dict[str, Any]:
+        """
+        Pre-tessellated geometry for a number's shape at a level of detail
+        One entry per component; mesh is None for shapes the client renders as primitives
+        """
+        if lod not in LOD_LEVELS:
+            raise ValueError(f"Level of detail must be one of {', '.join(LOD_LEVELS)}")
         
-        if is_complementary:
-            # Special transformation for base-10 pairs
-            transformation["steps"] = [
-                {
-                    "step": 1,
-                    "description": f"Number {operand1} and {operand2} are complementary - they naturally fit together",
-                    "animation": "highlight_complementary",
-                    "duration": 1000,
-                    "shapes": {
-                        "operand1": {"position": [-2, 0, 0], "scale": [1, 1, 1]},
-                        "operand2": {"position": [2, 0, 0], "scale": [1, 1, 1]}
-                    }
-                },
-                {
-                    "step": 2,
-                    "description": f"Watch how {operand1} and {operand2} connect at their natural linking points",
-                    "animation": "move_to_link",
-                    "duration": 2000,
-                    "shapes": {
-                        "operand1": {"position": [-0.8, 0, 0], "rotation": [0, 0, 0]},
-                        "operand2": {"position": [0.8, 0, 0], "rotation": [0, 0, 0]}
-                    }
-                },
-                {
-                    "step": 3,
-                    "description": "The shapes flow together to create 10!",
-                    "animation": "merge_to_result",
-                    "duration": 1500,
-                    "shapes": {
-                        "result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2]}
-                    }
-                }
-            ]
+        if number in self.shape_definitions:
+            parts = [(number, [0, 0, 0], None)]
         else:
-            # General addition transformation
-            transformation["steps"] = [
-                {
-                    "step": 1,
-                    "description": f"Starting with {operand1} and {operand2}",
-                    "animation": "present_operands",
-                    "duration": 1000,
-                    "shapes": {
-                        "operand1": {"position": [-2, 0, 0], "scale": [1, 1, 1]},
-                        "operand2": {"position": [2, 0, 0], "scale": [1, 1, 1]}
-                    }
-                },
-                {
-                    "step": 2,
-                    "description": f"Bringing {operand1} and {operand2} together",
-                    "animation": "move_together",
-                    "duration": 2000,
-                    "shapes": {
-                        "operand1": {"position": [-0.5, 0, 0]},
-                        "operand2": {"position": [0.5, 0, 0]}
-                    }
-                },
+            parts = [
+                (component.shape_id, list(component.position), component.label)
+                for component in self.get_compound_record(number).components
+                if component is not None
+            ]
+        
+        return {
+            "number": number,
+            "lod": lod,
+            "components": [
                 {
-                    "step": 3,
-                    "description": f"They combine to form {result}!",
-                    "animation": "transform_to_result",
-                    "duration": 1500,
-                    "shapes": {
-                        "result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2]}
-                    }
+                    "shape_ref": shape_id,
+                    "type": self.shape_definitions[shape_id]["type"],
+                    "position": position,
+                    "label": label,
+                    "mesh": self._shape_mesh(shape_id, lod)
                 }
+                for shape_id, position, label in parts
             ]
+        }
+    
+    def _build_shape_mesh(self, shape_id: int, lod: str) -> Optional[Dict[str, Any]]:
+        """Tessellate one base shape, or None for primitive shape types"""
+        shape = self.shape_definitions[shape_id]
+        if not can_tessellate(shape["type"]):
+            return None
+        return mesh_to_dict(tessellate_shape(shape, lod))
+    
+    def shape_cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters and size of the compound shape LRU"""
+        return _lru_info(self._compound_shape)
+    
+    def cache_info(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters and sizes of every engine cache, by name"""
+        return {
+            "compound_shapes": _lru_info(self._compound_shape),
+            "shape_meshes": _lru_info(self._shape_mesh),
+            "keyframes": _lru_info(self._keyframes)
+        }
+    
+    def warm_up(self) -> None:
+        """Build the precomputed transformation table ahead of the first request"""
+        self._get_transformation_table()
+    
+    def _get_transformation_table(self) -> Mapping[TransformationKey, Dict[str, Any]]:
+        """Return the transformation table, building it on first use"""
+        table = self._transformation_table
+        if table is None:
+            table = self._build_transformation_table()
+            self._transformation_table = table
+        return table
+    
+    def _build_transformation_table(self) -> Mapping[TransformationKey, Dict[str, Any]]:
+        """
+        Precompute transformations for every operand pair within each registered
+        operation's bounds (e.g. addition results <= MAX_OPERAND, no negative differences)
+        Entries are frozen, since every caller gets the same objects
+        """
+        table = {}
+        memo = {}
+        
+        for operation in OPERATIONS.values():
+            for operand1 in range(operation.max_operand + 1):
+                for operand2 in range(operation.max_operand + 1):
+                    if operation.in_bounds(operand1, operand2):
+                        table[(operation.name, operand1, operand2)] = \
+                            _freeze(operation.transformation(operand1, operand2), memo)
         
-        return transformation
+        return MappingProxyType(table)
+    
+    def get_transformation(self, operation: str, operand1: int, operand2: int) -> Dict[str, Any]:
+        """
+        Look up the precomputed transformation for a validated operation
+        The returned dict is shared between callers and raises TypeError if changed
+        """
+        try:
+            return self._get_transformation_table()[(operation, operand1, operand2)]
+        except KeyError:
+            # Operations registered after the table was built are filled in directly
+            spec = get_operation(operation)
+            if spec is not None and spec.in_bounds(operand1, operand2):
+                return spec.transformation(operand1, operand2)
+            raise ValueError(
+                f"No transformation for {operation} of {operand1} and {operand2}"
+            ) from None
+    
+    def get_keyframes(self, operation: str, operand1: int, operand2: int,
+                      fps: int = 30, easing: str = "ease_in_out") -> Dict[str, Any]:
+        """
+        Keyframe tracks sampling a validated operation's transformation steps
+        The returned dict is cached and shared between callers; treat it as read-only
+        """
+        return self._keyframes(operation, operand1, operand2, fps, easing)
+    
+    def _build_keyframes(self, operation: str, operand1: int, operand2: int,
+                         fps: int, easing: str) -> Dict[str, Any]:
+        """Sample one operation's steps into keyframe tracks"""
+        transformation = self.get_transformation(operation, operand1, operand2)
+        return build_keyframe_tracks(transformation["steps"], fps, easing)
+    
+    def get_addition_transformation(self, operand1: int, operand2: int) -> Dict[str, Any]:
+        """
+        Generate transformation steps for addition visualization
+        Based on the concept that complementary numbers have natural linking points
+        """
+        return OPERATIONS["addition"].transformation(operand1, operand2)
     
     def get_subtraction_transformation(self, operand1: int, operand2: int) -> Dict[str, Any]:
         """
         Generate transformation steps for subtraction visualization
         Subtraction as the larger number transforming when smaller number "phases through"
         """
-        result = operand1 - operand2
-        
-        transformation = {
-            "type": "subtraction",
-            "operand1": operand1,
-            "operand2": operand2,
-            "result": result,
-            "steps": [
-                {
-                    "step": 1,
-                    "description": f"Starting with {operand1}",
-                    "animation": "present_minuend",
-                    "duration": 1000,
-                    "shapes": {
-                        "operand1": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2], "opacity": 1}
-                    }
-                },
-                {
-                    "step": 2,
-                    "description": f"Watch as {operand2} phases through like a storm",
-                    "animation": "subtraction_storm",
-                    "duration": 2500,
-                    "shapes": {
-                        "operand1": {"opacity": 0.7, "color_shift": True},
-                        "operand2": {
-                            "position": [-3, 0, 0], 
-                            "target_position": [3, 0, 0], 
-                            "opacity": 0.6,
-                            "effect": "phasing"
-                        }
-                    }
-                },
-                {
-                    "step": 3,
-                    "description": f"The transformation leaves us with {result}!",
-                    "animation": "reveal_result",
-                    "duration": 1500,
-                    "shapes": {
-                        "result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2], "opacity": 1}
-                    }
-                }
-            ]
-        }
-        
-        return transformation
+        return OPERATIONS["subtraction"].transformation(operand1, operand2)
     
     def generate_practice_problems(self, skill_level: str = "beginner", 
                                  operation_type: str = "addition", 
-                                 count: int = 5) -> List[Dict[str, Any]]:
-        """Generate practice problems based on skill level"""
-        problems = []
+                                 count: int = 5,
+                                 seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Generate practice problems based on skill level
+        Large or seeded requests go through the vectorized NumPy path
+        """
+        if seed is not None or count >= VECTORIZED_PRACTICE_THRESHOLD:
+            return self.generate_practice_problems_vectorized(
+                skill_level=skill_level,
+                operation_type=operation_type,
+                count=count,
+                rng=np.random.default_rng(seed)
+            )
         
-        # Define number ranges based on skill level
-        ranges = {
-            "beginner": (1, 5),
-            "intermediate": (1, 10),
-            "advanced": (1, 20)
-        }
+        operation = _practice_operation(operation_type)
+        problems = []
         
-        min_num, max_num = ranges.get(skill_level, (1, 5))
+        min_num, max_num = PRACTICE_RANGES.get(skill_level, PRACTICE_RANGES["beginner"])
         
         for _ in range(count):
-            if operation_type == "addition":
-                operand1 = random.randint(min_num, max_num)
-                operand2 = random.randint(min_num, max_num)
-                
-                # Keep results reasonable for skill level
-                if operand1 + operand2 > max_num * 2:
-                    operand1, operand2 = min(operand1, operand2), min_num
-                
-                result = operand1 + operand2
-                equation = f"{operand1} + {operand2} = ?"
-                
-            else:  # subtraction
-                operand1 = random.randint(min_num + 1, max_num)
-                operand2 = random.randint(min_num, operand1)  # Ensure positive result
-                result = operand1 - operand2
-                equation = f"{operand1} - {operand2} = ?"
+            operand1, operand2 = operation.practice.draw(random.randint, min_num, max_num)
+            result = operation.compute(operand1, operand2)
             
             problems.append({
                 "id": len(problems) + 1,
-                "equation": equation,
+                "equation": f"{operand1} {operation.symbol} {operand2} = ?",
                 "operand1": operand1,
                 "operand2": operand2,
                 "result": result,
                 "operation": operation_type,
                 "skill_level": skill_level,
-                "is_complementary": (operation_type == "addition" and operand1 + operand2 == 10)
+                "is_complementary": operation.has_flag("is_complementary", operand1, operand2, result)
             })
         
         return problems
     
-    def analyze_learning_progress(self, solved_problems: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _draw_practice_operands(self, rng: np.random.Generator, skill_level: str,
+                               operation_type: str, count: int) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Analyze a child's learning progress and suggest next steps
-        This would be used for adaptive learning in the full app
+        Draw operand arrays for a batch of practice problems in one pass
+        Applies the same skill-level constraints as the scalar generator, as array masks
         """
-        if not solved_problems:
-            return {"status": "no_data", "recommendation": "start_with_basics"}
-        
-        # Calculate accuracy
-        correct_answers = sum(1 for p in solved_problems if p.get("correct", False))
-        accuracy = correct_answers / len(solved_problems)
-        
-        # Analyze problem types
-        addition_problems = [p for p in solved_problems if p.get("operation") == "addition"]
-        subtraction_problems = [p for p in solved_problems if p.get("operation") == "subtraction"]
-        
-        # Calculate average response time
-        response_times = [p.get("response_time", 0) for p in solved_problems if p.get("response_time")]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        
-        analysis = {
-            "total_problems": len(solved_problems),
-            "accuracy": accuracy,
-            "addition_accuracy": sum(1 for p in addition_problems if p.get("correct", False)) / len(addition_problems) if addition_problems else 0,
-            "subtraction_accuracy": sum(1 for p in subtraction_problems if p.get("correct", False)) / len(subtraction_problems) if subtraction_problems else 0,
-            "average_response_time": avg_response_time,
-            "strengths": [],
-            "areas_for_improvement": [],
-            "next_skill_level": "beginner",
-            "recommended_practice": []
-        }
+        min_num, max_num = PRACTICE_RANGES.get(skill_level, PRACTICE_RANGES["beginner"])
+        return _practice_operation(operation_type).practice.draw_many(rng, min_num, max_num, count)
+    
+    def generate_practice_problems_vectorized(self, skill_level: str = "beginner",
+                                              operation_type: str = "addition",
+                                              count: int = 5,
+                                              rng: Optional[np.random.Generator] = None,
+                                              start_id: int = 1) -> List[Dict[str, Any]]:
+        """
+        Generate practice problems with all operands drawn at once
+        Pass a seeded numpy Generator for reproducible worksheets
+        """
+        if rng is None:
+            rng = np.random.default_rng()
         
-        # Determine strengths and areas for improvement
-        if analysis["addition_accuracy"] > 0.8:
-            analysis["strengths"].append("addition")
-        elif analysis["addition_accuracy"] < 0.6:
-            analysis["areas_for_improvement"].append("addition")
-            
-        if analysis["subtraction_accuracy"] > 0.8:
-            analysis["strengths"].append("subtraction")
-        elif analysis["subtraction_accuracy"] < 0.6:
-            analysis["areas_for_improvement"].append("subtraction")
+        operand1, operand2 = self._draw_practice_operands(rng, skill_level, operation_type, count)
+        return self.build_practice_problems(operand1, operand2, skill_level, operation_type, start_id)
+    
+    def build_practice_problems(self, operand1: Iterable[int], operand2: Iterable[int],
+                                skill_level: str, operation_type: str,
+                                start_id: int = 1) -> List[Dict[str, Any]]:
+        """Practice problem dicts for already chosen operand arrays (or lists)"""
+        operand1 = np.asarray(operand1, dtype=np.int64)
+        operand2 = np.asarray(operand2, dtype=np.int64)
+        operation = _practice_operation(operation_type)
+        results = operation.compute(operand1, operand2)
         
-        # Recommend next skill level
-        if accuracy > 0.8 and avg_response_time < 10:  # 10 seconds
-            analysis["next_skill_level"] = "intermediate" if len(solved_problems) > 10 else "beginner"
+        # Convert to Python ints once, then build dicts only at the edge
+        return [
+            {
+                "id": problem_id,
+                "equation": f"{a} {operation.symbol} {b} = ?",
+                "operand1": a,
+                "operand2": b,
+                "result": result,
+                "operation": operation_type,
+                "skill_level": skill_level,
+                "is_complementary": operation.has_flag("is_complementary", a, b, result)
+            }
+            for problem_id, a, b, result in zip(
+                range(start_id, start_id + len(operand1)),
+                operand1.tolist(),
+                operand2.tolist(),
+                results.tolist()
+            )
+        ]
+    
+    def iter_practice_problems(self, skill_level: str = "beginner",
+                               operation_type: str = "addition",
+                               count: int = 5,
+                               seed: Optional[int] = None,
+                               chunk_size: int = 256) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lazily generate practice problems in chunks of at most chunk_size
+        Only one chunk is held in memory at a time, so large sets can be streamed
+        """
+        rng = np.random.default_rng(seed)
         
-        return analysis
\ No newline at end of file
+        for start in range(0, count, chunk_size):
+            yield self.generate_practice_problems_vectorized(
+                skill_level=skill_level,
+                operation_type=operation_type,
+                count=min(chunk_size, count - start),
+                rng=rng,
+                start_id=start + 1
+            )
+    
+    def analyze_learning_progress(self, solved_problems: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Analyze a child's learning progress and suggest next steps
+        This would be used for adaptive learning in the full app
+        For learners with a running history, keep a LearningProgressAggregator instead
+        """
+        return LearningProgressAggregator.from_answers(solved_problems).analysis()
@@ -0,0 +1,395 @@
+"""
+Operation Registry - The arithmetic operations ShapeLearn can visualize and practice
+Each operation declares its symbol, validation bounds, step templates and
+practice rules once. Templates are compiled when an operation is defined into
+nested fill functions: static parts are kept as shared objects and only the
+strings naming operands or the result are formatted, so a transformation costs
+a few dict copies and str.format calls instead of rebuilding the whole structure
+"""
+
+from __future__ import annotations
+
+import operator
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Operand and result bounds for the POC
+MAX_OPERAND = 20
+
+# Placeholders a step template may use in its strings
+TEMPLATE_FIELDS = ("operand1", "operand2", "result")
+
+Fill = Callable[[int, int, int], List[Dict[str, Any]]]
+Predicate = Callable[[int, int, int], bool]
+NodeFill = Callable[[Mapping[str, int]], Any]
+
+
+def _compile_string(text: str) -> Optional[NodeFill]:
+    """Function formatting a template string's placeholders, or None if it has none"""
+    has_fields = False
+    for _, field, spec, _ in Formatter().parse(text):
+        if field is None:
+            continue
+        if field not in TEMPLATE_FIELDS:
+            raise ValueError(f"Unknown template field {field!r} in {text!r}")
+        if "{" in spec:
+            raise ValueError(f"Unsupported format spec {spec!r} in {text!r}")
+        has_fields = True
+    return text.format_map if has_fields else None
+
+
+def _compile_node(node: Any) -> Optional[NodeFill]:
+    """
+    Function rebuilding node with its placeholders filled in, or None if node is
+    static. Static children are reused rather than copied, so they are shared by
+    every value the function produces
+    """
+    if isinstance(node, str):
+        return _compile_string(node)
+
+    if isinstance(node, dict):
+        dynamic = [(key, _compile_node(value)) for key, value in node.items()]
+        dynamic = [(key, fill) for key, fill in dynamic if fill is not None]
+        if not dynamic:
+            return None
+
+        def fill_dict(values: Mapping[str, int]) -> Dict[str, Any]:
+            # Filling a copy of the template keeps its key order
+            filled = dict(node)
+            for key, fill in dynamic:
+                filled[key] = fill(values)
+            return filled
+        return fill_dict
+
+    if isinstance(node, list):
+        parts = [(value, _compile_node(value)) for value in node]
+        if all(fill is None for _, fill in parts):
+            return None
+
+        def fill_list(values: Mapping[str, int]) -> List[Any]:
+            return [value if fill is None else fill(values) for value, fill in parts]
+        return fill_list
+
+    return None
+
+
+def compile_steps(steps: List[Dict[str, Any]]) -> Fill:
+    """
+    Compile a step template into fill(operand1, operand2, result)
+    The template's strings may use {operand1}, {operand2} and {result}; the
+    returned function rebuilds only the dicts and lists on the path to a placeholder
+    """
+    fill = _compile_node(steps)
+    if fill is None:
+        # Static templates still hand out a fresh top-level list
+        return lambda operand1, operand2, result: list(steps)
+
+    def fill_steps(operand1: int, operand2: int, result: int) -> List[Dict[str, Any]]:
+        return fill({"operand1": operand1, "operand2": operand2, "result": result})
+    return fill_steps
+
+
+class PracticeRules:
+    """
+    How practice problems for an operation are drawn at a skill level's operand range
+    draw(randint, min_num, max_num) picks one pair with random.randint semantics;
+    draw_many(rng, min_num, max_num, count) picks count pairs from a NumPy Generator;
+    facts(a, b, min_num, max_num) and difficulty(a, b) map operand grids to the
+    practiced-fact mask and the prior difficulty (-1 easy to 1 hard) used by mastery
+    """
+
+    __slots__ = ("draw", "draw_many", "facts", "difficulty")
+
+    def __init__(self, draw: Callable, draw_many: Callable, facts: Callable, difficulty: Callable):
+        self.draw = draw
+        self.draw_many = draw_many
+        self.facts = facts
+        self.difficulty = difficulty
+
+
+class Operation:
+    """
+    A registered operation: its arithmetic, bounds, compiled step templates and practice rules
+    variants are (name, predicate, steps) in priority order; the first whose
+    predicate holds for (operand1, operand2, result) replaces the default steps,
+    and every variant adds an is_<name> flag to the transformation. Operations
+    without practice rules can be visualized but not practiced
+    """
+
+    __slots__ = ("name", "symbol", "compute", "max_operand", "min_result", "max_result",
+                 "bounds_error", "practice", "_steps", "_variants")
+
+    def __init__(self, name: str, symbol: str, compute: Callable[[int, int], int],
+                 steps: List[Dict[str, Any]],
+                 variants: Optional[List[Tuple[str, Predicate, List[Dict[str, Any]]]]] = None,
+                 max_operand: int = MAX_OPERAND, min_result: Optional[int] = None,
+                 max_result: Optional[int] = None, bounds_error: Optional[str] = None,
+                 practice: Optional[PracticeRules] = None):
+        self.name = name
+        self.symbol = symbol
+        self.compute = compute
+        self.max_operand = max_operand
+        self.min_result = min_result
+        self.max_result = max_result
+        self.bounds_error = bounds_error or f"Result of {name} is out of range"
+        self.practice = practice
+        self._steps = compile_steps(steps)
+        self._variants = [
+            (f"is_{variant}", predicate, compile_steps(variant_steps))
+            for variant, predicate, variant_steps in variants or ()
+        ]
+
+    def in_bounds(self, operand1: int, operand2: int) -> bool:
+        """True if both operands and the result are within the declared bounds"""
+        if not (0 <= operand1 <= self.max_operand and 0 <= operand2 <= self.max_operand):
+            return False
+        result = self.compute(operand1, operand2)
+        return ((self.min_result is None or result >= self.min_result)
+                and (self.max_result is None or result <= self.max_result))
+
+    def check(self, operand1: int, operand2: int) -> Optional[str]:
+        """Error message for integer operands outside the bounds, or None"""
+        if not (0 <= operand1 <= self.max_operand and 0 <= operand2 <= self.max_operand):
+            return f"Numbers must be between 0 and {self.max_operand} for POC"
+        if not self.in_bounds(operand1, operand2):
+            return self.bounds_error
+        return None
+
+    def has_flag(self, flag: str, operand1: int, operand2: int, result: int) -> bool:
+        """True if the variant behind an is_<name> flag matches; False for flags it doesn't declare"""
+        for variant_flag, predicate, _ in self._variants:
+            if variant_flag == flag:
+                return bool(predicate(operand1, operand2, result))
+        return False
+
+    def transformation(self, operand1: int, operand2: int) -> Dict[str, Any]:
+        """
+        Transformation steps for one pair of operands, filled in from the compiled templates
+        Nested static parts are shared between transformations; treat them as read-only
+        """
+        result = self.compute(operand1, operand2)
+        transformation = {
+            "type": self.name,
+            "operand1": operand1,
+            "operand2": operand2,
+            "result": result
+        }
+
+        fill = self._steps
+        chosen = False
+        for flag, predicate, variant_fill in self._variants:
+            matched = predicate(operand1, operand2, result)
+            transformation[flag] = matched
+            if matched and not chosen:
+                fill, chosen = variant_fill, True
+
+        transformation["steps"] = fill(operand1, operand2, result)
+        return transformation
+
+
+# Registered operations by name, in registration order
+OPERATIONS: Dict[str, Operation] = {}
+
+
+def register_operation(operation: Operation) -> Operation:
+    """Add an operation to the registry; its name must not be taken"""
+    if operation.name in OPERATIONS:
+        raise ValueError(f"Operation {operation.name!r} is already registered")
+    OPERATIONS[operation.name] = operation
+    return operation
+
+
+def get_operation(name: Any) -> Optional[Operation]:
+    """The registered operation with this name, or None"""
+    return OPERATIONS.get(name) if isinstance(name, str) else None
+
+
+def get_practice_operation(name: Any) -> Optional[Operation]:
+    """The registered operation with this name if it has practice rules, or None"""
+    operation = get_operation(name)
+    return operation if operation is not None and operation.practice is not None else None
+
+
+def practice_operations() -> Tuple[str, ...]:
+    """Names of the registered operations with practice rules, in registration order"""
+    return tuple(name for name, operation in OPERATIONS.items() if operation.practice is not None)
+
+
+def unsupported_operation_message(practice: bool = False) -> str:
+    """Error for an unknown operation, naming the registered ones (or those that can be practiced)"""
+    names = [f"'{name}'" for name in (practice_operations() if practice else OPERATIONS)]
+    if len(names) == 1:
+        return f"Operation must be {names[0]}"
+    return f"Operation must be {', '.join(names[:-1])} or {names[-1]}"
+
+
+# Built-in operations
+
+def _draw_addition(randint, min_num, max_num):
+    operand1 = randint(min_num, max_num)
+    operand2 = randint(min_num, max_num)
+    # Keep results reasonable for skill level
+    if operand1 + operand2 > max_num * 2:
+        operand1, operand2 = min(operand1, operand2), min_num
+    return operand1, operand2
+
+
+def _draw_many_additions(rng, min_num, max_num, count):
+    operand1 = rng.integers(min_num, max_num, size=count, endpoint=True)
+    operand2 = rng.integers(min_num, max_num, size=count, endpoint=True)
+    too_large = operand1 + operand2 > max_num * 2
+    operand1 = np.where(too_large, np.minimum(operand1, operand2), operand1)
+    operand2 = np.where(too_large, min_num, operand2)
+    return operand1, operand2
+
+
+def _draw_subtraction(randint, min_num, max_num):
+    operand1 = randint(min_num + 1, max_num)
+    # Ensure a non-negative result
+    return operand1, randint(min_num, operand1)
+
+
+def _draw_many_subtractions(rng, min_num, max_num, count):
+    operand1 = rng.integers(min_num + 1, max_num, size=count, endpoint=True)
+    return operand1, rng.integers(min_num, operand1, endpoint=True)
+
+
+register_operation(Operation(
+    name="addition",
+    symbol="+",
+    compute=operator.add,
+    max_result=MAX_OPERAND,
+    bounds_error=f"Result exceeds {MAX_OPERAND} (POC limitation)",
+    # Facts within the skill level's range whose sums the visualizations support
+    practice=PracticeRules(
+        draw=_draw_addition,
+        draw_many=_draw_many_additions,
+        facts=lambda a, b, min_num, max_num: (
+            (a >= min_num) & (a <= max_num) & (b >= min_num) & (b <= max_num) & (a + b <= MAX_OPERAND)
+        ),
+        difficulty=lambda a, b: (a + b) / MAX_OPERAND * 2 - 1
+    ),
+    # General addition transformation
+    steps=[
+        {
+            "step": 1,
+            "description": "Starting with {operand1} and {operand2}",
+            "animation": "present_operands",
+            "duration": 1000,
+            "shapes": {
+                "operand1": {"position": [-2, 0, 0], "scale": [1, 1, 1]},
+                "operand2": {"position": [2, 0, 0], "scale": [1, 1, 1]}
+            }
+        },
+        {
+            "step": 2,
+            "description": "Bringing {operand1} and {operand2} together",
+            "animation": "move_together",
+            "duration": 2000,
+            "shapes": {
+                "operand1": {"position": [-0.5, 0, 0]},
+                "operand2": {"position": [0.5, 0, 0]}
+            }
+        },
+        {
+            "step": 3,
+            "description": "They combine to form {result}!",
+            "animation": "transform_to_result",
+            "duration": 1500,
+            "shapes": {
+                "result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2]}
+            }
+        }
+    ],
+    # Complementary numbers (adding to 10) have natural linking points
+    variants=[(
+        "complementary",
+        lambda operand1, operand2, result: result == 10,
+        [
+            {
+                "step": 1,
+                "description": "Number {operand1} and {operand2} are complementary - they naturally fit together",
+                "animation": "highlight_complementary",
+                "duration": 1000,
+                "shapes": {
+                    "operand1": {"position": [-2, 0, 0], "scale": [1, 1, 1]},
+                    "operand2": {"position": [2, 0, 0], "scale": [1, 1, 1]}
+                }
+            },
+            {
+                "step": 2,
+                "description": "Watch how {operand1} and {operand2} connect at their natural linking points",
+                "animation": "move_to_link",
+                "duration": 2000,
+                "shapes": {
+                    "operand1": {"position": [-0.8, 0, 0], "rotation": [0, 0, 0]},
+                    "operand2": {"position": [0.8, 0, 0], "rotation": [0, 0, 0]}
+                }
+            },
+            {
+                "step": 3,
+                "description": "The shapes flow together to create 10!",
+                "animation": "merge_to_result",
+                "duration": 1500,
+                "shapes": {
+                    "result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2]}
+                }
+            }
+        ]
+    )]
+))
+
+# Subtraction as the larger number transforming when the smaller one "phases through"
+register_operation(Operation(
+    name="subtraction",
+    symbol="-",
+    compute=operator.sub,
+    min_result=0,
+    bounds_error="Cannot subtract larger number from smaller (avoiding negative results in POC)",
+    # No negative differences; subtraction that needs borrowing is harder
+    practice=PracticeRules(
+        draw=_draw_subtraction,
+        draw_many=_draw_many_subtractions,
+        facts=lambda a, b, min_num, max_num: (a >= min_num + 1) & (a <= max_num) & (b >= min_num) & (b <= a),
+        difficulty=lambda a, b: a / MAX_OPERAND * 2 - 1 + 0.5 * ((a % 10) < (b % 10))
+    ),
+    steps=[
+        {
+            "step": 1,
+            "description": "Starting with {operand1}",
+            "animation": "present_minuend",
+            "duration": 1000,
+            "shapes": {
+                "operand1": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2], "opacity": 1}
+            }
+        },
+        {
+            "step": 2,
+            "description": "Watch as {operand2} phases through like a storm",
+            "animation": "subtraction_storm",
+            "duration": 2500,
+            "shapes": {
+                "operand1": {"opacity": 0.7, "color_shift": True},
+                "operand2": {
+                    "position": [-3, 0, 0],
+                    "target_position": [3, 0, 0],
+                    "opacity": 0.6,
+                    "effect": "phasing"
+                }
+            }
+        },
+        {
+            "step": 3,
+            "description": "The transformation leaves us with {result}!",
+            "animation": "reveal_result",
+            "duration": 1500,
+            "shapes": {
+                "result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2], "opacity": 1}
+            }
+        }
+    ]
+))
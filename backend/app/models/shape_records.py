@@ -0,0 +1,67 @@
+"""
+Compact shape records for compound numbers
+Compound shapes reference their digit base shapes by id instead of embedding
+copies, so the engine holds each base geometry once and the compact wire
+format sends the base shape table a single time
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ComponentRef:
+    """One digit slot of a compound shape, pointing at a base shape by id"""
+
+    __slots__ = ("shape_id", "position", "label")
+
+    shape_id: int
+    position: Tuple[float, float, float]
+    label: str
+
+    def to_dict(self, base_shapes: Optional[Mapping[int, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Expanded component when base_shapes is given, otherwise a compact reference"""
+        if base_shapes is None:
+            return {
+                "shape_ref": self.shape_id,
+                "position": list(self.position),
+                "label": self.label
+            }
+        return {
+            "shape": base_shapes[self.shape_id].copy(),
+            "position": list(self.position),
+            "label": self.label
+        }
+
+
+@dataclass(frozen=True)
+class CompoundShapeRecord:
+    """Immutable compound number shape; empty digit slots are None"""
+
+    __slots__ = ("number", "components", "color", "description")
+
+    number: int
+    components: Tuple[Optional[ComponentRef], ...]
+    color: str
+    description: str
+
+    @property
+    def base_shape_ids(self) -> Tuple[int, ...]:
+        """Ids of the base shapes this compound references"""
+        return tuple(sorted({c.shape_id for c in self.components if c is not None}))
+
+    def to_dict(self, base_shapes: Optional[Mapping[int, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Shape definition dict for the API
+        With base_shapes the components embed copies of the base shapes (the
+        original format); without, they carry shape_ref ids into the base table
+        """
+        return {
+            "type": "compound",
+            "components": [
+                component.to_dict(base_shapes) if component is not None else None
+                for component in self.components
+            ],
+            "color": self.color,
+            "description": self.description
+        }
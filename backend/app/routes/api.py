@@ -2,24 +2,108 @@
 Main API routes for ShapeLearn math operations
 """
 
-from flask import Blueprint, request, jsonify
-from ..models.math_operations import MathShapeEngine
+import json
+import threading
+
+from flask import Blueprint, Response, current_app, request, jsonify
+from ..models.geometry import LOD_LEVELS
+from ..models.keyframes import EASINGS, MAX_FPS, MIN_FPS
+from ..models.math_operations import MAX_OPERAND, PRACTICE_RANGES, MathShapeEngine
+from ..models.operations import get_operation, get_practice_operation, unsupported_operation_message
+from ..utils.response_cache import ResponseCache, cached_response
+from ..utils.wire_format import msgpack_response, prefers_msgpack
 
 api_bp = Blueprint('api', __name__)
 
-# Initialize the math shape engine
-math_engine = MathShapeEngine()
+# The math shape engine is built on first use (or by create_app's warm-up),
+# not at import time
+_math_engine = None
+_math_engine_lock = threading.Lock()
 
-@api_bp.route('/shapes', methods=['GET'])
-def get_all_shapes():
-    """Get shape definitions for all numbers 0-20"""
-    try:
-        shapes = math_engine.get_number_shapes()
-        return jsonify({
+def get_math_engine():
+    """Return the shared MathShapeEngine, constructing it on first call"""
+    global _math_engine
+    engine = _math_engine
+    if engine is None:
+        with _math_engine_lock:
+            engine = _math_engine
+            if engine is None:
+                engine = _math_engine = MathShapeEngine()
+    return engine
+
+# Shape payloads are static, so they are serialized once and reused
+shape_response_cache = ResponseCache()
+
+SHAPE_FORMATS = ('full', 'compact')
+
+def _get_shapes_payload(shape_format='full'):
+    """Cached payload for all shape definitions"""
+    def build_payload():
+        if shape_format == 'compact':
+            table = get_math_engine().get_compact_shapes(range(MAX_OPERAND + 1))
+            return {
+                "success": True,
+                "format": "compact",
+                "base_shapes": table["base_shapes"],
+                "shapes": table["shapes"],
+                "total_numbers": len(table["shapes"])
+            }
+        
+        shapes = get_math_engine().get_number_shapes()
+        return {
             "success": True,
             "shapes": shapes,
             "total_numbers": len(shapes)
-        })
+        }
+    
+    return shape_response_cache.get_or_build(('shapes', shape_format), build_payload)
+
+def _get_shape_payload(number, shape_format='full'):
+    """Cached payload for a single number's shape definition"""
+    def build_payload():
+        if shape_format == 'compact':
+            table = get_math_engine().get_compact_shapes([number])
+            return {
+                "success": True,
+                "format": "compact",
+                "number": number,
+                "base_shapes": table["base_shapes"],
+                "shape": table["shapes"][number]
+            }
+        
+        return {
+            "success": True,
+            "number": number,
+            "shape": get_math_engine().get_shape_for_number(number)
+        }
+    
+    return shape_response_cache.get_or_build(('shape', number, shape_format), build_payload)
+
+def warm_up_payloads():
+    """Serialize and precompress the static shape payloads (needs an app context)"""
+    for shape_format in SHAPE_FORMATS:
+        _get_shapes_payload(shape_format)
+    for number in range(MAX_OPERAND + 1):
+        _get_shape_payload(number)
+
+def _invalid_format_response():
+    return jsonify({
+        "success": False,
+        "error": "Format must be 'full' or 'compact'"
+    }), 400
+
+@api_bp.route('/shapes', methods=['GET'])
+def get_all_shapes():
+    """
+    Get shape definitions for all numbers 0-20
+    ?format=compact sends each base shape once and compounds as shape_ref references
+    """
+    try:
+        shape_format = request.args.get('format', 'full')
+        if shape_format not in SHAPE_FORMATS:
+            return _invalid_format_response()
+        
+        return cached_response(_get_shapes_payload(shape_format))
     except Exception as e:
         return jsonify({
             "success": False,
@@ -28,31 +112,125 @@ def get_all_shapes():
 
 @api_bp.route('/shapes/<int:number>', methods=['GET'])
 def get_number_shape(number):
-    """Get shape definition for a specific number"""
+    """
+    Get shape definition for a specific number
+    ?format=compact returns compounds as references into the included base shapes
+    """
     try:
         if number < 0 or number > 100:
             return jsonify({
                 "success": False,
                 "error": "Number must be between 0 and 100"
             }), 400
+        
+        shape_format = request.args.get('format', 'full')
+        if shape_format not in SHAPE_FORMATS:
+            return _invalid_format_response()
             
-        shape = math_engine.get_shape_for_number(number)
+        return cached_response(_get_shape_payload(number, shape_format))
+    except Exception as e:
         return jsonify({
-            "success": True,
-            "number": number,
-            "shape": shape
-        })
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api_bp.route('/shapes/<int:number>/geometry', methods=['GET'])
+def get_shape_geometry(number):
+    """
+    Get pre-tessellated vertex/normal/index buffers for a number's curved shapes
+    Query: ?lod=low|medium|high (default medium)
+    """
+    try:
+        if number < 0 or number > 100:
+            return jsonify({
+                "success": False,
+                "error": "Number must be between 0 and 100"
+            }), 400
+        
+        lod = request.args.get('lod', 'medium')
+        if lod not in LOD_LEVELS:
+            return jsonify({
+                "success": False,
+                "error": f"Level of detail must be one of {', '.join(LOD_LEVELS)}"
+            }), 400
+        
+        def build_payload():
+            return {"success": True, **get_math_engine().get_tessellated_shape(number, lod)}
+        
+        return cached_response(shape_response_cache.get_or_build(('geometry', number, lod), build_payload))
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
+def is_valid_seed(seed):
+    """True for a missing seed or one NumPy accepts: a non-negative integer (not a bool)"""
+    return seed is None or (isinstance(seed, int) and not isinstance(seed, bool) and seed >= 0)
+
+def validate_operation(operation, operand1, operand2):
+    """
+    Return an error message for an invalid operation request, or None if it is valid
+    Bounds come from the operation's registry entry
+    """
+    spec = get_operation(operation)
+    if spec is None:
+        return unsupported_operation_message()
+        
+    if not isinstance(operand1, int) or not isinstance(operand2, int):
+        return "Operands must be integers"
+    
+    return spec.check(operand1, operand2)
+
+def parse_keyframe_options(options):
+    """
+    Validate the optional "keyframes" request field
+    Accepts true (defaults) or {"fps": 30, "easing": "ease_in_out"}; returns (options, error)
+    """
+    if options is None or options is False:
+        return None, None
+    if options is True:
+        options = {}
+    if not isinstance(options, dict):
+        return None, "keyframes must be true or an object with fps and easing"
+    
+    fps = options.get('fps', 30)
+    easing = options.get('easing', 'ease_in_out')
+    if isinstance(fps, bool) or not isinstance(fps, int) or not MIN_FPS <= fps <= MAX_FPS:
+        return None, f"keyframes.fps must be an integer between {MIN_FPS} and {MAX_FPS}"
+    if easing not in EASINGS:
+        return None, f"keyframes.easing must be one of {', '.join(EASINGS)}"
+    
+    return {"fps": fps, "easing": easing}, None
+
+def build_operation_response(operation, operand1, operand2, keyframes=None):
+    """
+    Build the response body for a validated operation from the precomputed table
+    keyframes, as returned by parse_keyframe_options, adds sampled animation tracks
+    """
+    transformation = get_math_engine().get_transformation(operation, operand1, operand2)
+    result = transformation["result"]
+    
+    payload = {
+        "success": True,
+        "operation": operation,
+        "operand1": operand1,
+        "operand2": operand2,
+        "result": result,
+        "transformation": transformation,
+        "equation": f"{operand1} {get_operation(operation).symbol} {operand2} = {result}"
+    }
+    if keyframes:
+        payload["keyframes"] = get_math_engine().get_keyframes(operation, operand1, operand2, **keyframes)
+    return payload
+
 @api_bp.route('/operation', methods=['POST'])
 def calculate_operation():
     """
     Calculate math operation and return transformation steps
     Expected JSON: {"operation": "addition", "operand1": 3, "operand2": 7}
+    Optional "keyframes": true or {"fps": 30, "easing": "ease_in_out"} adds sampled animation tracks
+    Send Accept: application/x-msgpack for a MessagePack body with Float32-packed vectors
     """
     try:
         data = request.get_json()
@@ -68,52 +246,75 @@ def calculate_operation():
         operand2 = data.get('operand2')
         
         # Validate inputs
-        if operation not in ['addition', 'subtraction']:
+        error = validate_operation(operation, operand1, operand2)
+        if not error:
+            keyframes, error = parse_keyframe_options(data.get('keyframes'))
+        if error:
             return jsonify({
                 "success": False,
-                "error": "Operation must be 'addition' or 'subtraction'"
+                "error": error
             }), 400
-            
-        if not isinstance(operand1, int) or not isinstance(operand2, int):
+        
+        payload = build_operation_response(operation, operand1, operand2, keyframes)
+        if prefers_msgpack(request.accept_mimetypes):
+            return msgpack_response(payload)
+        response = jsonify(payload)
+        response.vary.add('Accept')
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api_bp.route('/operations/batch', methods=['POST'])
+def calculate_operations_batch():
+    """
+    Calculate many math operations in one request
+    Expected JSON: {"operations": [{"operation": "addition", "operand1": 3, "operand2": 7}, ...]}
+    (a bare list of operations is accepted too)
+    Each item gets its own result or error; the batch only fails as a whole on a malformed body
+    """
+    try:
+        data = request.get_json()
+        
+        items = data.get('operations') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                "success": False,
+                "error": "Expected a non-empty list of operations"
+            }), 400
+        
+        max_batch_size = current_app.config.get('OPERATION_BATCH_MAX_SIZE', 100)
+        if len(items) > max_batch_size:
             return jsonify({
                 "success": False,
-                "error": "Operands must be integers"
+                "error": f"Batch is limited to {max_batch_size} operations"
             }), 400
+        
+        results = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                error = "Each operation must be a JSON object"
+            else:
+                operation = item.get('operation')
+                operand1 = item.get('operand1')
+                operand2 = item.get('operand2')
+                error = validate_operation(operation, operand1, operand2)
             
-        if operand1 < 0 or operand1 > 20 or operand2 < 0 or operand2 > 20:
-            return jsonify({
-                "success": False,
-                "error": "Numbers must be between 0 and 20 for POC"
-            }), 400
-        
-        # Calculate result and get transformation
-        if operation == 'addition':
-            result = operand1 + operand2
-            if result > 20:  # Keep POC simple
-                return jsonify({
-                    "success": False,
-                    "error": "Result exceeds 20 (POC limitation)"
-                }), 400
-                
-            transformation = math_engine.get_addition_transformation(operand1, operand2)
-        else:  # subtraction
-            if operand2 > operand1:
-                return jsonify({
-                    "success": False,
-                    "error": "Cannot subtract larger number from smaller (avoiding negative results in POC)"
-                }), 400
-                
-            result = operand1 - operand2
-            transformation = math_engine.get_subtraction_transformation(operand1, operand2)
+            if error:
+                results.append({"index": index, "success": False, "error": error})
+            else:
+                results.append({"index": index, **build_operation_response(operation, operand1, operand2)})
         
+        succeeded = sum(1 for result in results if result["success"])
         return jsonify({
             "success": True,
-            "operation": operation,
-            "operand1": operand1,
-            "operand2": operand2,
-            "result": result,
-            "transformation": transformation,
-            "equation": f"{operand1} {'+' if operation == 'addition' else '-'} {operand2} = {result}"
+            "results": results,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded
         })
         
     except Exception as e:
@@ -122,23 +323,79 @@ def calculate_operation():
             "error": str(e)
         }), 500
 
+def _ndjson_lines(chunks):
+    """Encode each chunk of problems as one block of newline-delimited JSON"""
+    for problems in chunks:
+        yield ''.join(json.dumps(problem, separators=(',', ':')) + '\n' for problem in problems)
+
 @api_bp.route('/practice', methods=['POST'])
 def generate_practice_problems():
     """
     Generate practice problems based on current skill level
     Expected JSON: {"skill_level": "beginner", "operation_type": "addition", "count": 5}
+    An optional integer "seed" makes the generated set reproducible
+    With "stream": true (or Accept: application/x-ndjson) problems are streamed
+    as newline-delimited JSON while they are generated, allowing larger counts
     """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        
+        if not isinstance(data, dict):
+            return jsonify({
+                "success": False,
+                "error": "No JSON data provided"
+            }), 400
         
         skill_level = data.get('skill_level', 'beginner')
         operation_type = data.get('operation_type', 'addition')
         count = data.get('count', 5)
+        seed = data.get('seed')
+        stream = bool(data.get('stream')) or \
+            request.accept_mimetypes.best == 'application/x-ndjson'
+        
+        if skill_level not in PRACTICE_RANGES:
+            return jsonify({
+                "success": False,
+                "error": f"Skill level must be one of {', '.join(PRACTICE_RANGES)}"
+            }), 400
+        
+        if get_practice_operation(operation_type) is None:
+            return jsonify({
+                "success": False,
+                "error": unsupported_operation_message(practice=True)
+            }), 400
+        
+        if not is_valid_seed(seed):
+            return jsonify({
+                "success": False,
+                "error": "Seed must be a non-negative integer"
+            }), 400
+        
+        max_count = current_app.config.get(
+            'PRACTICE_STREAM_MAX_COUNT' if stream else 'PRACTICE_MAX_COUNT',
+            10000 if stream else 100
+        )
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1 or count > max_count:
+            return jsonify({
+                "success": False,
+                "error": f"Count must be an integer between 1 and {max_count}"
+            }), 400
+        
+        if stream:
+            chunks = get_math_engine().iter_practice_problems(
+                skill_level=skill_level,
+                operation_type=operation_type,
+                count=count,
+                seed=seed,
+                chunk_size=current_app.config.get('PRACTICE_STREAM_CHUNK_SIZE', 256)
+            )
+            return Response(_ndjson_lines(chunks), mimetype='application/x-ndjson')
         
-        problems = math_engine.generate_practice_problems(
+        problems = get_math_engine().generate_practice_problems(
             skill_level=skill_level,
             operation_type=operation_type,
-            count=count
+            count=count,
+            seed=seed
         )
         
         return jsonify({
@@ -152,4 +409,93 @@ def generate_practice_problems():
         return jsonify({
             "success": False,
             "error": str(e)
-        }), 500 
\ No newline at end of file
+        }), 500
+
+@api_bp.route('/practice/adaptive', methods=['POST'])
+def generate_adaptive_practice():
+    """
+    Generate practice problems targeted at a learner's weakest facts
+    Expected JSON: {"learner_id": "sam", "skill_level": "beginner",
+                    "operation_type": "addition", "count": 5}
+    Send "learner_ids": [...] instead to select for a whole group in one pass;
+    an optional integer "seed" makes the selection reproducible
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                "success": False,
+                "error": "No JSON data provided"
+            }), 400
+        
+        learner_ids = data.get('learner_ids')
+        single = learner_ids is None
+        if single:
+            learner_ids = [data.get('learner_id')]
+        skill_level = data.get('skill_level', 'beginner')
+        operation_type = data.get('operation_type', 'addition')
+        count = data.get('count', 5)
+        seed = data.get('seed')
+        
+        if (not isinstance(learner_ids, list) or not learner_ids
+                or not all(isinstance(learner_id, str) and learner_id for learner_id in learner_ids)):
+            return jsonify({
+                "success": False,
+                "error": "Provide a learner_id or a non-empty list of learner_ids"
+            }), 400
+        
+        if skill_level not in PRACTICE_RANGES:
+            return jsonify({
+                "success": False,
+                "error": f"Skill level must be one of {', '.join(PRACTICE_RANGES)}"
+            }), 400
+        
+        if get_practice_operation(operation_type) is None:
+            return jsonify({
+                "success": False,
+                "error": unsupported_operation_message(practice=True)
+            }), 400
+        
+        max_count = current_app.config.get('PRACTICE_MAX_COUNT', 100)
+        if not isinstance(count, int) or count < 1 or count > max_count:
+            return jsonify({
+                "success": False,
+                "error": f"Count must be an integer between 1 and {max_count}"
+            }), 400
+        
+        if not is_valid_seed(seed):
+            return jsonify({
+                "success": False,
+                "error": "Seed must be a non-negative integer"
+            }), 400
+        
+        selections = current_app.extensions['adaptive_selector'].select(
+            learner_ids, operation_type, skill_level, count, seed
+        )
+        
+        engine = get_math_engine()
+        problems_by_learner = {}
+        for learner_id, (operand1, operand2, mastery) in selections.items():
+            problems = engine.build_practice_problems(operand1, operand2, skill_level, operation_type)
+            for problem, fact_mastery in zip(problems, mastery):
+                problem["mastery"] = fact_mastery
+            problems_by_learner[learner_id] = problems
+        
+        payload = {
+            "success": True,
+            "skill_level": skill_level,
+            "operation_type": operation_type
+        }
+        if single:
+            payload["learner_id"] = learner_ids[0]
+            payload["problems"] = problems_by_learner[learner_ids[0]]
+        else:
+            payload["problems_by_learner"] = problems_by_learner
+        return jsonify(payload)
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
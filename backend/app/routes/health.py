@@ -2,7 +2,7 @@
 Health check routes for ShapeLearn backend
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify
 
 health_bp = Blueprint('health', __name__)
 
@@ -13,4 +13,15 @@ def health_check():
         "status": "healthy",
         "service": "ShapeLearn Math API",
         "version": "0.1.0"
-    }) 
\ No newline at end of file
+    })
+
+@health_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Request, payload size and cache metrics in the Prometheus text format"""
+    registry = current_app.extensions.get('metrics')
+    if registry is None:
+        return jsonify({
+            "success": False,
+            "error": "Metrics are disabled"
+        }), 404
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
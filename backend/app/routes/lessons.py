@@ -0,0 +1,401 @@
+"""
+Guided lesson routes for ShapeLearn
+A lesson streams its equations and their transformation steps as server-sent
+events on one long-lived connection; answers are posted separately and the
+next problem is pushed down the stream as soon as one is checked
+"""
+
+import json
+import time
+
+from flask import Blueprint, Response, current_app, request, jsonify, url_for
+from ..models.math_operations import PRACTICE_RANGES
+from ..models.operations import get_operation, get_practice_operation, unsupported_operation_message
+from ..services.learner_progress import record_learner_answers
+from ..services.lesson_sessions import FINAL_EVENTS
+from ..utils.lazy_import import lazy_import
+from .api import get_math_engine, is_valid_seed
+
+np = lazy_import("numpy")
+
+lessons_bp = Blueprint('lessons', __name__)
+
+HEARTBEAT = ": heartbeat\n\n"
+
+# Seconds a client is asked to wait when every stream slot is taken
+STREAM_RETRY_AFTER = 5
+
+# Batches of practice problems drawn before giving up on filling a lesson
+MAX_DRAW_ROUNDS = 20
+
+def _get_sessions():
+    return current_app.extensions['lesson_sessions']
+
+def sse_event(event, data, event_id=None):
+    """Encode one server-sent event"""
+    lines = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{lines}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+def resume_after(sessions, session_id, last_event_id):
+    """Sequence number a new stream starts after: Last-Event-ID on reconnect, else the current problem"""
+    last_event_id = (last_event_id or '').strip()
+    return int(last_event_id) if last_event_id.isdigit() else sessions.resume_point(session_id)
+
+def retry_field(poll_interval):
+    """SSE reconnect delay, a little over one poll so a reconnect finds new events"""
+    return f"retry: {int(poll_interval * 1000) + 1000}\n\n"
+
+def lesson_event_chunks(problems, seq, event, data, pace):
+    """
+    Encode one stored lesson event as [(delay in seconds before sending, SSE text), ...]
+    A problem event is followed by one step event per transformation step, spaced
+    by the previous step's duration when pace is set
+    """
+    if event != "problem":
+        return [(0, sse_event(event, data, seq))]
+
+    problem = problems[data["index"]]
+    steps = get_math_engine().get_transformation(
+        problem["operation"], problem["operand1"], problem["operand2"]
+    )["steps"]
+    chunks = [(0, sse_event(event, {
+        **data,
+        "total": len(problems),
+        "problem": problem,
+        "step_count": len(steps)
+    }, seq))]
+    for number, step in enumerate(steps):
+        delay = steps[number - 1].get("duration", 0) / 1000 if pace and number else 0
+        chunks.append((delay, sse_event("step", {"index": data["index"], **step})))
+    return chunks
+
+def transformable_problems(engine, skill_level, operation_type, count, seed=None):
+    """
+    Practice problems whose transformations the engine can show
+    The practice ranges allow some results the visualizations don't cover
+    (e.g. advanced sums above 20), so problems are drawn in batches and
+    filtered on the operation's bounds until count are found
+    """
+    operation = get_operation(operation_type)
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(MAX_DRAW_ROUNDS):
+        batch = engine.generate_practice_problems_vectorized(
+            skill_level=skill_level, operation_type=operation_type, count=count, rng=rng
+        )
+        problems.extend(
+            problem for problem in batch
+            if operation.in_bounds(problem["operand1"], problem["operand2"])
+        )
+        if len(problems) >= count:
+            break
+    else:
+        raise ValueError(f"Could not draw {count} {operation_type} problems to visualize")
+    
+    problems = problems[:count]
+    for problem_id, problem in enumerate(problems, start=1):
+        problem["id"] = problem_id
+    return problems
+
+class LessonStream:
+    """
+    What one lesson event stream sends, shared by the Flask view and the ASGI handler
+    The servers fetch events and wait between polls their own way, then hand the
+    results here; the stream is over once finished is set
+    """
+    
+    def __init__(self, session, after, pace, heartbeat_interval, poll_interval):
+        self.session = session
+        self.after = after
+        self.pace = pace
+        self.heartbeat_interval = heartbeat_interval
+        self.wait_timeout = min(poll_interval, heartbeat_interval)
+        self.opening = retry_field(poll_interval)
+        self.finished = False
+        self._last_sent = time.monotonic()
+    
+    def chunks(self, events):
+        """[(delay in seconds, SSE text), ...] for events fetched after self.after"""
+        chunks = []
+        for seq, event, data in events:
+            self.after = seq
+            chunks.extend(lesson_event_chunks(self.session["problems"], seq, event, data, self.pace))
+            if event in FINAL_EVENTS:
+                self.finished = True
+                break
+        if events:
+            self._last_sent = time.monotonic()
+        return chunks
+    
+    def heartbeat_due(self):
+        return not self.finished and time.monotonic() - self._last_sent >= self.heartbeat_interval
+    
+    def heartbeat(self, session_exists):
+        """Text to send after an idle heartbeat interval; a lesson deleted meanwhile has expired"""
+        self._last_sent = time.monotonic()
+        if not session_exists:
+            self.finished = True
+            return sse_event("closed", {})
+        return HEARTBEAT
+
+def open_lesson_stream(sessions, session, last_event_id, pace_arg, config):
+    """A LessonStream for a found session, from the request's Last-Event-ID and ?pace"""
+    return LessonStream(
+        session,
+        resume_after(sessions, session["id"], last_event_id),
+        (pace_arg or 'true').lower() != 'false',
+        heartbeat_interval=config.get('LESSON_HEARTBEAT_INTERVAL', 15.0),
+        poll_interval=config.get('LESSON_POLL_INTERVAL', 0.5)
+    )
+
+def _lesson_events(sessions, stream):
+    """Yield a lesson's events until it is over, waiting on this thread"""
+    session_id = stream.session["id"]
+    
+    yield stream.opening
+    while True:
+        version = sessions.version
+        for delay, chunk in stream.chunks(sessions.events(session_id, stream.after)):
+            if delay:
+                time.sleep(delay)
+            yield chunk
+        if stream.heartbeat_due():
+            yield stream.heartbeat(sessions.get(session_id) is not None)
+        if stream.finished:
+            return
+        
+        sessions.wait(version, stream.wait_timeout)
+
+def _record_lesson_answer(learner_id, result, response_time):
+    """Add a checked lesson answer to the learner's progress"""
+    problem = result["problem"]
+    answer = {
+        "operation": problem["operation"],
+        "operand1": problem["operand1"],
+        "operand2": problem["operand2"],
+        "correct": result["correct"],
+        "response_time": response_time
+    }
+    record_learner_answers(current_app.extensions, learner_id, [answer])
+
+@lessons_bp.route('', methods=['POST'])
+def create_lesson():
+    """
+    Start a guided lesson
+    Expected JSON: {"skill_level": "beginner", "operation_type": "addition", "count": 10}
+    An optional "learner_id" picks problems for that learner's weakest facts and
+    records the lesson's answers to their progress; "seed" makes the set reproducible
+    """
+    try:
+        data = request.get_json() or {}
+        
+        skill_level = data.get('skill_level', 'beginner')
+        operation_type = data.get('operation_type', 'addition')
+        count = data.get('count', 10)
+        seed = data.get('seed')
+        learner_id = data.get('learner_id')
+        max_count = current_app.config.get('LESSON_MAX_PROBLEMS', 50)
+        
+        if skill_level not in PRACTICE_RANGES:
+            return jsonify({
+                "success": False,
+                "error": f"Skill level must be one of {', '.join(PRACTICE_RANGES)}"
+            }), 400
+        
+        if get_practice_operation(operation_type) is None:
+            return jsonify({
+                "success": False,
+                "error": unsupported_operation_message(practice=True)
+            }), 400
+        
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1 or count > max_count:
+            return jsonify({
+                "success": False,
+                "error": f"Count must be an integer between 1 and {max_count}"
+            }), 400
+        
+        if not is_valid_seed(seed):
+            return jsonify({
+                "success": False,
+                "error": "Seed must be a non-negative integer"
+            }), 400
+        
+        if learner_id is not None and (not isinstance(learner_id, str) or not learner_id):
+            return jsonify({
+                "success": False,
+                "error": "Learner id must be a non-empty string"
+            }), 400
+        
+        engine = get_math_engine()
+        if learner_id is not None:
+            selected = current_app.extensions['adaptive_selector'].select(
+                [learner_id], operation_type, skill_level, count, seed=seed
+            )
+            operand1, operand2, _ = selected[learner_id]
+            problems = engine.build_practice_problems(operand1, operand2, skill_level, operation_type)
+        else:
+            problems = transformable_problems(engine, skill_level, operation_type, count, seed)
+        
+        # Every problem's steps are streamed, so each must have a transformation
+        operation = get_operation(operation_type)
+        for problem in problems:
+            if not operation.in_bounds(problem["operand1"], problem["operand2"]):
+                return jsonify({
+                    "success": False,
+                    "error": f"Problem {problem['equation']} can't be visualized"
+                }), 400
+        
+        session_id = _get_sessions().create(problems, learner_id=learner_id)
+        
+        return jsonify({
+            "success": True,
+            "session_id": session_id,
+            "total": len(problems),
+            "events_url": url_for('lessons.stream_lesson_events', session_id=session_id),
+            "answers_url": url_for('lessons.answer_lesson_problem', session_id=session_id)
+        }), 201
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@lessons_bp.route('/<session_id>/events', methods=['GET'])
+def stream_lesson_events(session_id):
+    """
+    Stream a lesson as server-sent events (text/event-stream)
+    Each stream holds a server thread, so at most LESSON_MAX_STREAMS are open
+    per process; beyond that the response is 503 with Retry-After
+    Events: problem (with the equation), step (one per transformation step),
+    feedback (after each answer), then complete or closed. Steps are spaced by
+    their animation durations unless ?pace=false. A reconnect sending
+    Last-Event-ID resumes after that event; otherwise the stream starts at the
+    current problem
+    """
+    try:
+        sessions = _get_sessions()
+        session = sessions.get(session_id)
+        if session is None:
+            return jsonify({
+                "success": False,
+                "error": "Lesson not found"
+            }), 404
+        
+        # Each open stream holds this server thread until the lesson ends
+        slots = current_app.extensions['lesson_stream_slots']
+        if not slots.acquire(blocking=False):
+            response = jsonify({
+                "success": False,
+                "error": "Too many lesson streams are open, please retry shortly"
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = str(STREAM_RETRY_AFTER)
+            return response
+        
+        try:
+            stream = open_lesson_stream(
+                sessions, session, request.headers.get('Last-Event-ID'), request.args.get('pace'),
+                current_app.config
+            )
+            response = Response(_lesson_events(sessions, stream), mimetype='text/event-stream')
+        except Exception:
+            slots.release()
+            raise
+        # Released when the server closes the response, whether or not the stream was read
+        response.call_on_close(slots.release)
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop proxies such as nginx from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@lessons_bp.route('/<session_id>/answers', methods=['POST'])
+def answer_lesson_problem(session_id):
+    """
+    Answer the lesson's current problem
+    Expected JSON: {"answer": 7, "response_time": 3.2}
+    Feedback and the next problem are pushed to the event stream, and the
+    feedback is returned here too
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                "success": False,
+                "error": "No JSON data provided"
+            }), 400
+        
+        answer = data.get('answer')
+        response_time = data.get('response_time')
+        if not isinstance(answer, int) or isinstance(answer, bool):
+            return jsonify({
+                "success": False,
+                "error": "Answer must be an integer"
+            }), 400
+        
+        if response_time is not None and (
+                not isinstance(response_time, (int, float)) or isinstance(response_time, bool)
+                or response_time < 0):
+            return jsonify({
+                "success": False,
+                "error": "Response time must be a non-negative number of seconds"
+            }), 400
+        
+        sessions = _get_sessions()
+        try:
+            result = sessions.answer(session_id, answer)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 409
+        if result is None:
+            return jsonify({
+                "success": False,
+                "error": "Lesson not found"
+            }), 404
+        
+        if result["learner_id"] is not None:
+            _record_lesson_answer(result["learner_id"], result, response_time)
+        
+        return jsonify({
+            "success": True,
+            "index": result["index"],
+            "correct": result["correct"],
+            "expected": result["expected"],
+            "status": result["status"]
+        })
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@lessons_bp.route('/<session_id>', methods=['DELETE'])
+def close_lesson(session_id):
+    """End a lesson early; its event stream receives a closed event"""
+    try:
+        if not _get_sessions().close(session_id):
+            return jsonify({
+                "success": False,
+                "error": "Lesson not found"
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "session_id": session_id
+        })
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
@@ -0,0 +1,290 @@
+"""
+Learning progress routes for ShapeLearn
+Answers are recorded as they are submitted, stored locally, and analyzed
+from running statistics
+"""
+
+import math
+
+from flask import Blueprint, current_app, request, jsonify
+from ..models.class_analytics import analyze_class, columns_from_answers
+from ..models.learning_progress import LearningProgressAggregator
+from ..models.operations import MAX_OPERAND, get_operation, get_practice_operation, unsupported_operation_message
+from ..services.learner_progress import record_learner_answers
+
+progress_bp = Blueprint('progress', __name__)
+
+def _get_registry():
+    return current_app.extensions['learner_progress']
+
+def _get_store():
+    return current_app.extensions['progress_store']
+
+def _get_selector():
+    return current_app.extensions['adaptive_selector']
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def validate_answer(answer):
+    """Return an error message for an invalid submitted answer, or None if it is valid"""
+    if not isinstance(answer, dict):
+        return "Each answer must be a JSON object"
+    
+    if get_operation(answer.get('operation')) is None:
+        return unsupported_operation_message()
+    
+    if not isinstance(answer.get('correct'), bool):
+        return "Correct must be true or false"
+    
+    for operand in ('operand1', 'operand2'):
+        value = answer.get(operand)
+        if value is None:
+            continue
+        if not isinstance(value, int) or isinstance(value, bool):
+            return "Operands must be integers"
+        if not 0 <= value <= MAX_OPERAND:
+            return f"Operands must be between 0 and {MAX_OPERAND}"
+    
+    response_time = answer.get('response_time')
+    if response_time is not None and (not _is_number(response_time) or not 0 <= response_time < math.inf):
+        return "Response time must be a non-negative number of seconds"
+    
+    answered_at = answer.get('answered_at')
+    if answered_at is not None and not _is_number(answered_at):
+        return "Answered at must be a Unix timestamp in seconds"
+    
+    return None
+
+def parse_answers(data):
+    """
+    Extract and validate the answers from a request body
+    Returns (answers, None) on success or (None, error message)
+    """
+    if not data:
+        return None, "No JSON data provided"
+    
+    answers = data.get('answers', [data]) if isinstance(data, dict) else data
+    if not isinstance(answers, list) or not answers:
+        return None, "Expected an answer or a non-empty list of answers"
+    
+    for answer in answers:
+        error = validate_answer(answer)
+        if error:
+            return None, error
+    
+    return answers, None
+
+@progress_bp.route('/<learner_id>/answers', methods=['POST'])
+def record_answers(learner_id):
+    """
+    Record one or more answers for a learner
+    Expected JSON: {"operation": "addition", "operand1": 3, "operand2": 7,
+                    "correct": true, "response_time": 4.2}
+    or {"answers": [...]} for several at once
+    Answers update the running statistics immediately and are stored in the next write batch
+    """
+    try:
+        answers, error = parse_answers(request.get_json())
+        if error:
+            return jsonify({
+                "success": False,
+                "error": error
+            }), 400
+        
+        record_learner_answers(current_app.extensions, learner_id, answers)
+        
+        return jsonify({
+            "success": True,
+            "learner_id": learner_id,
+            "recorded": len(answers),
+            "analysis": _get_registry().analysis(learner_id)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@progress_bp.route('/<learner_id>', methods=['GET'])
+def get_learner_progress(learner_id):
+    """Get the progress analysis for a learner"""
+    try:
+        return jsonify({
+            "success": True,
+            "learner_id": learner_id,
+            "analysis": _get_registry().analysis(learner_id)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@progress_bp.route('/<learner_id>/history', methods=['GET'])
+def get_learner_history(learner_id):
+    """
+    Get a learner's stored answers and an analysis computed from them
+    Optional query filters: operation, since and until (Unix timestamps), limit
+    """
+    try:
+        operation = request.args.get('operation')
+        if operation is not None and get_operation(operation) is None:
+            return jsonify({
+                "success": False,
+                "error": unsupported_operation_message()
+            }), 400
+        
+        answers = _get_store().fetch_answers(
+            learner_id,
+            operation=operation,
+            since=request.args.get('since', type=float),
+            until=request.args.get('until', type=float),
+            limit=request.args.get('limit', type=int)
+        )
+        
+        return jsonify({
+            "success": True,
+            "learner_id": learner_id,
+            "answers": answers,
+            "analysis": LearningProgressAggregator.from_answers(answers).analysis()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@progress_bp.route('/rollup', methods=['GET'])
+def get_class_rollup():
+    """
+    Get a class-level analysis merged across learners
+    Query: ?learner_ids=ana,ben,cai
+    """
+    try:
+        learner_ids = [learner_id for learner_id in request.args.get('learner_ids', '').split(',')
+                       if learner_id]
+        if not learner_ids:
+            return jsonify({
+                "success": False,
+                "error": "Provide learner_ids as a comma-separated list"
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "learner_ids": learner_ids,
+            "analysis": _get_registry().rollup(learner_ids)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@progress_bp.route('/analytics', methods=['POST'])
+def get_class_analytics():
+    """
+    Get per-learner statistics, class aggregates and weak-fact heatmaps in one pass
+    Expected JSON: {"learner_ids": ["ana", "ben"]} to read stored answers, optionally
+    filtered by "operation", "since" and "until"; or {"answers_by_learner":
+    {"ana": [answer, ...], ...}} to analyze answers sent with the request
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data, dict):
+            return jsonify({
+                "success": False,
+                "error": "No JSON data provided"
+            }), 400
+        
+        answers_by_learner = data.get('answers_by_learner')
+        if answers_by_learner is not None:
+            if not isinstance(answers_by_learner, dict) or not answers_by_learner:
+                return jsonify({
+                    "success": False,
+                    "error": "answers_by_learner must map learner ids to lists of answers"
+                }), 400
+            for answers in answers_by_learner.values():
+                if not isinstance(answers, list):
+                    return jsonify({
+                        "success": False,
+                        "error": "answers_by_learner must map learner ids to lists of answers"
+                    }), 400
+                for answer in answers:
+                    error = validate_answer(answer)
+                    if error:
+                        return jsonify({
+                            "success": False,
+                            "error": error
+                        }), 400
+            learner_ids = list(answers_by_learner)
+            columns = columns_from_answers(answers_by_learner)
+        else:
+            learner_ids = data.get('learner_ids')
+            if (not isinstance(learner_ids, list) or not learner_ids
+                    or not all(isinstance(learner_id, str) and learner_id for learner_id in learner_ids)):
+                return jsonify({
+                    "success": False,
+                    "error": "Provide learner_ids as a non-empty list or answers_by_learner"
+                }), 400
+            
+            operation = data.get('operation')
+            if operation is not None and get_operation(operation) is None:
+                return jsonify({
+                    "success": False,
+                    "error": unsupported_operation_message()
+                }), 400
+            
+            since = data.get('since')
+            until = data.get('until')
+            if (since is not None and not _is_number(since)) or (until is not None and not _is_number(until)):
+                return jsonify({
+                    "success": False,
+                    "error": "since and until must be timestamps"
+                }), 400
+            
+            learner_ids = list(dict.fromkeys(learner_ids))
+            columns = _get_store().fetch_columns(learner_ids, operation=operation, since=since, until=until)
+        
+        return jsonify({
+            "success": True,
+            **analyze_class(learner_ids, columns)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@progress_bp.route('/<learner_id>/mastery', methods=['GET'])
+def get_learner_mastery(learner_id):
+    """
+    Get a learner's estimated chance of answering each fact correctly
+    Query: ?operation=addition (any practiced operation); mastery is indexed [operand1][operand2]
+    """
+    try:
+        operation = request.args.get('operation', 'addition')
+        if get_practice_operation(operation) is None:
+            return jsonify({
+                "success": False,
+                "error": unsupported_operation_message(practice=True)
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "learner_id": learner_id,
+            "operation": operation,
+            "mastery": _get_selector().mastery(learner_id, operation)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
@@ -0,0 +1,189 @@
+"""
+Worksheet export routes for ShapeLearn
+Worksheets are built by background jobs; clients submit a job, poll its
+status and download the finished bundle
+"""
+
+from flask import Blueprint, current_app, request, jsonify, send_file, url_for
+from ..models.math_operations import PRACTICE_RANGES
+from ..models.operations import get_practice_operation, unsupported_operation_message
+from .api import is_valid_seed
+
+worksheets_bp = Blueprint('worksheets', __name__)
+
+MAX_SECTIONS = 10
+MAX_TITLE_LENGTH = 200
+
+def _get_jobs():
+    return current_app.extensions['worksheet_jobs']
+
+def _job_response(job):
+    """Job status with links to poll it and, once done, download it"""
+    job = dict(job)
+    job['status_url'] = url_for('worksheets.get_worksheet_job', job_id=job['id'])
+    if job['status'] == 'done':
+        job['download_url'] = url_for('worksheets.download_worksheet', job_id=job['id'])
+    return job
+
+def validate_worksheet(data, max_problems):
+    """Return (spec, None) for a valid worksheet request, otherwise (None, error message)"""
+    sections = data.get('sections')
+    if sections is None:
+        # A single section can be given inline
+        sections = [{
+            "skill_level": data.get('skill_level', 'beginner'),
+            "operation_type": data.get('operation_type', 'addition'),
+            "count": data.get('count', 10)
+        }]
+    
+    if not isinstance(sections, list) or not 1 <= len(sections) <= MAX_SECTIONS:
+        return None, f"Sections must be a list of 1 to {MAX_SECTIONS} sections"
+    
+    spec_sections = []
+    for section in sections:
+        if not isinstance(section, dict):
+            return None, "Each section must be an object"
+        skill_level = section.get('skill_level', 'beginner')
+        operation_type = section.get('operation_type', 'addition')
+        count = section.get('count', 10)
+        if skill_level not in PRACTICE_RANGES:
+            return None, f"Skill level must be one of {', '.join(PRACTICE_RANGES)}"
+        if get_practice_operation(operation_type) is None:
+            return None, unsupported_operation_message(practice=True)
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            return None, "Count must be a positive integer"
+        spec_sections.append({
+            "skill_level": skill_level,
+            "operation_type": operation_type,
+            "count": count
+        })
+    
+    if sum(section['count'] for section in spec_sections) > max_problems:
+        return None, f"A worksheet can have at most {max_problems} problems"
+    
+    seed = data.get('seed')
+    if not is_valid_seed(seed):
+        return None, "Seed must be a non-negative integer"
+    
+    title = data.get('title')
+    if title is not None and (not isinstance(title, str) or len(title) > MAX_TITLE_LENGTH):
+        return None, f"Title must be a string of at most {MAX_TITLE_LENGTH} characters"
+    
+    return {"title": title, "seed": seed, "sections": spec_sections}, None
+
+@worksheets_bp.route('', methods=['POST'])
+def submit_worksheet():
+    """
+    Queue a worksheet export job
+    Expected JSON: {"title": "Week 3", "seed": 7, "sections": [{"skill_level": "beginner",
+    "operation_type": "addition", "count": 20}, ...]}, or a single section's fields inline
+    Responds 202 with the job's status; poll status_url until it is done
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                "success": False,
+                "error": "No JSON data provided"
+            }), 400
+        
+        spec, error = validate_worksheet(data, current_app.config.get('WORKSHEET_MAX_PROBLEMS', 500))
+        if error:
+            return jsonify({
+                "success": False,
+                "error": error
+            }), 400
+        
+        job = _get_jobs().submit(spec)
+        if job is None:
+            response = jsonify({
+                "success": False,
+                "error": "Too many worksheets are being prepared, please retry shortly"
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = '5'
+            return response
+        
+        response = jsonify({
+            "success": True,
+            "job": _job_response(job)
+        })
+        response.status_code = 202
+        response.headers['Location'] = response.json['job']['status_url']
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@worksheets_bp.route('/stats', methods=['GET'])
+def get_worksheet_stats():
+    """Get worksheet queue depth, job counts and recent job timings"""
+    try:
+        return jsonify({
+            "success": True,
+            "stats": _get_jobs().stats()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@worksheets_bp.route('/<job_id>', methods=['GET'])
+def get_worksheet_job(job_id):
+    """Get a worksheet job's status (queued, running, done or failed) and timings"""
+    try:
+        job = _get_jobs().status(job_id)
+        if job is None:
+            return jsonify({
+                "success": False,
+                "error": "Worksheet job not found"
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "job": _job_response(job)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@worksheets_bp.route('/<job_id>/download', methods=['GET'])
+def download_worksheet(job_id):
+    """Download a finished worksheet bundle as a JSON attachment"""
+    try:
+        jobs = _get_jobs()
+        path = jobs.artifact_path(job_id)
+        if path is None:
+            job = jobs.status(job_id)
+            if job is None:
+                return jsonify({
+                    "success": False,
+                    "error": "Worksheet job not found"
+                }), 404
+            return jsonify({
+                "success": False,
+                "error": f"Worksheet is not ready (status: {job['status']})"
+            }), 409
+        
+        return send_file(
+            path,
+            mimetype='application/json',
+            as_attachment=True,
+            download_name=f"worksheet-{job_id}.json",
+            max_age=0
+        )
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
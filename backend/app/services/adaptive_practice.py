@@ -0,0 +1,138 @@
+"""
+Adaptive practice service
+Tracks each learner's fact mastery and selects personalized practice problems from it
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..models.mastery import FACT_SIZE, MasteryTable, operation_index
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# loader(learner_id, after_id): stored answers with row ids above after_id, each with its "id"
+Loader = Callable[[str, int], List[Dict[str, Any]]]
+
+
+class AdaptiveSelector:
+    """
+    Thread-safe per-learner mastery tracking and problem selection
+    Follows the store through loader when given; keeps at most max_learners rows, least recently used out
+    """
+
+    def __init__(self, loader: Optional[Loader] = None, max_learners: int = 1000):
+        self._table: Optional[MasteryTable] = None
+        self._prior_row = 0
+        # learner id -> [table row, row id of the last stored answer folded in]
+        self._rows: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loader = loader
+        self.max_learners = max_learners
+
+    def _get_table(self) -> MasteryTable:
+        # Built on first use so NumPy stays unloaded until adaptive practice is used
+        if self._table is None:
+            self._table = MasteryTable()
+            # Never updated: the starting mastery of every learner without answers
+            self._prior_row = self._table.add_learner()
+        return self._table
+
+    def _allocate(self, learner_id: str) -> List[int]:
+        """Table row for a new learner, reusing the least recently used one when full (call with the lock held)"""
+        table = self._get_table()
+        if len(self._rows) >= self.max_learners:
+            _, (row, _) = self._rows.popitem(last=False)
+            table.reset(row)
+        else:
+            row = table.add_learner()
+        entry = self._rows[learner_id] = [row, 0]
+        return entry
+
+    def _row(self, learner_id: str) -> int:
+        """A learner's table row, or the prior row if they have none (call with the lock held)"""
+        self._get_table()
+        entry = self._rows.get(learner_id)
+        if entry is None:
+            return self._prior_row
+        self._rows.move_to_end(learner_id)
+        return entry[0]
+
+    def _catch_up(self, learner_ids: Iterable[str]) -> None:
+        """Fold answers stored since the last access into these learners' rows"""
+        if self._loader is None:
+            return
+        with self._lock:
+            after = {
+                learner_id: self._rows[learner_id][1] if learner_id in self._rows else 0
+                for learner_id in learner_ids
+            }
+        # The store is read without holding the lock, so one slow load doesn't block other learners
+        loaded = [(learner_id, self._loader(learner_id, after_id)) for learner_id, after_id in after.items()]
+
+        with self._lock:
+            for learner_id, answers in loaded:
+                if not answers:
+                    continue
+                entry = self._rows.get(learner_id)
+                if entry is None:
+                    if after[learner_id]:
+                        # Evicted while loading; only part of the history was read, so wait for the next access
+                        continue
+                    entry = self._allocate(learner_id)
+                # Another thread may have folded in some of these meanwhile
+                answers = [answer for answer in answers if answer["id"] > entry[1]]
+                if answers:
+                    self._apply(entry[0], answers)
+                    entry[1] = answers[-1]["id"]
+
+    def _apply(self, row: int, answers: Iterable[Dict[str, Any]]) -> None:
+        """Fold answers with in-grid operands into a learner's row"""
+        facts = []
+        for answer in answers:
+            index = operation_index(answer.get("operation"))
+            if index is not None and _in_grid(answer.get("operand1")) and _in_grid(answer.get("operand2")):
+                facts.append((index, answer["operand1"], answer["operand2"], bool(answer.get("correct", False))))
+        if facts:
+            self._table.update(row, *zip(*facts))
+
+    def record(self, learner_id: str, answers: Iterable[Dict[str, Any]]) -> None:
+        """Update a learner's mastery from newly submitted answers (once stored, with a loader)"""
+        if self._loader is not None:
+            return
+        with self._lock:
+            entry = self._rows.get(learner_id) or self._allocate(learner_id)
+            self._rows.move_to_end(learner_id)
+            self._apply(entry[0], answers)
+
+    def select(self, learner_ids: List[str], operation: str, skill_level: str, count: int,
+               seed: Optional[int] = None) -> Dict[str, Tuple[List[int], List[int], List[float]]]:
+        """
+        Choose count problems for each learner in one vectorized draw
+        Returns {learner_id: (operand1s, operand2s, mastery)}
+        """
+        rng = np.random.default_rng(seed)
+        self._catch_up(learner_ids)
+        with self._lock:
+            rows = [self._row(learner_id) for learner_id in learner_ids]
+            operand1, operand2, mastery = self._table.sample(rows, operation, skill_level, count, rng)
+
+        return {
+            learner_id: (a, b, m)
+            for learner_id, a, b, m in zip(
+                learner_ids, operand1.tolist(), operand2.tolist(), np.round(mastery, 4).tolist()
+            )
+        }
+
+    def mastery(self, learner_id: str, operation: str) -> List[List[float]]:
+        """A learner's mastery grid for one operation, indexed [operand1][operand2]"""
+        self._catch_up([learner_id])
+        with self._lock:
+            row = self._row(learner_id)
+            grid = self._table.mastery([row])[0, operation_index(operation)]
+            return np.round(grid, 4).tolist()
+
+
+def _in_grid(operand) -> bool:
+    return isinstance(operand, int) and not isinstance(operand, bool) and 0 <= operand < FACT_SIZE
@@ -0,0 +1,139 @@
+"""
+Learner progress service
+Running progress statistics per learner, so clients needn't resend their history
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..models.learning_progress import LearningProgressAggregator, merge_aggregators
+
+# loader(learner_id, after_id): stored answers with row ids above after_id, each with its "id"
+Loader = Callable[[str, int], List[Dict[str, Any]]]
+
+
+def record_learner_answers(extensions: Mapping[str, Any], learner_id: str,
+                           answers: List[Dict[str, Any]]) -> None:
+    """
+    Record validated answers wherever an app keeps progress: running statistics,
+    fact mastery and the store. extensions is the Flask app's extensions mapping
+    """
+    extensions['learner_progress'].record(learner_id, answers)
+    extensions['adaptive_selector'].record(learner_id, answers)
+    extensions['progress_store'].record(learner_id, answers)
+
+
+class LearnerProgressRegistry:
+    """
+    Thread-safe map of learner id to running progress statistics
+    With a loader, a learner's statistics are first built from their stored answers,
+    then kept up to date from answers stored since, including other processes'.
+    With an update_loader too, answers recorded here are folded in as they arrive and
+    only other processes' answers are read back, so recording never waits on a write.
+    Keeps at most max_learners, least recently used out; with a loader they are rebuilt when next seen
+    """
+
+    def __init__(self, loader: Optional[Loader] = None, update_loader: Optional[Loader] = None,
+                 max_learners: int = 10000):
+        # learner id -> (statistics, row id of the last stored answer folded in)
+        self._entries: "OrderedDict[str, Tuple[LearningProgressAggregator, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loader = loader
+        self._update_loader = update_loader
+        self.max_learners = max_learners
+
+    def _put(self, learner_id: str, entry: Tuple[LearningProgressAggregator, int]) -> None:
+        """Store a learner's entry as the most recently used, evicting the least recently used (call with the lock held)"""
+        self._entries[learner_id] = entry
+        self._entries.move_to_end(learner_id)
+        while len(self._entries) > self.max_learners:
+            self._entries.popitem(last=False)
+
+    def _aggregator(self, learner_id: str) -> Optional[LearningProgressAggregator]:
+        """A learner's statistics, marked as recently used (call with the lock held)"""
+        entry = self._entries.get(learner_id)
+        if entry is None:
+            return None
+        self._entries.move_to_end(learner_id)
+        return entry[0]
+
+    def _catch_up(self, learner_id: str) -> None:
+        """Fold answers stored since the last read into a learner's statistics"""
+        if self._loader is None:
+            return
+        with self._lock:
+            entry = self._entries.get(learner_id)
+        if entry is None:
+            self._load(learner_id)
+            return
+
+        # The store is read without holding the lock, so one slow load doesn't block other learners
+        answers = (self._update_loader or self._loader)(learner_id, entry[1])
+        if not answers:
+            return
+
+        with self._lock:
+            entry = self._entries.get(learner_id)
+            if entry is None:
+                return
+            aggregator, last_id = entry
+            # Another thread may have folded in some of these meanwhile
+            for answer in answers:
+                if answer["id"] > last_id:
+                    aggregator.add(answer)
+                    last_id = answer["id"]
+            self._put(learner_id, (aggregator, last_id))
+
+    def _load(self, learner_id: str) -> None:
+        """Build a learner's statistics from all their stored answers"""
+        answers = self._loader(learner_id, 0)
+        with self._lock:
+            if learner_id in self._entries:
+                # Loaded by another thread meanwhile; its answers since are already folded in
+                return
+            self._put(learner_id, (
+                LearningProgressAggregator.from_answers(answers), answers[-1]["id"] if answers else 0
+            ))
+
+    def record(self, learner_id: str, answers: Iterable[Dict[str, Any]]) -> None:
+        """
+        Fold submitted answers into the learner's running statistics
+        Record answers before they are stored; with a loader but no update_loader, they are
+        picked up once stored instead
+        """
+        if self._loader is not None:
+            if self._update_loader is None:
+                return
+            with self._lock:
+                cold = learner_id not in self._entries
+            if cold:
+                self._load(learner_id)
+        with self._lock:
+            aggregator, last_id = self._entries.get(learner_id) or (LearningProgressAggregator(), 0)
+            for answer in answers:
+                aggregator.add(answer)
+            self._put(learner_id, (aggregator, last_id))
+
+    def get(self, learner_id: str) -> Optional[LearningProgressAggregator]:
+        """Return the learner's aggregator, or None if no answers were recorded"""
+        self._catch_up(learner_id)
+        with self._lock:
+            return self._aggregator(learner_id)
+
+    def analysis(self, learner_id: str) -> Dict[str, Any]:
+        """Progress analysis for one learner"""
+        self._catch_up(learner_id)
+        with self._lock:
+            return (self._aggregator(learner_id) or LearningProgressAggregator()).analysis()
+
+    def rollup(self, learner_ids: List[str]) -> Dict[str, Any]:
+        """Class-level analysis merged across several learners"""
+        aggregators = []
+        for learner_id in learner_ids:
+            self._catch_up(learner_id)
+            # Taken as each is caught up, since a large group may evict its own first learners
+            with self._lock:
+                aggregators.append(self._aggregator(learner_id))
+        with self._lock:
+            return merge_aggregators([aggregator for aggregator in aggregators if aggregator is not None]).analysis()
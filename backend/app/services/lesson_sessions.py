@@ -0,0 +1,231 @@
+"""
+Lesson sessions for ShapeLearn
+Lesson state and an append-only event log in SQLite, shared by every server process
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lesson_sessions (
+    id TEXT PRIMARY KEY,
+    learner_id TEXT,
+    problems TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lesson_sessions_updated
+    ON lesson_sessions (updated_at);
+CREATE TABLE IF NOT EXISTS lesson_events (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+"""
+
+# Events after which a lesson's stream ends
+FINAL_EVENTS = ("complete", "closed")
+
+LessonEvent = Tuple[int, str, Dict[str, Any]]
+
+
+class LessonSessionStore:
+    """
+    SQLite-backed lesson state and event log
+    Sessions untouched for ttl seconds are deleted when new ones are created
+    """
+
+    def __init__(self, path: str, ttl: float = 3600):
+        self.path = path
+        self.ttl = ttl
+        self._listeners: List[Callable[[], None]] = []
+        self._reset()
+        self._connection().executescript(SCHEMA)
+
+    def _reset(self) -> None:
+        """Start with no connections or listeners, as in a newly forked worker"""
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._changed = threading.Condition()
+        self._version = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Autocommit connection for the current thread, opened on first use"""
+        # SQLite connections don't survive fork; start fresh in the child
+        if os.getpid() != self._pid:
+            self._reset()
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction, taking SQLite's write lock up front so read-modify-writes don't race"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+        for listener in self._listeners:
+            listener()
+
+    @staticmethod
+    def _append(connection: sqlite3.Connection, session_id: str, event: str,
+                data: Dict[str, Any]) -> None:
+        connection.execute(
+            "INSERT INTO lesson_events (session_id, seq, event, data) "
+            "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ? FROM lesson_events WHERE session_id = ?",
+            (session_id, event, json.dumps(data, separators=(",", ":")), session_id)
+        )
+
+    def create(self, problems: List[Dict[str, Any]], learner_id: Optional[str] = None) -> str:
+        """Start a lesson on its first problem and return its session id"""
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as connection:
+            expired = "SELECT id FROM lesson_sessions WHERE updated_at < ?"
+            connection.execute(f"DELETE FROM lesson_events WHERE session_id IN ({expired})", (now - self.ttl,))
+            connection.execute("DELETE FROM lesson_sessions WHERE updated_at < ?", (now - self.ttl,))
+
+            connection.execute(
+                "INSERT INTO lesson_sessions (id, learner_id, problems, position, correct, status, updated_at) "
+                "VALUES (?, ?, ?, 0, 0, 'active', ?)",
+                (session_id, learner_id, json.dumps(problems, separators=(",", ":")), now)
+            )
+            self._append(connection, session_id, "problem", {"index": 0})
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """A lesson's state, or None for unknown or expired sessions"""
+        row = self._connection().execute(
+            "SELECT learner_id, problems, position, correct, status FROM lesson_sessions WHERE id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        learner_id, problems, position, correct, status = row
+        return {
+            "id": session_id,
+            "learner_id": learner_id,
+            "problems": json.loads(problems),
+            "position": position,
+            "correct": correct,
+            "status": status
+        }
+
+    def answer(self, session_id: str, answer: int) -> Optional[Dict[str, Any]]:
+        """
+        Check an answer to the current problem and move the lesson on
+        Returns the feedback, or None for unknown sessions; raises ValueError once the lesson is over
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT learner_id, problems, position, correct, status FROM lesson_sessions WHERE id = ?",
+                (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            learner_id, problems, position, correct_count, status = row
+            if status != "active":
+                raise ValueError(f"Lesson is already {status}")
+
+            problems = json.loads(problems)
+            problem = problems[position]
+            correct = answer == problem["result"]
+            correct_count += correct
+            feedback = {
+                "index": position,
+                "answer": answer,
+                "correct": correct,
+                "expected": problem["result"]
+            }
+            self._append(connection, session_id, "feedback", feedback)
+
+            position += 1
+            if position < len(problems):
+                status = "active"
+                self._append(connection, session_id, "problem", {"index": position})
+            else:
+                status = "complete"
+                self._append(connection, session_id, "complete",
+                             {"correct": correct_count, "total": len(problems)})
+
+            connection.execute(
+                "UPDATE lesson_sessions SET position = ?, correct = ?, status = ?, updated_at = ? WHERE id = ?",
+                (position, correct_count, status, time.time(), session_id)
+            )
+        return {**feedback, "problem": problem, "status": status, "learner_id": learner_id}
+
+    def close(self, session_id: str) -> bool:
+        """End a lesson early; returns False for unknown sessions"""
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT status FROM lesson_sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            if row[0] == "active":
+                connection.execute(
+                    "UPDATE lesson_sessions SET status = 'closed', updated_at = ? WHERE id = ?",
+                    (time.time(), session_id)
+                )
+                self._append(connection, session_id, "closed", {})
+        return True
+
+    def events(self, session_id: str, after: int = 0) -> List[LessonEvent]:
+        """A lesson's events with sequence numbers above after, oldest first"""
+        rows = self._connection().execute(
+            "SELECT seq, event, data FROM lesson_events WHERE session_id = ? AND seq > ? ORDER BY seq",
+            (session_id, after)
+        ).fetchall()
+        return [(seq, event, json.loads(data)) for seq, event, data in rows]
+
+    def resume_point(self, session_id: str) -> int:
+        """Sequence number to stream after so a new connection starts at the current problem"""
+        row = self._connection().execute(
+            "SELECT MAX(seq) FROM lesson_events WHERE session_id = ? AND event IN ('problem', 'complete', 'closed')",
+            (session_id,)
+        ).fetchone()
+        return max((row[0] or 1) - 1, 0)
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever this process changes a lesson"""
+        return self._version
+
+    def wait(self, version: int, timeout: float) -> None:
+        """Block until this process changes a lesson after version was read, or timeout"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener (from the writing thread) whenever this process changes a lesson"""
+        self._listeners.append(listener)
+
+
+def init_lesson_sessions(app, path: str) -> LessonSessionStore:
+    """Create the app's lesson session store in the SQLite database at path"""
+    store = LessonSessionStore(path, ttl=app.config.get("LESSON_SESSION_TTL", 3600))
+    app.extensions["lesson_sessions"] = store
+    return store
@@ -0,0 +1,312 @@
+"""
+Local progress storage for ShapeLearn
+Learner answers in an embedded SQLite database, written behind a buffer
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    learner_id TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    operand1 INTEGER,
+    operand2 INTEGER,
+    correct INTEGER NOT NULL,
+    response_time REAL,
+    answered_at REAL NOT NULL,
+    writer TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_answers_learner_time
+    ON answers (learner_id, answered_at);
+CREATE INDEX IF NOT EXISTS idx_answers_learner_operation_time
+    ON answers (learner_id, operation, answered_at);
+"""
+
+ANSWER_COLUMNS = ("operation", "operand1", "operand2", "correct", "response_time", "answered_at")
+
+# Learner ids bound per IN query, well under SQLite's host parameter limit
+MAX_QUERY_PARAMETERS = 500
+
+# Most recent rows the database refused, kept for inspection
+DEAD_LETTER_LIMIT = 1000
+
+AnswerRow = Tuple[str, str, Optional[int], Optional[int], int, Optional[float], float, str]
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressStore:
+    """
+    SQLite-backed store of learner answers
+    Writes are batched every batch_size answers or flush_interval seconds; rejected rows go to dead_letters.
+    Each row records the process that wrote it, so a process can read just the others' answers
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._reset()
+        self._create_schema()
+        atexit.register(self.close)
+
+    def _reset(self) -> None:
+        """Empty buffer, locks and connections for this process"""
+        self._pid = os.getpid()
+        self.writer = uuid.uuid4().hex
+        self._buffer: List[AnswerRow] = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.dead_letters: "deque[AnswerRow]" = deque(maxlen=DEAD_LETTER_LIMIT)
+
+    def _check_process(self) -> None:
+        # SQLite connections and threads don't survive fork; start fresh in the child
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection for the current thread, opened on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self) -> None:
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(answers)")}
+            if "writer" not in columns:
+                # Databases created before rows recorded their writer
+                try:
+                    connection.execute("ALTER TABLE answers ADD COLUMN writer TEXT")
+                except sqlite3.OperationalError as error:
+                    # Another process may have added it first
+                    if "duplicate column" not in str(error):
+                        raise
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="progress-store-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.OperationalError as error:
+                # The batch stays buffered; try again next interval
+                logger.warning("Progress flush failed: %s", error)
+            except Exception:
+                # Keep flushing later batches whatever went wrong with this one
+                logger.exception("Progress flush failed")
+
+    def record(self, learner_id: str, answers: Iterable[Dict[str, Any]]) -> None:
+        """Queue answers for a learner; they are written in the next batch"""
+        self._check_process()
+        now = time.time()
+        rows = [
+            (
+                learner_id,
+                answer["operation"],
+                answer.get("operand1"),
+                answer.get("operand2"),
+                int(bool(answer.get("correct", False))),
+                answer.get("response_time"),
+                answer["answered_at"] if answer.get("answered_at") is not None else now,
+                self.writer
+            )
+            for answer in answers
+        ]
+
+        with self._buffer_lock:
+            self._buffer.extend(rows)
+            should_flush = len(self._buffer) >= self.batch_size
+
+        if should_flush:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def flush(self) -> int:
+        """
+        Write all buffered answers in one transaction; returns the number written
+        If the database is unavailable the batch is kept for the next flush and the error raised
+        """
+        self._check_process()
+        with self._write_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+
+            try:
+                self._insert(rows)
+            except sqlite3.OperationalError:
+                self._requeue(rows)
+                raise
+            except Exception:
+                # A row the database or driver refuses (e.g. an int too large for SQLite)
+                # fails the whole batch; write the others one at a time
+                return self._insert_each(rows)
+            return len(rows)
+
+    def _requeue(self, rows: List[AnswerRow]) -> None:
+        """Put unwritten rows back in front of newer answers, to retry on the next flush"""
+        with self._buffer_lock:
+            self._buffer[:0] = rows
+
+    def _insert(self, rows: List[AnswerRow]) -> None:
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT INTO answers (learner_id, operation, operand1, operand2, "
+                "correct, response_time, answered_at, writer) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def _insert_each(self, rows: List[AnswerRow]) -> int:
+        """Insert rows one at a time, setting aside those that are rejected; returns the number written"""
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                self._insert([row])
+            except sqlite3.OperationalError:
+                self._requeue(rows[index:])
+                raise
+            except Exception as error:
+                logger.warning("Dropping answer for learner %r: %s", row[0], error)
+                self.dead_letters.append(row)
+            else:
+                written += 1
+        return written
+
+    def fetch_answers(self, learner_id: str, operation: Optional[str] = None,
+                      since: Optional[float] = None, until: Optional[float] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Stored answers for a learner in the order they were given, optionally filtered"""
+        self.flush()
+
+        query = f"SELECT {', '.join(ANSWER_COLUMNS)} FROM answers WHERE learner_id = ?"
+        params: List[Any] = [learner_id]
+        if operation is not None:
+            query += " AND operation = ?"
+            params.append(operation)
+        if since is not None:
+            query += " AND answered_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND answered_at < ?"
+            params.append(until)
+        query += " ORDER BY answered_at, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._connection().execute(query, params).fetchall()
+        return [
+            {**dict(zip(ANSWER_COLUMNS, row)), "correct": bool(row[3])}
+            for row in rows
+        ]
+
+    def fetch_new_answers(self, learner_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """A learner's stored answers with row ids above after_id, each with its row id"""
+        self.flush()
+
+        rows = self._connection().execute(
+            f"SELECT id, {', '.join(ANSWER_COLUMNS)} FROM answers "
+            "WHERE learner_id = ? AND id > ? ORDER BY id",
+            (learner_id, after_id)
+        ).fetchall()
+        return [
+            {"id": row[0], **dict(zip(ANSWER_COLUMNS, row[1:])), "correct": bool(row[4])}
+            for row in rows
+        ]
+
+    def fetch_others_answers(self, learner_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        Like fetch_new_answers, but only answers written by other processes, and
+        without writing this process's buffer first
+        """
+        rows = self._connection().execute(
+            f"SELECT id, {', '.join(ANSWER_COLUMNS)} FROM answers "
+            "WHERE learner_id = ? AND id > ? AND writer IS NOT ? ORDER BY id",
+            (learner_id, after_id, self.writer)
+        ).fetchall()
+        return [
+            {"id": row[0], **dict(zip(ANSWER_COLUMNS, row[1:])), "correct": bool(row[4])}
+            for row in rows
+        ]
+
+    def fetch_columns(self, learner_ids: List[str], operation: Optional[str] = None,
+                      since: Optional[float] = None,
+                      until: Optional[float] = None) -> Dict[str, List[Any]]:
+        """
+        Stored answers for many learners as parallel columns (learner_id plus ANSWER_COLUMNS)
+        Reads every learner in a few IN queries instead of one query per learner
+        """
+        self.flush()
+
+        columns: Dict[str, List[Any]] = {name: [] for name in ("learner_id",) + ANSWER_COLUMNS}
+        for start in range(0, len(learner_ids), MAX_QUERY_PARAMETERS):
+            chunk = learner_ids[start:start + MAX_QUERY_PARAMETERS]
+            query = (f"SELECT learner_id, {', '.join(ANSWER_COLUMNS)} FROM answers "
+                     f"WHERE learner_id IN ({', '.join('?' * len(chunk))})")
+            params: List[Any] = list(chunk)
+            if operation is not None:
+                query += " AND operation = ?"
+                params.append(operation)
+            if since is not None:
+                query += " AND answered_at >= ?"
+                params.append(since)
+            if until is not None:
+                query += " AND answered_at < ?"
+                params.append(until)
+
+            rows = self._connection().execute(query, params).fetchall()
+            if rows:
+                for name, values in zip(columns, zip(*rows)):
+                    columns[name].extend(values)
+
+        columns["correct"] = [bool(value) for value in columns["correct"]]
+        return columns
+
+    def close(self) -> None:
+        """Flush pending answers and stop the background flusher"""
+        if os.getpid() != self._pid:
+            return
+        self._stop.set()
+        self.flush()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def init_progress_store(app) -> ProgressStore:
+    """Create the app's progress store from configuration"""
+    path = app.config.get("PROGRESS_DB_PATH") or os.path.join(app.instance_path, "progress.db")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    store = ProgressStore(
+        path,
+        batch_size=app.config.get("PROGRESS_WRITE_BATCH_SIZE", 100),
+        flush_interval=app.config.get("PROGRESS_FLUSH_INTERVAL", 1.0)
+    )
+    app.extensions["progress_store"] = store
+    return store
@@ -0,0 +1,305 @@
+"""
+Worksheet export jobs for ShapeLearn
+Printable worksheet bundles built in a process pool and written to local storage
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+# Most recent finished jobs kept for the timing statistics
+TIMING_WINDOW = 100
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Worksheets, job statuses and interrupted writes, as named under the worksheet directory
+JOB_FILE_PATTERN = re.compile(r"^[0-9a-f]{32}(\.status)?\.json(\.partial)?$")
+
+# Engine built once per worker process, on its first job
+_worker_engine = None
+
+
+def build_worksheet(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a worksheet bundle from a validated spec
+    Problem ids run across sections; each number used gets its shape descriptor once
+    """
+    global _worker_engine
+    if _worker_engine is None:
+        from ..models.math_operations import MathShapeEngine
+        _worker_engine = MathShapeEngine()
+    engine = _worker_engine
+
+    seed = spec.get("seed")
+    sections = []
+    numbers = set()
+    next_id = 1
+    for index, section in enumerate(spec["sections"]):
+        problems = engine.generate_practice_problems(
+            skill_level=section["skill_level"],
+            operation_type=section["operation_type"],
+            count=section["count"],
+            seed=None if seed is None else seed + index
+        )
+        for problem in problems:
+            problem["id"] = next_id
+            next_id += 1
+            numbers.update((problem["operand1"], problem["operand2"], problem["result"]))
+        sections.append({
+            "skill_level": section["skill_level"],
+            "operation_type": section["operation_type"],
+            "problems": problems
+        })
+
+    return {
+        "title": spec.get("title") or "ShapeLearn Worksheet",
+        "created_at": time.time(),
+        "sections": sections,
+        "shapes": {str(number): engine.get_shape_for_number(number) for number in sorted(numbers)}
+    }
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    # Write then rename, so readers never see a partial file
+    partial = path + ".partial"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, separators=(",", ":"))
+    os.replace(partial, path)
+
+
+def run_worksheet_job(spec: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """
+    Worker entry point: build a worksheet and write it to path
+    Only a small summary goes back to the parent process
+    """
+    started_at = time.time()
+    worksheet = build_worksheet(spec)
+    _write_json(path, worksheet)
+
+    return {
+        "started_at": started_at,
+        "finished_at": time.time(),
+        "problem_count": sum(len(section["problems"]) for section in worksheet["sections"]),
+        "size": os.path.getsize(path)
+    }
+
+
+class WorksheetJobQueue:
+    """
+    Submits worksheet jobs to a process pool and tracks their status
+    Statuses are written next to the worksheets, so any process sharing the directory can answer for a job
+    """
+
+    def __init__(self, directory: str, workers: int = 2, max_pending: int = 100,
+                 max_jobs: int = 200):
+        self.directory = directory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._timings = deque(maxlen=TIMING_WINDOW)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Started on the first job; spawned workers don't inherit the server's threads
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Queue a worksheet job; returns its status, or None when the queue is full"""
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                self.rejected += 1
+                return None
+
+            job_id = uuid.uuid4().hex
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "problem_count": None,
+                "size": None,
+                "error": None
+            }
+            future = self._get_executor().submit(run_worksheet_job, spec, self._path(job_id))
+            self._jobs[job_id] = job
+            self._futures[job_id] = future
+            self.submitted += 1
+
+        _write_json(self._status_path(job_id), job)
+        future.add_done_callback(lambda future: self._finish(job_id, future))
+        return self.status(job_id)
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+            job = self._jobs[job_id]
+            error = future.exception() if not future.cancelled() else None
+            if future.cancelled() or error is not None:
+                job.update(status="failed", finished_at=time.time(),
+                           error=str(error) if error else "Cancelled")
+                self.failed += 1
+            else:
+                job.update(status="done", **future.result())
+                self.completed += 1
+                self._timings.append((job["started_at"] - job["submitted_at"],
+                                      job["finished_at"] - job["started_at"]))
+            job = dict(job)
+
+            self._finished[job_id] = None
+            expired = []
+            while len(self._finished) > self.max_jobs:
+                expired_id, _ = self._finished.popitem(last=False)
+                self._jobs.pop(expired_id, None)
+                expired.append(expired_id)
+
+        _write_json(self._status_path(job_id), job)
+        for expired_id in expired:
+            for path in (self._path(expired_id), self._status_path(expired_id)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _status_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.status.json")
+
+    def _load_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status written by whichever process owns the job, or None if there is none"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(self._status_path(job_id), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's current status and timings, or None for unknown jobs"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job = dict(job)
+            future = self._futures.get(job_id)
+
+        if job is None:
+            job = self._load_status(job_id)
+            if job is None:
+                return None
+
+        if future is not None and future.running():
+            job["status"] = "running"
+        if job["started_at"] is not None:
+            job["queue_wait_ms"] = round((job["started_at"] - job["submitted_at"]) * 1000, 3)
+            job["run_ms"] = round((job["finished_at"] - job["started_at"]) * 1000, 3)
+        return job
+
+    def artifact_path(self, job_id: str) -> Optional[str]:
+        """Path of a finished job's worksheet file, or None if it isn't ready"""
+        job = self.status(job_id)
+        if job is None or job["status"] != "done":
+            return None
+        return self._path(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, job counts and recent queue-wait and run times"""
+        with self._lock:
+            futures = list(self._futures.values())
+            timings = list(self._timings)
+            stats = {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+
+        running = sum(1 for future in futures if future.running())
+        stats["running"] = running
+        stats["queue_depth"] = len(futures) - running
+        for name, values in (("queue_wait_ms", [wait for wait, _ in timings]),
+                             ("run_ms", [run for _, run in timings])):
+            stats[name] = {
+                "avg": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+                "max": round(max(values) * 1000, 3) if values else 0.0
+            }
+        return stats
+
+    def gauges(self) -> Dict[str, Any]:
+        """Queue gauges for the metrics registry"""
+        stats = self.stats()
+        return {
+            "worksheet_queue_depth": ("Worksheet jobs waiting for a worker", stats["queue_depth"]),
+            "worksheet_jobs_running": ("Worksheet jobs being built", stats["running"]),
+            "worksheet_run_seconds_avg": ("Mean build time of recent worksheet jobs",
+                                          stats["run_ms"]["avg"] / 1000),
+            "worksheet_queue_wait_seconds_avg": ("Mean queue wait of recent worksheet jobs",
+                                                 stats["queue_wait_ms"]["avg"] / 1000),
+        }
+
+    def sweep(self, max_age: float) -> int:
+        """Delete job files not modified for max_age seconds; returns the number removed"""
+        cutoff = time.time() - max_age
+        removed = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+        for entry in entries:
+            if not JOB_FILE_PATTERN.match(entry.name):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                # Already removed by another process sweeping the same directory
+                pass
+        return removed
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the pool, cancelling jobs that haven't started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+def init_worksheet_jobs(app) -> WorksheetJobQueue:
+    """Create the app's worksheet job queue from configuration"""
+    directory = app.config.get("WORKSHEET_DIR") or os.path.join(app.instance_path, "worksheets")
+    os.makedirs(directory, exist_ok=True)
+
+    queue = WorksheetJobQueue(
+        directory,
+        workers=app.config.get("WORKSHEET_WORKERS", 2),
+        max_pending=app.config.get("WORKSHEET_MAX_PENDING", 100),
+        max_jobs=app.config.get("WORKSHEET_MAX_JOBS", 200)
+    )
+    max_age = app.config.get("WORKSHEET_MAX_AGE", 86400)
+    if max_age > 0:
+        queue.sweep(max_age)
+    app.extensions["worksheet_jobs"] = queue
+    return queue
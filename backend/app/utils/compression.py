@@ -0,0 +1,81 @@
+"""
+Response compression for ShapeLearn
+Negotiates Accept-Encoding for cached payloads and large JSON responses
+"""
+
+import gzip
+from typing import Dict, Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli is in requirements.txt; without it responses fall back to gzip
+    brotli = None
+
+# Preferred order when the client accepts several encodings equally
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "text/event-stream",
+    "text/plain",
+}
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress body with the given content encoding"""
+    if encoding == "br":
+        # Brotli quality runs 0-11; map the gzip-style level onto it
+        return brotli.compress(body, quality=min(11, level + 2))
+    if encoding == "gzip":
+        # Fixed mtime keeps output (and therefore ETags) stable across restarts
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def precompress(body: bytes, level: int = 6) -> Dict[str, bytes]:
+    """Compress body once for every supported encoding"""
+    return {encoding: compress(body, encoding, level) for encoding in SUPPORTED_ENCODINGS}
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Pick the best supported encoding from the request's Accept-Encoding header"""
+    accepted = request.accept_encodings
+    best_quality = 0
+    best_encoding = None
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best_quality, best_encoding = quality, encoding
+    return best_encoding
+
+
+def init_compression(app) -> None:
+    """Register the on-the-fly compression hook for dynamic responses"""
+    min_size = app.config.get("COMPRESSION_MIN_SIZE", 1024)
+    level = app.config.get("COMPRESSION_LEVEL", 6)
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        # Streams, precompressed payloads, errors and small bodies pass through
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or (response.content_length or 0) < min_size):
+            return response
+
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, level))
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,44 @@
+"""
+Deferred module imports for ShapeLearn
+Module proxies that import heavy modules on first attribute access
+"""
+
+import importlib
+import threading
+from typing import Any
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access
+    Looked-up attributes are cached on the proxy
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Proxy for the named module; the import happens on first use"""
+    return LazyModule(name)
@@ -0,0 +1,191 @@
+"""
+In-process request metrics for ShapeLearn
+Per-endpoint histograms, counters and cache statistics in the Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import g, request
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Endpoint label for requests that didn't match a route, so paths can't explode label counts
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+# A collector returns {cache name: {"hits", "misses", "size", "max_size"}}
+CacheCollector = Callable[[], Dict[str, Dict[str, Optional[int]]]]
+# A gauge collector returns {metric name: (help text, value)}
+GaugeCollector = Callable[[], Dict[str, Tuple[str, float]]]
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set (not thread-safe; guarded by the registry lock)"""
+
+    __slots__ = ("buckets", "series")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self, name: str, label_names: Tuple[str, ...]) -> Iterable[str]:
+        for labels, series in sorted(self.series.items()):
+            base = _format_labels(label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{name}_bucket{{{base},le="{bound}"}} {cumulative}'
+            cumulative += series[len(self.buckets)]
+            yield f'{name}_bucket{{{base},le="+Inf"}} {cumulative}'
+            yield f"{name}_sum{{{base}}} {series[-1]}"
+            yield f"{name}_count{{{base}}} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe request metrics for one app
+    Recording is a lock, a bisect and a few dict updates; rendering does the rest
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = Histogram(LATENCY_BUCKETS)
+        self._size = Histogram(SIZE_BUCKETS)
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._cache_collectors: List[CacheCollector] = []
+        self._gauge_collectors: List[GaugeCollector] = []
+        self._started = time.time()
+
+    def observe_request(self, endpoint: str, method: str, status: int,
+                        duration: float, size: Optional[int]) -> None:
+        """Record one finished request; size is None for streamed bodies"""
+        route = (endpoint, method)
+        with self._lock:
+            self._latency.observe(route, duration)
+            if size is not None:
+                self._size.observe(route, size)
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if status >= 500:
+                self._errors[route] = self._errors.get(route, 0) + 1
+
+    def add_cache_collector(self, collector: CacheCollector) -> None:
+        """Register a callable reporting cache statistics at scrape time"""
+        self._cache_collectors.append(collector)
+
+    def add_gauge_collector(self, collector: GaugeCollector) -> None:
+        """Register a callable reporting gauges (e.g. queue depths) at scrape time"""
+        self._gauge_collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        route_labels = ("endpoint", "method")
+        with self._lock:
+            lines = [
+                "# HELP shapelearn_request_duration_seconds Request latency by endpoint",
+                "# TYPE shapelearn_request_duration_seconds histogram",
+                *self._latency.samples("shapelearn_request_duration_seconds", route_labels),
+                "# HELP shapelearn_response_size_bytes Response body size by endpoint",
+                "# TYPE shapelearn_response_size_bytes histogram",
+                *self._size.samples("shapelearn_response_size_bytes", route_labels),
+                "# HELP shapelearn_requests_total Requests by endpoint and status",
+                "# TYPE shapelearn_requests_total counter",
+            ]
+            for labels, count in sorted(self._requests.items()):
+                lines.append(
+                    f"shapelearn_requests_total{{{_format_labels(('endpoint', 'method', 'status'), labels)}}} {count}"
+                )
+            lines += [
+                "# HELP shapelearn_request_errors_total Requests that ended in a 5xx response",
+                "# TYPE shapelearn_request_errors_total counter",
+            ]
+            for labels, count in sorted(self._errors.items()):
+                lines.append(f"shapelearn_request_errors_total{{{_format_labels(route_labels, labels)}}} {count}")
+
+        lines += self._render_caches()
+        for collector in self._gauge_collectors:
+            for name, (help_text, value) in sorted(collector().items()):
+                name = f"shapelearn_{name}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        lines += [
+            "# HELP shapelearn_uptime_seconds Seconds since the metrics registry was created",
+            "# TYPE shapelearn_uptime_seconds gauge",
+            f"shapelearn_uptime_seconds {time.time() - self._started:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _render_caches(self) -> List[str]:
+        caches: Dict[str, Dict[str, Optional[int]]] = {}
+        for collector in self._cache_collectors:
+            caches.update(collector())
+
+        lines = []
+        for metric, kind, help_text in (
+            ("hits", "counter", "Cache hits"),
+            ("misses", "counter", "Cache misses"),
+            ("size", "gauge", "Entries currently cached"),
+            ("hit_ratio", "gauge", "Hits over lookups since start"),
+        ):
+            name = f"shapelearn_cache_{metric}" + ("_total" if kind == "counter" else "")
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for cache, info in sorted(caches.items()):
+                if metric == "hit_ratio":
+                    lookups = info["hits"] + info["misses"]
+                    value = round(info["hits"] / lookups, 6) if lookups else 0
+                else:
+                    value = info[metric]
+                lines.append(f'{name}{{cache="{cache}"}} {value}')
+        return lines
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    return ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def init_metrics(app) -> MetricsRegistry:
+    """
+    Time every request and record it in a registry stored on the app
+    Call before init_compression so recorded sizes are the bytes sent
+    """
+    metrics = MetricsRegistry()
+    app.extensions['metrics'] = metrics
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            rule = request.url_rule
+            metrics.observe_request(
+                rule.rule if rule is not None else UNMATCHED_ENDPOINT,
+                request.method,
+                response.status_code,
+                time.perf_counter() - started,
+                None if response.is_streamed else response.content_length
+            )
+        return response
+
+    return metrics
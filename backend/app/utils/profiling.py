@@ -0,0 +1,239 @@
+"""
+Opt-in request profiling for ShapeLearn
+Sampled cProfile runs and stack samples of slow requests, written to a local directory
+"""
+
+import cProfile
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from flask import g, request
+
+METADATA_SUFFIX = ".json"
+
+
+class _ActiveRequest:
+    """A request watched for slowness, and the stacks sampled from it so far"""
+
+    __slots__ = ("thread_id", "started", "stacks")
+
+    def __init__(self, thread_id: int, started: float):
+        self.thread_id = thread_id
+        self.started = started
+        self.stacks: Counter = Counter()
+
+
+class RequestProfiler:
+    """
+    Sampled cProfile runs plus a slow-request stack sampler
+    Each profile is a .prof or .stacks.txt file with .json metadata; the newest max_profiles are kept
+    """
+
+    def __init__(self, directory: str, sample_rate: float = 0.0,
+                 slow_threshold: float = 0.0, sample_interval: float = 0.01,
+                 max_profiles: int = 50, endpoints: Optional[Iterable[str]] = None):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.sample_interval = sample_interval
+        self.max_profiles = max_profiles
+        self.endpoints = frozenset(endpoints) if endpoints else None
+
+        # Only one cProfile run at a time; concurrent sampled requests skip profiling
+        self._profile_lock = threading.Lock()
+        self._active: Dict[int, _ActiveRequest] = {}
+        self._active_lock = threading.Lock()
+        self._watchdog: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_threshold > 0
+
+    def wants(self, endpoint: Optional[str]) -> bool:
+        """Whether requests to this route rule are profiled at all"""
+        return self.enabled and (self.endpoints is None or endpoint in self.endpoints)
+
+    # Sampled cProfile runs
+
+    def start_profile(self) -> Optional[cProfile.Profile]:
+        """Start cProfile for this request if it is sampled and no other run is active"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if not self._profile_lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop_profile(self, profile: cProfile.Profile) -> None:
+        profile.disable()
+        self._profile_lock.release()
+
+    # Slow-request watchdog
+
+    def watch(self) -> _ActiveRequest:
+        """Start watching the current thread's request for slowness"""
+        self._ensure_watchdog()
+        active = _ActiveRequest(threading.get_ident(), time.perf_counter())
+        with self._active_lock:
+            self._active[active.thread_id] = active
+        return active
+
+    def unwatch(self, active: _ActiveRequest) -> None:
+        with self._active_lock:
+            self._active.pop(active.thread_id, None)
+
+    def _ensure_watchdog(self) -> None:
+        # Started lazily so each forked worker process runs its own watchdog
+        if self.slow_threshold > 0 and (self._watchdog is None or not self._watchdog.is_alive()):
+            with self._active_lock:
+                if self._watchdog is None or not self._watchdog.is_alive():
+                    self._watchdog = threading.Thread(
+                        target=self._sample_slow_requests, name='shapelearn-profiler', daemon=True
+                    )
+                    self._watchdog.start()
+
+    def _sample_slow_requests(self) -> None:
+        while True:
+            time.sleep(self.sample_interval)
+            now = time.perf_counter()
+            with self._active_lock:
+                slow = [a for a in self._active.values() if now - a.started >= self.slow_threshold]
+            if not slow:
+                continue
+            frames = sys._current_frames()
+            for active in slow:
+                frame = frames.get(active.thread_id)
+                if frame is not None:
+                    active.stacks[_collapse_stack(frame)] += 1
+
+    # Output
+
+    def write(self, kind: str, metadata: Dict[str, Any], profile: Optional[cProfile.Profile] = None,
+              stacks: Optional[Counter] = None) -> str:
+        """Write one profile and its metadata, then rotate; returns the base path"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Microsecond timestamps keep names in write order for rotation
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        base = os.path.join(self.directory, name)
+
+        if profile is not None:
+            profile.dump_stats(base + ".prof")
+        if stacks:
+            with open(base + ".stacks.txt", "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        with open(base + METADATA_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump({"kind": kind, **metadata}, f, indent=2)
+
+        self._rotate()
+        return base
+
+    def _rotate(self) -> None:
+        """Delete the oldest profiles beyond max_profiles"""
+        with self._write_lock:
+            names = sorted(n for n in os.listdir(self.directory) if n.endswith(METADATA_SUFFIX))
+            for metadata_name in names[:max(0, len(names) - self.max_profiles)]:
+                prefix = metadata_name[:-len(METADATA_SUFFIX)]
+                for suffix in (METADATA_SUFFIX, ".prof", ".stacks.txt"):
+                    try:
+                        os.remove(os.path.join(self.directory, prefix + suffix))
+                    except FileNotFoundError:
+                        pass
+
+
+def _collapse_stack(frame) -> str:
+    """Root-first 'file:function:line;...' stack for a frame"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def init_profiling(app) -> Optional[RequestProfiler]:
+    """Attach the request profiler to the app when PROFILE_SAMPLE_RATE or PROFILE_SLOW_MS is set"""
+    endpoints = [e.strip() for e in app.config.get('PROFILE_ENDPOINTS', '').split(',') if e.strip()]
+    profiler = RequestProfiler(
+        directory=app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles'),
+        sample_rate=app.config.get('PROFILE_SAMPLE_RATE', 0.0),
+        slow_threshold=app.config.get('PROFILE_SLOW_MS', 0) / 1000,
+        sample_interval=app.config.get('PROFILE_SAMPLE_INTERVAL_MS', 10) / 1000,
+        max_profiles=app.config.get('PROFILE_MAX_FILES', 50),
+        endpoints=endpoints
+    )
+    if not profiler.enabled:
+        return None
+    app.extensions['profiler'] = profiler
+
+    @app.before_request
+    def start_profiling():
+        rule = request.url_rule
+        if not profiler.wants(rule.rule if rule is not None else None):
+            return
+        g.profile_started = time.perf_counter()
+        g.profile = profiler.start_profile()
+        if profiler.slow_threshold > 0:
+            g.profile_watch = profiler.watch()
+
+    @app.after_request
+    def finish_profiling(response):
+        started = g.pop('profile_started', None)
+        if started is None:
+            return response
+        profile = g.pop('profile', None)
+        watch = g.pop('profile_watch', None)
+        if profile is not None:
+            profiler.stop_profile(profile)
+        if watch is not None:
+            profiler.unwatch(watch)
+
+        duration = time.perf_counter() - started
+        slow = watch is not None and duration >= profiler.slow_threshold
+        if profile is None and not slow:
+            return response
+
+        metadata = {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.url_rule.rule,
+            "query_string": request.query_string.decode('latin-1'),
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "content_length": response.content_length,
+            "timestamp": time.time(),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name
+        }
+        if profile is not None:
+            profiler.write("sampled", metadata, profile=profile)
+        if slow:
+            profiler.write("slow", {
+                **metadata,
+                "threshold_ms": profiler.slow_threshold * 1000,
+                "samples": sum(watch.stacks.values())
+            }, stacks=watch.stacks)
+        return response
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        # after_request is skipped when a request fails outright; release everything
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profiler.stop_profile(profile)
+        watch = g.pop('profile_watch', None)
+        if watch is not None:
+            profiler.unwatch(watch)
+
+    return profiler
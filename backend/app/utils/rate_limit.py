@@ -0,0 +1,201 @@
+"""
+Admission control for ShapeLearn
+Per-client token buckets (429) and a cap on requests in flight (503)
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app, g, jsonify, request
+
+# Lock stripes for the bucket table; requests only contend within a stripe
+SHARD_COUNT = 16
+
+# Routes that are never limited (monitoring must keep working under load)
+EXEMPT_ENDPOINTS = frozenset({'/health', '/metrics'})
+
+Limit = Tuple[float, float]
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by (client, endpoint), each refilling at rate tokens/s up to burst
+    Each stripe keeps at most max_keys / SHARD_COUNT buckets, least recently used out
+    """
+
+    def __init__(self, rate: float, burst: float, limits: Optional[Dict[str, Limit]] = None,
+                 max_keys: int = 10000):
+        self.default_limit = (rate, burst)
+        self.limits = dict(limits or {})
+        self.shard_capacity = max(1, max_keys // SHARD_COUNT)
+        self._shards = [OrderedDict() for _ in range(SHARD_COUNT)]
+        self._locks = [threading.Lock() for _ in range(SHARD_COUNT)]
+
+    def limit_for(self, endpoint: str) -> Limit:
+        return self.limits.get(endpoint, self.default_limit)
+
+    def acquire(self, client_key: str, endpoint: str, cost: float = 1.0) -> float:
+        """
+        Take cost tokens from the client's bucket for endpoint
+        Returns 0 when admitted, otherwise the seconds until enough tokens refill
+        """
+        rate, burst = self.limit_for(endpoint)
+        if rate <= 0:
+            return 0.0
+
+        key = (client_key, endpoint)
+        index = hash(key) % SHARD_COUNT
+        buckets = self._shards[index]
+        now = time.monotonic()
+
+        with self._locks[index]:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [burst, now]
+                if len(buckets) > self.shard_capacity:
+                    self._evict(buckets, now)
+            else:
+                buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            return (cost - bucket[0]) / rate
+
+    def _evict(self, buckets: OrderedDict, now: float) -> None:
+        """Drop refilled idle buckets from the LRU end, then the oldest if still over capacity"""
+        while buckets:
+            (client_key, endpoint), (_, last_seen) = next(iter(buckets.items()))
+            rate, burst = self.limit_for(endpoint)
+            if now - last_seen < burst / rate and len(buckets) <= self.shard_capacity:
+                break
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for buckets in self._shards)
+
+
+class AdmissionControl:
+    """
+    Rate limiter plus a non-blocking cap on requests in flight
+    A slot is held until the response is closed, so streamed responses count for as long as they run
+    """
+
+    def __init__(self, limiter: Optional[TokenBucketLimiter], max_concurrent: int = 0,
+                 exempt: Iterable[str] = EXEMPT_ENDPOINTS):
+        self.limiter = limiter
+        self.max_concurrent = max_concurrent
+        self.exempt = frozenset(exempt)
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self._counter_lock = threading.Lock()
+        self.rejected_rate = 0
+        self.rejected_concurrency = 0
+
+    def admit(self, client_key: str, endpoint: str,
+              take_slot: bool = True) -> Optional[Tuple[int, str, float]]:
+        """
+        Admit a request, taking a concurrency slot unless take_slot is False
+        Returns None when admitted, otherwise (status, error message, retry after seconds)
+        """
+        if endpoint in self.exempt:
+            return None
+
+        if self.limiter is not None:
+            wait = self.limiter.acquire(client_key, endpoint)
+            if wait > 0:
+                with self._counter_lock:
+                    self.rejected_rate += 1
+                return 429, "Too many requests, please slow down", wait
+
+        if take_slot and self.holds_slot(endpoint) and not self._slots.acquire(blocking=False):
+            with self._counter_lock:
+                self.rejected_concurrency += 1
+            return 503, "Server is busy, please retry shortly", 1.0
+        return None
+
+    def holds_slot(self, endpoint: str) -> bool:
+        """Whether an admitted request to endpoint takes a concurrency slot"""
+        return self._slots is not None and endpoint not in self.exempt
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+def parse_limits(spec: str) -> Dict[str, Limit]:
+    """Parse per-endpoint overrides such as '/api/practice=5:10,/api/operation=20:40' (rate:burst)"""
+    limits = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        endpoint, _, values = item.rpartition('=')
+        rate, _, burst = values.partition(':')
+        rate = float(rate)
+        limits[endpoint.strip()] = (rate, float(burst) if burst else max(1.0, rate))
+    return limits
+
+
+def client_key() -> str:
+    """Key a Flask request by RATE_LIMIT_KEY_HEADER (first value) or the remote address"""
+    header = current_app.config.get('RATE_LIMIT_KEY_HEADER')
+    if header:
+        value = request.headers.get(header)
+        if value:
+            return value.split(',')[0].strip()
+    return request.remote_addr or 'unknown'
+
+
+def init_rate_limiting(app) -> Optional[AdmissionControl]:
+    """Reject over-limit requests before they reach the views, per the RATE_LIMIT_* config"""
+    limiter = None
+    if app.config.get('RATE_LIMIT_ENABLED', True):
+        limiter = TokenBucketLimiter(
+            rate=app.config.get('RATE_LIMIT_RATE', 20.0),
+            burst=app.config.get('RATE_LIMIT_BURST', 40.0),
+            limits=parse_limits(app.config.get('RATE_LIMITS', '')),
+            max_keys=app.config.get('RATE_LIMIT_MAX_KEYS', 10000)
+        )
+    max_concurrent = app.config.get('MAX_CONCURRENT_REQUESTS', 0)
+    if limiter is None and max_concurrent <= 0:
+        return None
+
+    admission = AdmissionControl(limiter, max_concurrent)
+    app.extensions['admission'] = admission
+
+    @app.before_request
+    def admit_request():
+        rule = request.url_rule
+        if rule is None or request.method == 'OPTIONS':
+            return None
+
+        rejection = admission.admit(client_key(), rule.rule)
+        if rejection is not None:
+            status, error, retry_after = rejection
+            response = jsonify({"success": False, "error": error})
+            response.status_code = status
+            response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+            return response
+
+        if admission.holds_slot(rule.rule):
+            g.admission_slot = True
+        return None
+
+    @app.after_request
+    def hand_slot_to_response(response):
+        # The body of a streamed response is sent after the request is torn down
+        if g.pop('admission_slot', False):
+            response.call_on_close(admission.release)
+        return response
+
+    @app.teardown_request
+    def release_slot(exc):
+        # after_request is skipped when a request fails outright
+        if g.pop('admission_slot', False):
+            admission.release()
+
+    return admission
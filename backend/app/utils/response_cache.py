@@ -0,0 +1,100 @@
+"""
+Pre-serialized response cache for static ShapeLearn payloads
+Shape definitions are serialized once and served as bytes with strong ETags
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from flask import current_app, request
+
+from .compression import negotiate_encoding, precompress
+from .wire_format import MSGPACK_MIMETYPE, encode_msgpack, msgpack_available, prefers_msgpack
+
+
+class CachedPayload:
+    """
+    A payload serialized and compressed once, with its strong ETag
+    A MessagePack body is kept alongside the JSON one when msgpack is installed
+    """
+
+    __slots__ = ("body", "etag", "encoded_bodies", "msgpack_body", "msgpack_etag")
+
+    def __init__(self, payload: Dict[str, Any]):
+        # Use the app's JSON provider with jsonify's compact separators
+        body = current_app.json.dumps(payload, separators=(",", ":"))
+        self.body = f"{body}\n".encode("utf-8")
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.encoded_bodies = precompress(
+            self.body, current_app.config.get("COMPRESSION_LEVEL", 6)
+        )
+        self.msgpack_body = encode_msgpack(payload) if msgpack_available() else None
+        self.msgpack_etag = (
+            hashlib.sha256(self.msgpack_body).hexdigest()[:32] if self.msgpack_body else None
+        )
+
+
+class ResponseCache:
+    """Thread-safe store of CachedPayloads keyed by resource"""
+
+    def __init__(self):
+        self._payloads: Dict[Hashable, CachedPayload] = {}
+        self._lock = threading.Lock()
+        # Approximate under concurrency; only used for metrics
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Dict[str, Any]]) -> CachedPayload:
+        """Return the cached payload for key, serializing builder() on first use"""
+        cached = self._payloads.get(key)
+        if cached is None:
+            with self._lock:
+                cached = self._payloads.get(key)
+                if cached is None:
+                    self.misses += 1
+                    cached = CachedPayload(builder())
+                    self._payloads[key] = cached
+                    return cached
+        self.hits += 1
+        return cached
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Hit/miss counters and size, in the engine's cache_info shape"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._payloads),
+            "max_size": None
+        }
+
+    def clear(self) -> None:
+        """Drop all cached payloads"""
+        with self._lock:
+            self._payloads.clear()
+
+
+def cached_response(cached: CachedPayload):
+    """
+    Build a response for a cached payload
+    Serves the variant the client accepts, or 304 when If-None-Match matches
+    """
+    encoding = negotiate_encoding()
+    if cached.msgpack_body is not None and prefers_msgpack(request.accept_mimetypes):
+        response = current_app.response_class(cached.msgpack_body, mimetype=MSGPACK_MIMETYPE)
+        response.set_etag(cached.msgpack_etag)
+    elif encoding is None:
+        response = current_app.response_class(cached.body, mimetype="application/json")
+        response.set_etag(cached.etag)
+    else:
+        response = current_app.response_class(
+            cached.encoded_bodies[encoding], mimetype="application/json"
+        )
+        response.headers["Content-Encoding"] = encoding
+        # Each encoding is a different representation, so it gets its own ETag
+        response.set_etag(f"{cached.etag}-{encoding}")
+    response.vary.add("Accept")
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get("STATIC_PAYLOAD_MAX_AGE", 3600)
+    return response.make_conditional(request)
@@ -0,0 +1,83 @@
+"""
+Binary wire format for ShapeLearn geometry
+MessagePack bodies with vectors packed as little-endian Float32 and mesh indices as Uint32
+"""
+
+import struct
+from typing import Any
+
+from flask import current_app
+
+try:
+    import msgpack
+except ImportError:  # msgpack is in requirements.txt; without it every client gets JSON
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/x-msgpack"
+
+# Fields holding numeric vectors (or lists of vectors, flattened) that are sent as Float32 bytes
+VECTOR_FIELDS = {
+    "position", "target_position", "scale", "rotation", "points", "vertices", "normals", "opacity"
+}
+
+# Integer buffers sent as Uint32 bytes
+INDEX_FIELDS = {"indices"}
+
+
+def _flatten_numbers(value):
+    """Flatten a list of numbers or of number lists; None if value isn't numeric"""
+    flat = []
+    for item in value:
+        if isinstance(item, list):
+            for inner in item:
+                if isinstance(inner, bool) or not isinstance(inner, (int, float)):
+                    return None
+                flat.append(inner)
+        elif isinstance(item, bool) or not isinstance(item, (int, float)):
+            return None
+        else:
+            flat.append(item)
+    return flat
+
+
+def pack_vectors(value: Any, key: str = None) -> Any:
+    """Copy of value with every numeric vector field replaced by packed Float32 bytes"""
+    if isinstance(value, dict):
+        return {k: pack_vectors(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if key in VECTOR_FIELDS:
+            flat = _flatten_numbers(value)
+            if flat is not None:
+                return struct.pack(f"<{len(flat)}f", *flat)
+        if key in INDEX_FIELDS:
+            return struct.pack(f"<{len(value)}I", *value)
+        return [pack_vectors(item) for item in value]
+    return value
+
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+
+def prefers_msgpack(accept_mimetypes) -> bool:
+    """True when MessagePack is installed and the Accept header ranks it above JSON"""
+    if msgpack is None:
+        return False
+    # JSON is listed first so it wins ties such as */*
+    return accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    """Encode a payload as MessagePack with Float32-packed vectors"""
+    # strict_map_key=False on the decoding side allows the integer shape keys
+    return msgpack.packb(pack_vectors(payload), use_bin_type=True)
+
+
+def msgpack_response(payload: Any, status: int = 200):
+    """Flask response carrying a MessagePack-encoded payload"""
+    response = current_app.response_class(
+        encode_msgpack(payload), status=status, mimetype=MSGPACK_MIMETYPE
+    )
+    response.vary.add("Accept")
+    return response
@@ -0,0 +1,12 @@
+"""
+ShapeLearn Backend - Production ASGI Entry Point
+Serve with an ASGI server, e.g.:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+
+import os
+from app import create_app
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(create_app(os.getenv('FLASK_CONFIG', 'production')))
@@ -0,0 +1 @@
+"""ShapeLearn performance benchmarks (run with python -m benchmarks)"""
@@ -0,0 +1,66 @@
+"""
+ShapeLearn benchmark runner
+Run from backend/:
+    python -m benchmarks                          # every group
+    python -m benchmarks --group practice http    # selected groups
+    python -m benchmarks --save benchmarks/baselines/main.json
+    python -m benchmarks --compare benchmarks/baselines/main.json
+"""
+
+import argparse
+import json
+import sys
+
+from .cases import GROUPS
+from .harness import compare, format_table, load_baseline, run_benchmark, save_baseline
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[1])
+    parser.add_argument("--group", nargs="+", choices=sorted(GROUPS), help="only run these groups")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to time each case (default 0.5)")
+    parser.add_argument("--save", metavar="PATH", help="write results to a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="p50 slowdown counted as a regression (default 0.1 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 when a case regresses")
+    parser.add_argument("--json", action="store_true", help="print results as JSON instead of a table")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    baseline = load_baseline(args.compare) if args.compare else None
+
+    results = []
+    for group in args.group or GROUPS:
+        for name, func in GROUPS[group]():
+            if args.filter and args.filter not in name:
+                continue
+            results.append(run_benchmark(name, func, min_time=args.min_time))
+            if not args.json:
+                print(f"  {name}", file=sys.stderr)
+
+    comparisons = compare(results, baseline, args.threshold) if baseline is not None else None
+
+    if args.json:
+        print(json.dumps({
+            "results": [result.to_dict() for result in results],
+            "comparisons": comparisons
+        }, indent=2))
+    else:
+        print(format_table(results, comparisons))
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"Saved baseline to {args.save}", file=sys.stderr)
+
+    if comparisons and args.fail_on_regression and any(c["regression"] for c in comparisons):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
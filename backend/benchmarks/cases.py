@@ -0,0 +1,176 @@
+"""
+Benchmark cases for startup, the math engine and the HTTP endpoints
+Cases are (name, callable) pairs built from fresh fixtures, grouped so a run
+can be narrowed to one area with --group
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.models.class_analytics import analyze_class, columns_from_answers
+from app.models.learning_progress import LearningProgressAggregator
+from app.models.math_operations import MathShapeEngine
+
+Case = Tuple[str, Callable[[], Any]]
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRACTICE_COUNTS = (10, 100, 1000, 10000)
+HISTORY_SIZES = (10, 100, 1000, 10000)
+CLASS_SIZES = (30, 300)
+
+
+def _run_python(code: str, **env: str) -> None:
+    """Run code in a fresh interpreter from backend/, failing loudly on errors"""
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        check=True
+    )
+
+
+def startup_cases() -> List[Case]:
+    """
+    Cold start in a fresh interpreter, as paid by every worker spawn and test run
+    startup.interpreter is the bare interpreter cost to subtract from the others
+    """
+    db_path = os.path.join(tempfile.mkdtemp(), "progress.db")
+    create = "from app import create_app; create_app('production')"
+    return [
+        ("startup.interpreter", lambda: _run_python("pass")),
+        ("startup.import_app", lambda: _run_python("import app.routes.api")),
+        ("startup.create_app", lambda: _run_python(create, PROGRESS_DB_PATH=db_path, ENGINE_WARM_UP="false")),
+        ("startup.create_app_warm", lambda: _run_python(create, PROGRESS_DB_PATH=db_path, ENGINE_WARM_UP="true")),
+    ]
+
+
+def engine_cases() -> List[Case]:
+    """Engine construction, cold and with the transformation table prebuilt"""
+    return [
+        ("engine.construct", MathShapeEngine),
+        ("engine.construct_warm", lambda: MathShapeEngine(warm_up=True)),
+    ]
+
+
+def transformation_cases() -> List[Case]:
+    """Each transformation method, uncached builders and cached lookups"""
+    engine = MathShapeEngine(warm_up=True)
+    return [
+        ("transform.addition", lambda: engine.get_addition_transformation(3, 7)),
+        ("transform.subtraction", lambda: engine.get_subtraction_transformation(8, 3)),
+        ("transform.table_lookup", lambda: engine.get_transformation("addition", 6, 4)),
+        ("transform.keyframes", lambda: engine.get_keyframes("addition", 6, 4)),
+        ("shapes.number_shapes", engine.get_number_shapes),
+        ("shapes.compound_86", lambda: engine.get_shape_for_number(86)),
+        ("shapes.geometry_high", lambda: engine.get_tessellated_shape(8, "high")),
+    ]
+
+
+def practice_cases() -> List[Case]:
+    """Practice generation at growing counts, unseeded and seeded"""
+    engine = MathShapeEngine()
+    cases = []
+    for count in PRACTICE_COUNTS:
+        cases.append((
+            f"practice.addition_{count}",
+            lambda count=count: engine.generate_practice_problems("advanced", "addition", count)
+        ))
+        cases.append((
+            f"practice.subtraction_seeded_{count}",
+            lambda count=count: engine.generate_practice_problems("advanced", "subtraction", count, seed=42)
+        ))
+    return cases
+
+
+def make_history(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Deterministic answer history of the given length"""
+    rng = random.Random(seed)
+    return [
+        {
+            "operation": rng.choice(("addition", "subtraction")),
+            "operand1": rng.randint(0, 10),
+            "operand2": rng.randint(0, 10),
+            "correct": rng.random() < 0.75,
+            "response_time": round(rng.uniform(1, 15), 2),
+        }
+        for _ in range(size)
+    ]
+
+
+def progress_cases() -> List[Case]:
+    """Progress analysis over growing answer histories"""
+    engine = MathShapeEngine()
+    cases = []
+    for size in HISTORY_SIZES:
+        history = make_history(size)
+        cases.append((
+            f"progress.analysis_{size}",
+            lambda history=history: engine.analyze_learning_progress(history)
+        ))
+
+    # Whole-class analytics: one columnar pass against analyzing learner by learner
+    for learners in CLASS_SIZES:
+        answers_by_learner = {f"learner{n}": make_history(100, seed=n) for n in range(learners)}
+        learner_ids = list(answers_by_learner)
+        columns = columns_from_answers(answers_by_learner)
+        cases.append((
+            f"progress.class_bulk_{learners}",
+            lambda learner_ids=learner_ids, columns=columns: analyze_class(learner_ids, columns)
+        ))
+        cases.append((
+            f"progress.class_per_learner_{learners}",
+            lambda answers_by_learner=answers_by_learner: [
+                LearningProgressAggregator.from_answers(answers).analysis()
+                for answers in answers_by_learner.values()
+            ]
+        ))
+    return cases
+
+
+def http_cases() -> List[Case]:
+    """End-to-end requests through the Flask test client"""
+    # Keep benchmark answers out of the real progress database, and let one
+    # client send requests back to back
+    os.environ.setdefault("PROGRESS_DB_PATH", os.path.join(tempfile.mkdtemp(), "progress.db"))
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from app import create_app
+    app = create_app("production")
+    client = app.test_client()
+
+    batch = [
+        {"operation": "addition", "operand1": n % 10, "operand2": n % 7}
+        for n in range(20)
+    ]
+    answers = {"answers": make_history(10)}
+
+    return [
+        ("http.health", lambda: client.get("/health")),
+        ("http.shapes", lambda: client.get("/api/shapes")),
+        ("http.shapes_gzip", lambda: client.get("/api/shapes", headers={"Accept-Encoding": "gzip"})),
+        ("http.shapes_compact", lambda: client.get("/api/shapes?format=compact")),
+        ("http.shape_42", lambda: client.get("/api/shapes/42")),
+        ("http.operation", lambda: client.post(
+            "/api/operation", json={"operation": "addition", "operand1": 3, "operand2": 7}
+        )),
+        ("http.operations_batch_20", lambda: client.post("/api/operations/batch", json=batch)),
+        ("http.practice_50", lambda: client.post(
+            "/api/practice", json={"skill_level": "advanced", "operation_type": "addition", "count": 50}
+        )),
+        ("http.progress_answers_10", lambda: client.post("/api/progress/bench/answers", json=answers)),
+    ]
+
+
+GROUPS: Dict[str, Callable[[], List[Case]]] = {
+    "startup": startup_cases,
+    "engine": engine_cases,
+    "transform": transformation_cases,
+    "practice": practice_cases,
+    "progress": progress_cases,
+    "http": http_cases,
+}
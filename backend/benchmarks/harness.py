@@ -0,0 +1,164 @@
+"""
+Benchmark harness - timing, allocation tracking and baseline comparison
+Each case is timed call by call until a minimum duration is reached, then
+re-run a few times under tracemalloc so allocation tracing doesn't skew timings
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and allocation summary for one benchmark case"""
+
+    name: str
+    iterations: int
+    ops_per_sec: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    allocated_bytes: int
+    peak_bytes: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def run_benchmark(name: str, func: Callable[[], Any], min_time: float = 0.5,
+                  min_iterations: int = 5, warmup: int = 3,
+                  alloc_iterations: int = 3) -> BenchmarkResult:
+    """
+    Time func until min_time seconds and min_iterations calls have elapsed
+    allocated_bytes is memory still held after a call, peak_bytes the high-water
+    mark during one; both are averaged over alloc_iterations traced calls
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_iterations or time.perf_counter() - started < min_time:
+        call_started = time.perf_counter_ns()
+        func()
+        timings.append(time.perf_counter_ns() - call_started)
+
+    allocated, peak = _measure_allocations(func, alloc_iterations)
+
+    samples = np.array(timings, dtype=np.float64) / 1e6
+    return BenchmarkResult(
+        name=name,
+        iterations=len(timings),
+        ops_per_sec=round(1000 / samples.mean(), 2),
+        mean_ms=round(float(samples.mean()), 4),
+        p50_ms=round(float(np.percentile(samples, 50)), 4),
+        p99_ms=round(float(np.percentile(samples, 99)), 4),
+        allocated_bytes=allocated,
+        peak_bytes=peak
+    )
+
+
+def _measure_allocations(func: Callable[[], Any], iterations: int):
+    """Average retained and peak traced bytes per call"""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+
+    allocated = peak = 0
+    try:
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = func()
+            after, high = tracemalloc.get_traced_memory()
+            del result
+            allocated += after - before
+            peak += high - before
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    return allocated // iterations, peak // iterations
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter and platform details stored alongside a baseline"""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+
+
+def save_baseline(path: str, results: List[BenchmarkResult]) -> None:
+    """Write results to a JSON baseline file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "environment": environment(),
+            "results": {result.name: result.to_dict() for result in results}
+        }, f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """Results by case name from a JSON baseline file"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline by median latency
+    A case regresses when its p50 is more than threshold (a fraction) slower
+    """
+    comparisons = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None or not previous.get("p50_ms"):
+            comparisons.append({"name": result.name, "change": None, "regression": False})
+            continue
+        change = result.p50_ms / previous["p50_ms"] - 1
+        comparisons.append({
+            "name": result.name,
+            "change": change,
+            "regression": change > threshold
+        })
+    return comparisons
+
+
+def format_table(results: List[BenchmarkResult],
+                 comparisons: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Plain-text results table, with a p50 change column when comparing"""
+    changes = {c["name"]: c for c in comparisons or []}
+    header = f"{'benchmark':<44}{'ops/sec':>12}{'p50 ms':>11}{'p99 ms':>11}{'alloc KiB':>11}{'peak KiB':>11}"
+    if comparisons is not None:
+        header += f"{'p50 vs base':>14}"
+    lines = [header, "-" * len(header)]
+
+    for result in results:
+        line = (f"{result.name:<44}{result.ops_per_sec:>12.1f}{result.p50_ms:>11.4f}"
+                f"{result.p99_ms:>11.4f}{result.allocated_bytes / 1024:>11.1f}"
+                f"{result.peak_bytes / 1024:>11.1f}")
+        if comparisons is not None:
+            comparison = changes.get(result.name)
+            if comparison is None or comparison["change"] is None:
+                line += f"{'new':>14}"
+            else:
+                marker = " !" if comparison["regression"] else "  "
+                line += f"{comparison['change']:>+12.1%}{marker}"
+        lines.append(line)
+
+    return "\n".join(lines)
@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration for serving ShapeLearn in production
+Worker and thread counts come from the production config (app/config.py):
+
+    WEB_CONCURRENCY   number of worker processes (default: 2 x CPUs + 1, at most 8)
+    GUNICORN_THREADS  threads per worker (default: 4)
+    WORKSHEET_WORKERS worksheet processes per worker (default: CPUs / workers, at least 1)
+    PORT              port to bind (default: 5000)
+"""
+
+import gc
+import os
+
+from app.config import ProductionConfig
+
+settings = ProductionConfig()
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+workers = settings.SERVER_WORKERS
+threads = settings.SERVER_THREADS
+worker_class = 'gthread'
+
+# Build the app (and the warmed-up MathShapeEngine) once in the master process;
+# workers inherit it copy-on-write instead of rebuilding it after fork
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Freeze preloaded objects so the GC doesn't touch (and copy) their pages in workers"""
+    gc.freeze()
+    server.log.info(
+        "ShapeLearn ready with %s workers x %s threads, and up to %s worksheet processes",
+        workers, threads, workers * settings.WORKSHEET_WORKERS
+    )
@@ -1,6 +1,7 @@
 """
 ShapeLearn Backend - Application Entry Point
 Runs the Flask development server
+For production, serve wsgi:app with gunicorn (see gunicorn.conf.py)
 """
 
 import os
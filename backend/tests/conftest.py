@@ -0,0 +1,18 @@
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROGRESS_DB_PATH", str(tmp_path / "progress.db"))
+    monkeypatch.setenv("WORKSHEET_DIR", str(tmp_path / "worksheets"))
+    app = create_app("testing")
+    yield app
+    app.extensions["progress_store"].close()
+    app.extensions["worksheet_jobs"].shutdown()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,45 @@
+from app.services.adaptive_practice import AdaptiveSelector
+from app.services.progress_store import ProgressStore
+
+
+def _answers(count, correct=False):
+    return [{"operation": "addition", "operand1": 9, "operand2": 8, "correct": correct}] * count
+
+
+def test_learners_without_history_use_the_prior_without_a_row(tmp_path):
+    store = ProgressStore(str(tmp_path / "progress.db"))
+    selector = AdaptiveSelector(loader=store.fetch_new_answers)
+    prior = selector.mastery("nobody", "addition")
+    for index in range(50):
+        assert selector.mastery(f"probe-{index}", "addition") == prior
+    selector.select(["a", "b"], "addition", "beginner", 3, seed=1)
+    assert len(selector._rows) == 0
+    assert selector._table.size == 1
+
+
+def test_rows_are_capped_least_recently_used_first(tmp_path):
+    store = ProgressStore(str(tmp_path / "progress.db"))
+    selector = AdaptiveSelector(loader=store.fetch_new_answers, max_learners=2)
+    prior = selector.mastery("nobody", "addition")
+    for learner_id in ("a", "b", "c"):
+        store.record(learner_id, _answers(5))
+        selector.mastery(learner_id, "addition")
+    assert list(selector._rows) == ["b", "c"]
+    assert selector._table.size == 3
+
+    # An evicted learner is rebuilt from the store
+    grid = selector.mastery("a", "addition")
+    assert grid[9][8] < prior[9][8]
+    assert list(selector._rows) == ["c", "a"]
+
+
+def test_mastery_includes_answers_recorded_by_other_processes(tmp_path):
+    path = str(tmp_path / "progress.db")
+    store_a, store_b = ProgressStore(path), ProgressStore(path)
+    selector_a = AdaptiveSelector(loader=store_a.fetch_new_answers)
+    store_a.record("ana", _answers(2, correct=True))
+    before = selector_a.mastery("ana", "addition")[9][8]
+
+    store_b.record("ana", _answers(10))
+    store_b.flush()
+    assert selector_a.mastery("ana", "addition")[9][8] < before
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+import time
+
+from app import create_app
+from app.asgi import create_asgi_app
+
+
+async def _get(asgi_app, url, method="GET", body=b"", headers=()):
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query.encode(),
+        "headers": [(b"host", b"testserver"), *headers], "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234)
+    }
+    messages = []
+
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await asyncio.wait_for(asgi_app(scope, receive, send), timeout=10)
+    return messages[0]["status"], b"".join(m.get("body", b"") for m in messages[1:])
+
+
+async def _post_json(asgi_app, path, payload, headers=()):
+    body = json.dumps(payload).encode()
+    return await _get(asgi_app, path, "POST", body, [
+        (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers
+    ])
+
+
+def test_flask_routes_run_in_parallel(app):
+    threads = set()
+
+    def slow():
+        threads.add(threading.get_ident())
+        time.sleep(0.3)
+        return "ok"
+
+    app.add_url_rule("/slow", view_func=slow)
+    asgi_app = create_asgi_app(app)
+
+    async def run():
+        return await asyncio.gather(*(_get(asgi_app, "/slow") for _ in range(4)))
+
+    started = time.perf_counter()
+    responses = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    assert [status for status, _ in responses] == [200] * 4
+    # Serialized onto one thread this would take 1.2s
+    assert elapsed < 0.9
+    assert len(threads) > 1
+
+
+def test_flask_routes_release_their_concurrency_slot(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROGRESS_DB_PATH", str(tmp_path / "progress.db"))
+    monkeypatch.setenv("WORKSHEET_DIR", str(tmp_path / "worksheets"))
+    monkeypatch.setenv("MAX_CONCURRENT_REQUESTS", "1")
+    app = create_app("testing")
+    asgi_app = create_asgi_app(app)
+    operation = {"operation": "addition", "operand1": 2, "operand2": 3}
+
+    async def run():
+        # With the slot still held after the first response the rest would get a 503
+        return [await _post_json(asgi_app, "/api/operation", operation) for _ in range(3)]
+
+    try:
+        assert [status for status, _ in asyncio.run(run())] == [200] * 3
+    finally:
+        app.extensions["progress_store"].close()
+        app.extensions["worksheet_jobs"].shutdown()
+
+
+def test_native_lesson_stream_matches_the_flask_view(app, client):
+    events_url = client.post("/api/lessons", json={"count": 2, "seed": 1}).json["events_url"]
+    client.delete(events_url.rsplit("/", 1)[0])
+    expected = client.get(events_url + "?pace=false").get_data()
+
+    status, body = asyncio.run(_get(create_asgi_app(app), events_url + "?pace=false"))
+    assert status == 200
+    assert body == expected
+    assert b"event: closed" in body
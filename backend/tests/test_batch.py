@@ -0,0 +1,51 @@
+import pytest
+
+
+def _operation(operand1, operand2, operation="addition"):
+    return {"operation": operation, "operand1": operand1, "operand2": operand2}
+
+
+def test_batch_results_match_single_operations(client):
+    items = [_operation(3, 4), _operation(9, 2, "subtraction")]
+    response = client.post("/api/operations/batch", json={"operations": items})
+    assert response.status_code == 200
+    assert (response.json["total"], response.json["succeeded"], response.json["failed"]) == (2, 2, 0)
+
+    for index, (item, result) in enumerate(zip(items, response.json["results"])):
+        single = client.post("/api/operation", json=item).json
+        assert result == {"index": index, **single}
+
+
+def test_bare_lists_are_accepted(client):
+    response = client.post("/api/operations/batch", json=[_operation(1, 1)])
+    assert response.status_code == 200
+    assert response.json["results"][0]["result"] == 2
+
+
+@pytest.mark.parametrize("body", [{"operations": []}, {"operations": {"operation": "addition"}}, {}, "3 + 4"])
+def test_bodies_without_a_list_of_operations_are_rejected(client, body):
+    response = client.post("/api/operations/batch", json=body)
+    assert response.status_code == 400
+    assert response.json["error"] == "Expected a non-empty list of operations"
+
+
+def test_batch_size_is_capped(app, client):
+    app.config["OPERATION_BATCH_MAX_SIZE"] = 3
+    assert client.post("/api/operations/batch", json=[_operation(1, 2)] * 3).status_code == 200
+
+    response = client.post("/api/operations/batch", json=[_operation(1, 2)] * 4)
+    assert response.status_code == 400
+    assert response.json["error"] == "Batch is limited to 3 operations"
+
+
+def test_invalid_items_fail_on_their_own(client):
+    items = [_operation(3, 4), "3 + 4", _operation(2, 9, "subtraction"), _operation(1, 2, "division")]
+    response = client.post("/api/operations/batch", json={"operations": items})
+    assert response.status_code == 200
+    assert (response.json["succeeded"], response.json["failed"]) == (1, 3)
+
+    results = response.json["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert results[0]["success"] is True
+    assert results[1] == {"index": 1, "success": False, "error": "Each operation must be a JSON object"}
+    assert all(result["success"] is False and result["error"] for result in results[2:])
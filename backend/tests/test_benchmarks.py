@@ -0,0 +1,46 @@
+import json
+import os
+
+from benchmarks.__main__ import main
+from benchmarks.harness import BenchmarkResult, compare, load_baseline, save_baseline
+
+BASELINE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "baselines", "main.json")
+
+
+def _result(name, p50_ms):
+    return BenchmarkResult(name, 10, 1000 / p50_ms, p50_ms, p50_ms, p50_ms, 0, 0)
+
+
+def test_compare_flags_slowdowns_over_the_threshold():
+    baseline = {"fast": {"p50_ms": 1.0}, "steady": {"p50_ms": 1.0}, "zero": {"p50_ms": 0}}
+    results = [_result("fast", 1.2), _result("steady", 1.05), _result("zero", 1.0), _result("new", 1.0)]
+    comparisons = {c["name"]: c for c in compare(results, baseline, threshold=0.1)}
+
+    assert comparisons["fast"]["regression"] is True
+    assert round(comparisons["fast"]["change"], 6) == 0.2
+    assert comparisons["steady"]["regression"] is False
+    # Cases without a usable baseline are reported but never fail a run
+    assert comparisons["zero"] == {"name": "zero", "change": None, "regression": False}
+    assert comparisons["new"]["change"] is None
+
+
+def test_fail_on_regression_sets_the_exit_status(tmp_path, capsys):
+    path = str(tmp_path / "baseline.json")
+    args = ["--group", "engine", "--filter", "engine.construct", "--min-time", "0.01", "--json"]
+
+    save_baseline(path, [_result("engine.construct", 1e-9), _result("engine.construct_warm", 1e-9)])
+    assert main(args + ["--compare", path, "--fail-on-regression"]) == 1
+    assert main(args + ["--compare", path]) == 0
+
+    save_baseline(path, [_result("engine.construct", 1e9), _result("engine.construct_warm", 1e9)])
+    capsys.readouterr()
+    assert main(args + ["--compare", path, "--fail-on-regression"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert [c["name"] for c in report["comparisons"]] == ["engine.construct", "engine.construct_warm"]
+    assert not any(c["regression"] for c in report["comparisons"])
+
+
+def test_committed_baseline_is_loadable():
+    baseline = load_baseline(BASELINE)
+    assert "transform.addition" in baseline and "http.operation" in baseline
+    assert all(result["p50_ms"] > 0 for result in baseline.values())
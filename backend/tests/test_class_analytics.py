@@ -0,0 +1,62 @@
+import pytest
+
+from app.models.class_analytics import analyze_class, columns_from_answers
+from app.models.learning_progress import LearningProgressAggregator
+
+ANSWERS = {
+    "ana": [
+        {"operation": "addition", "operand1": 3, "operand2": 4, "correct": True, "response_time": 2.0},
+        {"operation": "addition", "operand1": 3, "operand2": 4, "correct": False, "response_time": 5.0},
+        {"operation": "subtraction", "operand1": 9, "operand2": 2, "correct": True}
+    ],
+    "ben": [
+        {"operation": "addition", "operand1": 3, "operand2": 4, "correct": False, "response_time": 3.5}
+    ]
+}
+
+
+def test_learner_statistics_match_the_aggregator():
+    report = analyze_class(list(ANSWERS), columns_from_answers(ANSWERS))
+    for row, answers in zip(report["learners"], ANSWERS.values()):
+        expected = LearningProgressAggregator.from_answers(answers).analysis()
+        assert row["total_problems"] == expected["total_problems"]
+        assert row["accuracy"] == pytest.approx(expected["accuracy"])
+        assert row["average_response_time"] == pytest.approx(expected["average_response_time"])
+        assert row["response_time_std"] == pytest.approx(expected["response_time_std"])
+        assert row["addition_accuracy"] == pytest.approx(expected["addition_accuracy"])
+    assert report["heatmaps"]["addition"]["attempts"][3][4] == 3
+
+
+def test_out_of_grid_and_malformed_columns_are_ignored():
+    answers = {"ana": [
+        {"operation": "addition", "operand1": 2 ** 70, "operand2": 4, "correct": True, "response_time": "slow"},
+        {"operation": "addition", "operand1": 3, "operand2": 4, "correct": True, "response_time": 2.0}
+    ]}
+    report = analyze_class(["ana"], columns_from_answers(answers))
+    assert report["learners"][0]["total_problems"] == 2
+    assert report["learners"][0]["average_response_time"] == 2.0
+    # Only the in-grid fact reaches the heatmap
+    assert sum(map(sum, report["heatmaps"]["addition"]["attempts"])) == 1
+
+
+@pytest.mark.parametrize("field, value, error", [
+    ("operand1", 2 ** 70, "Operands must be between 0 and 20"),
+    ("response_time", "slow", "Response time must be a non-negative number of seconds"),
+    ("operation", "division", "Operation must be 'addition' or 'subtraction'"),
+])
+def test_posted_answers_are_validated(client, field, value, error):
+    answer = {**ANSWERS["ben"][0], field: value}
+    response = client.post("/api/progress/analytics", json={"answers_by_learner": {"ben": [answer]}})
+    assert response.status_code == 400
+    assert response.json["error"] == error
+
+
+def test_non_object_bodies_are_rejected(client):
+    response = client.post("/api/progress/analytics", json=[ANSWERS])
+    assert response.status_code == 400
+
+
+def test_posted_answers_are_analyzed(client):
+    response = client.post("/api/progress/analytics", json={"answers_by_learner": ANSWERS})
+    assert response.status_code == 200
+    assert response.json["class"]["total_problems"] == 4
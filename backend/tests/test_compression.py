@@ -0,0 +1,67 @@
+import gzip
+import json
+
+import pytest
+
+from app.utils import compression
+from app.utils.compression import negotiate_encoding
+
+
+def _practice(client, count, **headers):
+    return client.post("/api/practice", json={"count": count, "seed": 1}, headers=headers)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip", "gzip"),
+    ("identity", None),
+    ("br;q=0, gzip;q=0", None),
+])
+def test_encoding_preference(app, monkeypatch, accept_encoding, expected):
+    # Rank as if Brotli were installed
+    monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("br", "gzip"))
+    with app.test_request_context(headers={"Accept-Encoding": accept_encoding}):
+        assert negotiate_encoding() == expected
+
+
+def test_brotli_is_preferred_when_installed(client):
+    brotli = pytest.importorskip("brotli")
+    response = _practice(client, 10, **{"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(response.get_data()))["success"] is True
+
+
+def test_only_bodies_over_the_threshold_are_compressed(client):
+    small = _practice(client, 1, **{"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+    assert "accept-encoding" in small.vary.as_set()
+
+    large = _practice(client, 10, **{"Accept-Encoding": "gzip"})
+    assert large.headers["Content-Encoding"] == "gzip"
+    assert "accept-encoding" in large.vary.as_set()
+    body = json.loads(gzip.decompress(large.get_data()))
+    assert body == _practice(client, 10, **{"Accept-Encoding": "identity"}).json
+
+
+def test_clients_without_accept_encoding_get_identity(client):
+    response = _practice(client, 10)
+    assert "Content-Encoding" not in response.headers
+    assert response.json["success"] is True
+
+
+def test_not_modified_responses_have_no_body_to_compress(client):
+    etag = client.get("/api/shapes", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    response = client.get("/api/shapes", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert "accept-encoding" in response.vary.as_set()
+
+
+def test_streamed_responses_are_not_compressed(client):
+    response = client.post("/api/practice", json={"count": 600, "stream": True, "seed": 1},
+                           headers={"Accept-Encoding": "gzip"})
+    assert response.mimetype == "application/x-ndjson"
+    assert "Content-Encoding" not in response.headers
+    assert "accept-encoding" in response.vary.as_set()
+    assert len(response.get_data(as_text=True).splitlines()) == 600
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.models.geometry import LOD_LEVELS, can_tessellate, tessellate_shape, tessellate_tube
+from app.models.math_operations import MathShapeEngine
+
+
+@pytest.mark.parametrize("lod", list(LOD_LEVELS))
+def test_tube_buffer_sizes_follow_the_level_of_detail(lod):
+    path_segments, radial_segments = LOD_LEVELS[lod]["path_segments"], LOD_LEVELS[lod]["radial_segments"]
+    centerline = np.zeros((path_segments, 3))
+    centerline[:, 0] = np.linspace(0, 2, path_segments)
+    mesh = tessellate_tube(centerline, 0.25, radial_segments)
+
+    assert mesh["vertices"].shape == mesh["normals"].shape == (path_segments * radial_segments, 3)
+    assert len(mesh["indices"]) == (path_segments - 1) * radial_segments * 6
+    assert mesh["vertices"].dtype == np.float32 and mesh["indices"].dtype == np.uint32
+
+    # Every vertex sits on the tube surface, along its unit normal from the centerline
+    rings = mesh["vertices"].reshape(path_segments, radial_segments, 3) - centerline[:, None, :]
+    assert np.allclose(np.linalg.norm(rings, axis=-1), 0.25, atol=1e-5)
+    assert np.allclose(np.linalg.norm(mesh["normals"], axis=-1), 1, atol=1e-5)
+
+
+@pytest.mark.parametrize("lod", list(LOD_LEVELS))
+def test_shape_indices_stay_in_bounds(lod):
+    engine = MathShapeEngine()
+    for shape in engine.shape_definitions.values():
+        if not can_tessellate(shape["type"]):
+            continue
+        mesh = tessellate_shape(shape, lod)
+        assert mesh["indices"].max() < len(mesh["vertices"])
+        # No degenerate triangles
+        triangles = mesh["indices"].reshape(-1, 3)
+        assert all(len(set(triangle)) == 3 for triangle in triangles.tolist())
+
+
+def test_geometry_endpoint_counts_match_the_buffers(client):
+    response = client.get("/api/shapes/8/geometry?lod=high")
+    assert response.status_code == 200
+    mesh = response.json["components"][0]["mesh"]
+    assert len(mesh["vertices"]) == len(mesh["normals"]) == 3 * mesh["vertex_count"]
+    assert len(mesh["indices"]) == mesh["index_count"]
+
+
+def test_primitive_shapes_have_no_mesh(client):
+    # 1 is a cylinder, drawn with a Three.js primitive
+    response = client.get("/api/shapes/1/geometry")
+    assert response.json["lod"] == "medium"
+    assert response.json["components"][0]["mesh"] is None
+
+
+@pytest.mark.parametrize("path", ["/api/shapes/8/geometry?lod=ultra", "/api/shapes/101/geometry"])
+def test_invalid_geometry_requests_are_rejected(client, path):
+    response = client.get(path)
+    assert response.status_code == 400
+    assert response.json["success"] is False
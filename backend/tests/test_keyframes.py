@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from app.models.keyframes import EASINGS, build_keyframe_tracks
+from app.routes.api import parse_keyframe_options
+
+STEPS = [
+    {"duration": 500, "shapes": {"a": {"position": [-2, 0, 0]}, "b": {"position": [2, 0, 0]}}},
+    {"duration": 1000, "shapes": {"a": {"position": [-2, 0, 0], "target_position": [0, 1, 0]},
+                                  "b": {"scale": [2, 2, 2]}}},
+    {"duration": 500, "shapes": {"result": {"position": [0, 0, 0], "scale": [1.5, 1.5, 1.5]}}},
+]
+
+
+def _frame(track, frame):
+    return track["position"][3 * frame:3 * frame + 3], track["scale"][3 * frame:3 * frame + 3], track["opacity"][frame]
+
+
+@pytest.mark.parametrize("easing", list(EASINGS))
+def test_easings_run_from_start_to_end(easing):
+    t = np.linspace(0, 1, 101)
+    eased = EASINGS[easing](t)
+    assert eased[0] == 0 and eased[-1] == pytest.approx(1)
+    assert np.all(np.diff(eased) >= 0)
+
+
+def test_easings_shape_the_motion():
+    assert EASINGS["ease_in"](0.25) < 0.25 < EASINGS["ease_out"](0.25)
+    assert EASINGS["ease_in_out"](np.array(0.5)) == pytest.approx(0.5)
+
+
+def test_unknown_easing_and_frame_rates_are_rejected():
+    with pytest.raises(ValueError, match="Easing must be one of"):
+        build_keyframe_tracks(STEPS, easing="bounce")
+    with pytest.raises(ValueError, match="Frame rate must be between 1 and 120"):
+        build_keyframe_tracks(STEPS, fps=0)
+
+
+@pytest.mark.parametrize("easing", list(EASINGS))
+def test_first_and_last_frames_match_the_step_states(easing):
+    tracks = build_keyframe_tracks(STEPS, fps=30, easing=easing)
+    assert tracks["duration"] == 2000
+    assert tracks["frame_count"] == 61
+    last = tracks["frame_count"] - 1
+
+    a, b, result = tracks["tracks"]["a"], tracks["tracks"]["b"], tracks["tracks"]["result"]
+    # Shapes fade in where they first appear
+    assert _frame(a, 0) == ([-2, 0, 0], [1, 1, 1], 0)
+    assert _frame(b, 0) == ([2, 0, 0], [1, 1, 1], 0)
+    assert _frame(result, 0)[2] == 0
+    # The operands fade out once the result appears, which ends fully visible
+    assert _frame(a, last) == ([0, 1, 0], [1, 1, 1], 0)
+    assert _frame(b, last) == ([2, 0, 0], [2, 2, 2], 0)
+    assert _frame(result, last) == ([0, 0, 0], [1.5, 1.5, 1.5], 1)
+
+
+@pytest.mark.parametrize("options, expected", [
+    (None, None),
+    (False, None),
+    (True, {"fps": 30, "easing": "ease_in_out"}),
+    ({"fps": 1, "easing": "linear"}, {"fps": 1, "easing": "linear"}),
+    ({"fps": 120}, {"fps": 120, "easing": "ease_in_out"}),
+])
+def test_valid_keyframe_options(options, expected):
+    assert parse_keyframe_options(options) == (expected, None)
+
+
+@pytest.mark.parametrize("options, error", [
+    ({"fps": 0}, "keyframes.fps must be an integer between 1 and 120"),
+    ({"fps": 121}, "keyframes.fps must be an integer between 1 and 120"),
+    ({"fps": 29.97}, "keyframes.fps must be an integer between 1 and 120"),
+    ({"fps": True}, "keyframes.fps must be an integer between 1 and 120"),
+    ({"easing": "bounce"}, "keyframes.easing must be one of linear, ease_in, ease_out, ease_in_out"),
+    ("fast", "keyframes must be true or an object with fps and easing"),
+])
+def test_invalid_keyframe_options_are_rejected(client, options, error):
+    assert parse_keyframe_options(options) == (None, error)
+
+    response = client.post("/api/operation", json={
+        "operation": "addition", "operand1": 3, "operand2": 4, "keyframes": options
+    })
+    assert response.status_code == 400
+    assert response.json["error"] == error
+
+
+def test_operation_keyframes_end_on_the_result(client):
+    response = client.post("/api/operation", json={
+        "operation": "addition", "operand1": 3, "operand2": 4, "keyframes": {"fps": 10, "easing": "linear"}
+    })
+    keyframes = response.json["keyframes"]
+    assert (keyframes["fps"], keyframes["easing"]) == (10, "linear")
+
+    result = keyframes["tracks"]["result"]
+    assert _frame(result, 0)[2] == 0
+    assert _frame(result, keyframes["frame_count"] - 1)[2] == 1
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from app.utils.lazy_import import lazy_import
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter, since this one has imported NumPy already
+STARTUP_SCRIPT = """
+import sys
+import app
+
+assert "numpy" not in sys.modules, "imported with the app package"
+flask_app = app.create_app("testing")
+assert "numpy" not in sys.modules, "imported by create_app"
+
+client = flask_app.test_client()
+assert client.get("/health").status_code == 200
+assert "numpy" not in sys.modules, "imported by a request that doesn't need it"
+
+assert client.get("/api/shapes/8/geometry").status_code == 200
+assert "numpy" in sys.modules, "not imported on first use"
+
+flask_app.extensions["progress_store"].close()
+flask_app.extensions["worksheet_jobs"].shutdown()
+"""
+
+
+def test_numpy_is_imported_on_first_use(tmp_path):
+    env = {
+        **os.environ,
+        "PROGRESS_DB_PATH": str(tmp_path / "progress.db"),
+        "WORKSHEET_DIR": str(tmp_path / "worksheets"),
+        "ENGINE_WARM_UP": "false",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_lazy_module_loads_once_and_caches_attributes():
+    module = lazy_import("json")
+    assert "not loaded" in repr(module)
+
+    assert module.dumps([1]) == "[1]"
+    assert "loaded" in repr(module) and "not loaded" not in repr(module)
+    assert module.__dict__["dumps"] is module._module.dumps
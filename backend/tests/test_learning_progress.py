@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from app.models.learning_progress import LearningProgressAggregator, merge_aggregators
+from app.services.learner_progress import LearnerProgressRegistry
+
+
+def _answers(count, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "operation": rng.choice(["addition", "subtraction"]),
+            "correct": rng.random() < 0.7,
+            "response_time": rng.choice([None, 0, rng.uniform(0.5, 12)])
+        }
+        for _ in range(count)
+    ]
+
+
+def _state(aggregator):
+    return {name: getattr(aggregator, name) for name in LearningProgressAggregator.__slots__}
+
+
+@pytest.mark.parametrize("split", [0, 1, 17, 40])
+def test_merged_shards_match_one_pass(split):
+    answers = _answers(40, seed=split)
+    whole = LearningProgressAggregator.from_answers(answers)
+    merged = LearningProgressAggregator.from_answers(answers[:split]).merge(
+        LearningProgressAggregator.from_answers(answers[split:])
+    )
+
+    expected, actual = _state(whole), _state(merged)
+    for name in ("response_time_mean", "response_time_m2"):
+        assert actual.pop(name) == pytest.approx(expected.pop(name))
+    assert actual == expected
+
+
+def test_streaks_reset_on_a_wrong_answer_and_merge_across_shards():
+    first = LearningProgressAggregator.from_answers(
+        [{"correct": True}, {"correct": False}, {"correct": True}, {"correct": True}]
+    )
+    assert (first.current_streak, first.longest_streak, first.leading_streak) == (2, 2, 1)
+
+    second = LearningProgressAggregator.from_answers([{"correct": True}] * 2 + [{"correct": False}])
+    merged = first.merge(second)
+    # The run spanning both shards is the longest
+    assert (merged.current_streak, merged.longest_streak, merged.leading_streak) == (0, 4, 1)
+
+
+def test_empty_history():
+    aggregator = LearningProgressAggregator.from_answers([])
+    assert aggregator.analysis() == {"status": "no_data", "recommendation": "start_with_basics"}
+    assert merge_aggregators([]).analysis()["status"] == "no_data"
+    assert aggregator.accuracy == 0 and aggregator.response_time_variance == 0
+
+
+def test_registry_keeps_the_most_recently_used_learners():
+    registry = LearnerProgressRegistry(max_learners=2)
+    for learner_id in ("ana", "ben"):
+        registry.record(learner_id, [{"operation": "addition", "correct": True}])
+    registry.analysis("ana")
+    registry.record("cy", [{"operation": "addition", "correct": True}])
+
+    assert registry.get("ben") is None
+    assert registry.get("ana").total == 1 and registry.get("cy").total == 1
+
+
+def test_evicted_learners_are_rebuilt_from_the_store():
+    stored = {"ana": [{"id": 1, "operation": "addition", "correct": True}]}
+    registry = LearnerProgressRegistry(
+        loader=lambda learner_id, after_id: [a for a in stored.get(learner_id, []) if a["id"] > after_id],
+        max_learners=1
+    )
+    assert registry.analysis("ana")["total_problems"] == 1
+    registry.analysis("ben")
+    assert registry.rollup(["ana", "ben"])["total_problems"] == 1
+    assert registry.analysis("ana")["total_problems"] == 1
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from app.models.operations import get_operation
+
+
+@pytest.fixture
+def stream_cap(monkeypatch):
+    monkeypatch.setenv("LESSON_MAX_STREAMS", "2")
+
+
+def _start_lesson(client):
+    response = client.post("/api/lessons", json={"count": 2, "seed": 1})
+    assert response.status_code == 201
+    return response.json["events_url"]
+
+
+def test_lesson_streams_are_capped_per_process(stream_cap, client):
+    events_url = _start_lesson(client)
+    # Unread streams keep their slot until the response is closed
+    open_streams = [client.get(events_url, buffered=False) for _ in range(2)]
+    assert all(response.status_code == 200 for response in open_streams)
+
+    refused = client.get(events_url)
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "5"
+    assert refused.json["success"] is False
+
+    open_streams.pop().close()
+    response = client.get(events_url, buffered=False)
+    assert response.status_code == 200
+    response.close()
+    for response in open_streams:
+        response.close()
+
+
+@pytest.mark.parametrize("operation_type", ["addition", "subtraction"])
+def test_lessons_only_hold_problems_that_can_be_visualized(app, client, operation_type):
+    operation = get_operation(operation_type)
+    sessions = app.extensions["lesson_sessions"]
+    for seed in range(10):
+        response = client.post("/api/lessons", json={
+            "skill_level": "advanced", "operation_type": operation_type, "count": 50, "seed": seed
+        })
+        assert response.status_code == 201
+        problems = sessions.get(response.json["session_id"])["problems"]
+        assert [problem["id"] for problem in problems] == list(range(1, 51))
+        assert all(operation.in_bounds(problem["operand1"], problem["operand2"]) for problem in problems)
+
+
+def test_seeded_lessons_are_reproducible(app, client):
+    sessions = app.extensions["lesson_sessions"]
+    lesson = {"skill_level": "advanced", "count": 20, "seed": 7}
+    first, second = (client.post("/api/lessons", json=lesson).json["session_id"] for _ in range(2))
+    assert sessions.get(first)["problems"] == sessions.get(second)["problems"]
+
+
+def test_learner_lesson_out_of_bounds_is_rejected(app, client, monkeypatch):
+    def select(learner_ids, operation, skill_level, count, seed=None):
+        return {learner_ids[0]: (np.array([15, 3]), np.array([9, 4]), None)}
+
+    monkeypatch.setattr(app.extensions["adaptive_selector"], "select", select)
+    response = client.post("/api/lessons", json={"skill_level": "advanced", "learner_id": "ana", "count": 2})
+    assert response.status_code == 400
+    assert response.json["error"] == "Problem 15 + 9 = ? can't be visualized"
@@ -0,0 +1,102 @@
+import math
+import re
+from collections import defaultdict
+
+from app import create_app
+
+SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(?P<name>[a-zA-Z_][a-zA-Z0-9_]*)="(?P<value>(?:[^"\\]|\\.)*)"(?:,|$)')
+
+
+def _parse(text):
+    """{metric family: (type, [(sample name, labels, value), ...])}, checking the text format"""
+    families = {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name not in families
+            families[name] = (kind, [])
+            continue
+
+        match = SAMPLE.match(line)
+        assert match, line
+        labels = dict(LABEL.findall(match["labels"] or ""))
+        name = match["name"]
+        family = next(
+            family for family in (name, re.sub(r"_(bucket|sum|count)$", "", name)) if family in families
+        )
+        families[family][1].append((name, labels, float(match["value"])))
+    return families
+
+
+def _histogram_series(samples):
+    series = defaultdict(dict)
+    for name, labels, value in samples:
+        key = (labels["endpoint"], labels["method"])
+        if name.endswith("_bucket"):
+            series[key].setdefault("buckets", []).append((float(labels["le"]), value))
+        else:
+            series[key][name.rsplit("_", 1)[1]] = value
+    return series
+
+
+def test_metrics_are_valid_prometheus_text(client):
+    client.get("/api/shapes")
+    client.post("/api/operation", json={"operation": "addition", "operand1": 3, "operand2": 4})
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    families = _parse(response.get_data(as_text=True))
+
+    kind, samples = families["shapelearn_request_duration_seconds"]
+    assert kind == "histogram"
+    series = _histogram_series(samples)
+    assert {("/api/shapes", "GET"), ("/api/operation", "POST"), ("<unmatched>", "GET")} <= set(series)
+    for histogram in series.values():
+        bounds = [bound for bound, _ in histogram["buckets"]]
+        counts = [count for _, count in histogram["buckets"]]
+        assert bounds == sorted(bounds) and bounds[-1] == math.inf
+        # Buckets are cumulative and the last one holds every request
+        assert counts == sorted(counts) and counts[-1] == histogram["count"] >= 1
+        assert histogram["sum"] >= 0
+
+    assert families["shapelearn_response_size_bytes"][0] == "histogram"
+    requests = {
+        (labels["endpoint"], labels["status"]): value
+        for _, labels, value in families["shapelearn_requests_total"][1]
+    }
+    assert requests[("/api/operation", "200")] == 1
+    assert requests[("<unmatched>", "404")] == 1
+
+
+def test_cache_and_gauge_collectors_are_rendered(client):
+    client.get("/api/shapes/47")
+    client.get("/api/shapes/47")
+    families = _parse(client.get("/metrics").get_data(as_text=True))
+
+    hits = {labels["cache"]: value for _, labels, value in families["shapelearn_cache_hits_total"][1]}
+    assert {"compound_shapes", "shape_meshes", "keyframes", "shape_payloads"} <= set(hits)
+    assert hits["shape_payloads"] >= 1
+    assert families["shapelearn_cache_hit_ratio"][0] == "gauge"
+    for _, _, ratio in families["shapelearn_cache_hit_ratio"][1]:
+        assert 0 <= ratio <= 1
+
+    queue_depth = families["shapelearn_worksheet_queue_depth"]
+    assert queue_depth == ("gauge", [("shapelearn_worksheet_queue_depth", {}, 0)])
+    assert families["shapelearn_uptime_seconds"][0] == "gauge"
+
+
+def test_metrics_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROGRESS_DB_PATH", str(tmp_path / "progress.db"))
+    monkeypatch.setenv("WORKSHEET_DIR", str(tmp_path / "worksheets"))
+    monkeypatch.setenv("METRICS_ENABLED", "false")
+    app = create_app("testing")
+    try:
+        assert app.test_client().get("/metrics").status_code == 404
+    finally:
+        app.extensions["progress_store"].close()
+        app.extensions["worksheet_jobs"].shutdown()
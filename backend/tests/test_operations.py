@@ -0,0 +1,241 @@
+import copy
+import json
+import operator
+
+import pytest
+
+from app.models.math_operations import MathShapeEngine
+from app.models.operations import (
+    OPERATIONS, Operation, PracticeRules, compile_steps, get_operation, practice_operations,
+    register_operation, unsupported_operation_message
+)
+from app.services.adaptive_practice import AdaptiveSelector
+
+
+def _addition_steps(operand1, operand2, result):
+    """Steps as the engine built them by hand before the operation registry"""
+    if result == 10:
+        return [
+            {
+                "step": 1,
+                "description": f"Number {operand1} and {operand2} are complementary - they naturally fit together",
+                "animation": "highlight_complementary",
+                "duration": 1000,
+                "shapes": {
+                    "operand1": {"position": [-2, 0, 0], "scale": [1, 1, 1]},
+                    "operand2": {"position": [2, 0, 0], "scale": [1, 1, 1]}
+                }
+            },
+            {
+                "step": 2,
+                "description": f"Watch how {operand1} and {operand2} connect at their natural linking points",
+                "animation": "move_to_link",
+                "duration": 2000,
+                "shapes": {
+                    "operand1": {"position": [-0.8, 0, 0], "rotation": [0, 0, 0]},
+                    "operand2": {"position": [0.8, 0, 0], "rotation": [0, 0, 0]}
+                }
+            },
+            {
+                "step": 3,
+                "description": "The shapes flow together to create 10!",
+                "animation": "merge_to_result",
+                "duration": 1500,
+                "shapes": {"result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2]}}
+            }
+        ]
+    return [
+        {
+            "step": 1,
+            "description": f"Starting with {operand1} and {operand2}",
+            "animation": "present_operands",
+            "duration": 1000,
+            "shapes": {
+                "operand1": {"position": [-2, 0, 0], "scale": [1, 1, 1]},
+                "operand2": {"position": [2, 0, 0], "scale": [1, 1, 1]}
+            }
+        },
+        {
+            "step": 2,
+            "description": f"Bringing {operand1} and {operand2} together",
+            "animation": "move_together",
+            "duration": 2000,
+            "shapes": {"operand1": {"position": [-0.5, 0, 0]}, "operand2": {"position": [0.5, 0, 0]}}
+        },
+        {
+            "step": 3,
+            "description": f"They combine to form {result}!",
+            "animation": "transform_to_result",
+            "duration": 1500,
+            "shapes": {"result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2]}}
+        }
+    ]
+
+
+def _subtraction_steps(operand1, operand2, result):
+    """Steps as the engine built them by hand before the operation registry"""
+    return [
+        {
+            "step": 1,
+            "description": f"Starting with {operand1}",
+            "animation": "present_minuend",
+            "duration": 1000,
+            "shapes": {"operand1": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2], "opacity": 1}}
+        },
+        {
+            "step": 2,
+            "description": f"Watch as {operand2} phases through like a storm",
+            "animation": "subtraction_storm",
+            "duration": 2500,
+            "shapes": {
+                "operand1": {"opacity": 0.7, "color_shift": True},
+                "operand2": {
+                    "position": [-3, 0, 0],
+                    "target_position": [3, 0, 0],
+                    "opacity": 0.6,
+                    "effect": "phasing"
+                }
+            }
+        },
+        {
+            "step": 3,
+            "description": f"The transformation leaves us with {result}!",
+            "animation": "reveal_result",
+            "duration": 1500,
+            "shapes": {"result": {"position": [0, 0, 0], "scale": [1.2, 1.2, 1.2], "opacity": 1}}
+        }
+    ]
+
+
+def _previous_transformation(operation, operand1, operand2):
+    if operation == "addition":
+        result = operand1 + operand2
+        return {
+            "type": "addition", "operand1": operand1, "operand2": operand2, "result": result,
+            "is_complementary": result == 10, "steps": _addition_steps(operand1, operand2, result)
+        }
+    result = operand1 - operand2
+    return {
+        "type": "subtraction", "operand1": operand1, "operand2": operand2, "result": result,
+        "steps": _subtraction_steps(operand1, operand2, result)
+    }
+
+
+def test_registry_matches_previous_transformations():
+    engine = MathShapeEngine()
+    pairs = 0
+    for name, operation in OPERATIONS.items():
+        for operand1 in range(operation.max_operand + 1):
+            for operand2 in range(operation.max_operand + 1):
+                if not operation.in_bounds(operand1, operand2):
+                    continue
+                expected = _previous_transformation(name, operand1, operand2)
+                # Serialized without sorting, so key order must match too
+                assert json.dumps(operation.transformation(operand1, operand2)) == json.dumps(expected)
+                assert engine.get_transformation(name, operand1, operand2) == expected
+                pairs += 1
+    assert pairs == 462
+
+
+def test_compile_steps_fills_placeholders_in_nested_templates():
+    template = [
+        {"label": "{operand1} + {operand2} = {result:02d}", "shapes": {"fixed": [1, 2], "name": "n{result}"}},
+        ["static", "{operand2!r}"],
+        {"untouched": {"depth": [0]}}
+    ]
+    steps = compile_steps(template)(3, 4, 7)
+
+    assert steps == [
+        {"label": "3 + 4 = 07", "shapes": {"fixed": [1, 2], "name": "n7"}},
+        ["static", "4"],
+        {"untouched": {"depth": [0]}}
+    ]
+    assert template[0]["label"] == "{operand1} + {operand2} = {result:02d}"
+    # Static parts are shared with the template rather than copied
+    assert steps[0]["shapes"]["fixed"] is template[0]["shapes"]["fixed"]
+    assert steps[2] is template[2]
+
+
+def test_compile_steps_hands_out_a_fresh_list_for_static_templates():
+    template = [{"step": 1}]
+    fill = compile_steps(template)
+    assert fill(1, 2, 3) == template
+    assert fill(1, 2, 3) is not template
+
+
+def test_compile_steps_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="Unknown template field"):
+        compile_steps([{"description": "{operand3}"}])
+
+
+def test_get_operation_ignores_unknown_names():
+    assert get_operation("addition").symbol == "+"
+    assert get_operation("division") is None
+    assert get_operation(["addition"]) is None
+
+
+def test_precomputed_transformations_are_read_only():
+    transformation = MathShapeEngine().get_transformation("addition", 3, 7)
+
+    with pytest.raises(TypeError):
+        transformation["result"] = 11
+    with pytest.raises(TypeError):
+        transformation["steps"][0]["shapes"]["operand1"]["position"].append(1)
+    assert json.loads(json.dumps(transformation))["result"] == 10
+    # Copies are ordinary, mutable dicts
+    copied = copy.deepcopy(transformation)
+    copied["steps"][0]["duration"] = 0
+    assert type(copied) is dict
+
+
+@pytest.fixture
+def multiplication():
+    operation = register_operation(Operation(
+        name="multiplication",
+        symbol="x",
+        compute=operator.mul,
+        max_result=20,
+        steps=[{"step": 1, "description": "{operand1} groups of {operand2}"}],
+        practice=PracticeRules(
+            draw=lambda randint, min_num, max_num: (randint(1, 4), randint(1, 5)),
+            draw_many=lambda rng, min_num, max_num, count: (
+                rng.integers(1, 4, size=count, endpoint=True), rng.integers(1, 5, size=count, endpoint=True)
+            ),
+            facts=lambda a, b, min_num, max_num: (a >= 1) & (b >= 1) & (a * b <= 20),
+            difficulty=lambda a, b: a * b / 10 - 1
+        )
+    ))
+    yield operation
+    del OPERATIONS["multiplication"]
+
+
+def test_operations_without_practice_rules_cannot_be_practiced(client):
+    register_operation(Operation(
+        name="division", symbol="/", compute=operator.floordiv, steps=[{"step": 1}]
+    ))
+    try:
+        response = client.post("/api/practice", json={"operation_type": "division"})
+        assert response.status_code == 400
+        assert response.json["error"] == "Operation must be 'addition' or 'subtraction'"
+        assert unsupported_operation_message() == \
+            "Operation must be 'addition', 'subtraction' or 'division'"
+    finally:
+        del OPERATIONS["division"]
+
+
+def test_practice_follows_operations_registered_later(client, multiplication):
+    selector = AdaptiveSelector()
+    selector.record("ana", [{"operation": "addition", "operand1": 2, "operand2": 3, "correct": True}])
+    assert practice_operations() == ("addition", "subtraction", "multiplication")
+
+    response = client.post("/api/practice", json={"operation_type": "multiplication", "count": 3})
+    assert response.status_code == 200
+    for problem in response.json["problems"]:
+        assert problem["result"] == problem["operand1"] * problem["operand2"]
+        assert problem["equation"].startswith(f"{problem['operand1']} x ")
+
+    # Mastery tables built before the registration grow a column for it
+    selector.record("ana", [{"operation": "multiplication", "operand1": 2, "operand2": 3, "correct": True}])
+    operand1, operand2, _ = selector.select(["ana"], "multiplication", "beginner", 4, seed=1)["ana"]
+    assert all(a * b <= 20 for a, b in zip(operand1, operand2))
+    assert len(selector.mastery("ana", "multiplication")) == 21
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.mark.parametrize("body, error", [
+    ({"count": True}, "Count must be an integer between 1 and 100"),
+    ({"count": 0}, "Count must be an integer between 1 and 100"),
+    ({"skill_level": "expert"}, "Skill level must be one of beginner, intermediate, advanced"),
+    ({"operation_type": "division"}, "Operation must be 'addition' or 'subtraction'"),
+])
+def test_invalid_practice_requests_are_rejected(client, body, error):
+    response = client.post("/api/practice", json=body)
+    assert response.status_code == 400
+    assert response.json["error"] == error
+
+
+@pytest.mark.parametrize("body", ["null", "[1, 2]", "not json"])
+def test_practice_without_a_json_object_is_rejected(client, body):
+    response = client.post("/api/practice", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.json["error"] == "No JSON data provided"
+
+
+def test_count_cap_is_higher_for_streams(client):
+    assert client.post("/api/practice", json={"count": 100}).status_code == 200
+    assert client.post("/api/practice", json={"count": 101}).status_code == 400
+
+    assert client.post("/api/practice", json={"count": 10000, "stream": True}).status_code == 200
+    response = client.post("/api/practice", json={"count": 10001, "stream": True})
+    assert response.status_code == 400
+    assert response.json["error"] == "Count must be an integer between 1 and 10000"
+
+
+def test_streamed_problems_are_newline_delimited_json(client):
+    response = client.post("/api/practice", json={"count": 600, "stream": True, "seed": 3,
+                                                   "operation_type": "subtraction"})
+    assert response.mimetype == "application/x-ndjson"
+
+    problems = _ndjson(response)
+    assert [problem["id"] for problem in problems] == list(range(1, 601))
+    for problem in problems:
+        assert problem["operation"] == "subtraction"
+        assert problem["result"] == problem["operand1"] - problem["operand2"] >= 0
+
+
+def test_accept_header_selects_the_stream(client):
+    response = client.post("/api/practice", json={"count": 3, "seed": 3},
+                           headers={"Accept": "application/x-ndjson"})
+    assert response.mimetype == "application/x-ndjson"
+    streamed = _ndjson(response)
+
+    # The same seed gives the same problems as the JSON response
+    assert streamed == client.post("/api/practice", json={"count": 3, "seed": 3}).json["problems"]
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.utils import profiling
+from app.utils.profiling import METADATA_SUFFIX, RequestProfiler
+
+
+@pytest.fixture
+def profile_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "1")
+    return tmp_path / "profiles"
+
+
+@pytest.fixture
+def slow_profile_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setenv("PROFILE_SLOW_MS", "50")
+    monkeypatch.setenv("PROFILE_SAMPLE_INTERVAL_MS", "5")
+    monkeypatch.setenv("PROFILE_ENDPOINTS", "/slow")
+    return tmp_path / "profiles"
+
+
+def _metadata(directory):
+    names = sorted(name for name in os.listdir(directory) if name.endswith(METADATA_SUFFIX))
+    return [json.loads((directory / name).read_text()) for name in names]
+
+
+def test_requests_are_sampled_at_the_configured_rate(tmp_path, monkeypatch):
+    assert RequestProfiler(str(tmp_path), sample_rate=0).start_profile() is None
+
+    profiler = RequestProfiler(str(tmp_path), sample_rate=0.25)
+    monkeypatch.setattr(profiling.random, "random", lambda: 0.3)
+    assert profiler.start_profile() is None
+    monkeypatch.setattr(profiling.random, "random", lambda: 0.2)
+    profile = profiler.start_profile()
+    assert profile is not None
+    profiler.stop_profile(profile)
+
+
+def test_only_one_profile_runs_at_a_time(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_rate=1)
+    first = profiler.start_profile()
+    assert first is not None
+    assert profiler.start_profile() is None
+
+    profiler.stop_profile(first)
+    second = profiler.start_profile()
+    assert second is not None
+    profiler.stop_profile(second)
+
+
+def test_endpoint_filter(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_rate=1, endpoints=["/api/operation"])
+    assert profiler.wants("/api/operation")
+    assert not profiler.wants("/api/shapes")
+    assert not profiler.wants(None)
+    assert RequestProfiler(str(tmp_path), sample_rate=1).wants("/api/shapes")
+    assert not RequestProfiler(str(tmp_path)).wants("/api/operation")
+
+
+def test_only_the_newest_profiles_are_kept(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_rate=1, max_profiles=3)
+    for index in range(5):
+        profile = profiler.start_profile()
+        profiler.stop_profile(profile)
+        profiler.write("sampled", {"index": index}, profile=profile)
+
+    assert [metadata["index"] for metadata in _metadata(tmp_path)] == [2, 3, 4]
+    # Each profile's .prof file goes with its metadata
+    assert len(os.listdir(tmp_path)) == 6
+
+
+def test_watchdog_samples_the_stacks_of_slow_requests(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), slow_threshold=0.02, sample_interval=0.005)
+
+    def slow_request():
+        active = profiler.watch()
+        time.sleep(0.2)
+        profiler.unwatch(active)
+        return active
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(slow_request()))
+    thread.start()
+    thread.join()
+
+    stacks = results[0].stacks
+    assert sum(stacks.values()) > 5
+    # Stacks are the watched thread's, root frame first
+    assert all(stack.split(";")[-1].startswith("test_profiling.py:slow_request:") for stack in stacks)
+    assert profiler._watchdog.is_alive()
+    # Unwatched requests are no longer sampled
+    assert not profiler._active
+
+
+def test_sampled_requests_write_a_profile(profile_env, client):
+    client.post("/api/operation", json={"operation": "addition", "operand1": 3, "operand2": 4})
+    # Not in PROFILE_ENDPOINTS
+    client.get("/api/shapes")
+
+    (metadata,) = _metadata(profile_env)
+    assert (metadata["kind"], metadata["endpoint"], metadata["status"]) == ("sampled", "/api/operation", 200)
+    assert any(name.endswith(".prof") for name in os.listdir(profile_env))
+
+
+def test_slow_requests_write_their_stacks(slow_profile_env, app, client):
+    def slow():
+        time.sleep(0.2)
+        return "ok"
+
+    app.add_url_rule("/slow", view_func=slow)
+    client.get("/slow")
+
+    (metadata,) = _metadata(slow_profile_env)
+    assert metadata["kind"] == "slow" and metadata["samples"] > 0
+    (stacks_name,) = [name for name in os.listdir(slow_profile_env) if name.endswith(".stacks.txt")]
+    assert "test_profiling.py:slow:" in (slow_profile_env / stacks_name).read_text()
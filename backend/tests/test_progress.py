@@ -0,0 +1,194 @@
+import sqlite3
+import time
+
+import pytest
+
+from app.services.learner_progress import LearnerProgressRegistry, record_learner_answers
+from app.services.progress_store import ProgressStore
+
+
+def _answer(correct=True, **fields):
+    return {"operation": "addition", "operand1": 3, "operand2": 4, "correct": correct, **fields}
+
+
+def test_registry_includes_answers_recorded_by_other_processes(tmp_path):
+    path = str(tmp_path / "progress.db")
+    # Two workers: separate stores and registries over one database
+    store_a, store_b = ProgressStore(path), ProgressStore(path)
+    registry_a = LearnerProgressRegistry(loader=store_a.fetch_new_answers)
+    registry_b = LearnerProgressRegistry(loader=store_b.fetch_new_answers)
+
+    store_a.record("ana", [_answer(), _answer(False)])
+    assert registry_a.analysis("ana")["total_problems"] == 2
+
+    store_b.record("ana", [_answer(), _answer()])
+    store_b.flush()
+    analysis = registry_a.analysis("ana")
+    assert analysis["total_problems"] == 4
+    assert analysis["accuracy"] == 0.75
+    assert registry_b.analysis("ana")["total_problems"] == 4
+
+
+def test_recorded_answers_are_counted_once(client):
+    for _ in range(3):
+        response = client.post("/api/progress/ana/answers", json=_answer(response_time=2.0))
+        assert response.status_code == 200
+    assert response.json["analysis"]["total_problems"] == 3
+    assert client.get("/api/progress/ana").json["analysis"]["total_problems"] == 3
+    assert client.get("/api/progress/rollup?learner_ids=ana,ben").json["analysis"]["total_problems"] == 3
+
+
+
+def test_answer_posts_are_written_in_batches(app, client, monkeypatch):
+    store = app.extensions["progress_store"]
+    transactions = []
+    insert = store._insert
+    monkeypatch.setattr(store, "_insert", lambda rows: (transactions.append(len(rows)), insert(rows)))
+
+    for count in range(1, 11):
+        response = client.post("/api/progress/ana/answers", json=_answer())
+        assert response.json["analysis"]["total_problems"] == count
+    assert len(transactions) < 10
+
+    store.flush()
+    assert sum(transactions) == 10
+    assert client.get("/api/progress/ana").json["analysis"]["total_problems"] == 10
+
+
+def test_registry_reads_back_only_other_processes_answers(tmp_path):
+    path = str(tmp_path / "progress.db")
+    store_a, store_b = ProgressStore(path), ProgressStore(path)
+    registry_a = LearnerProgressRegistry(loader=store_a.fetch_new_answers,
+                                         update_loader=store_a.fetch_others_answers)
+
+    store_a.record("ana", [_answer()])
+    assert registry_a.analysis("ana")["total_problems"] == 1
+
+    # Recorded here: folded in directly, and not counted again once stored
+    registry_a.record("ana", [_answer(False)])
+    store_a.record("ana", [_answer(False)])
+    store_a.flush()
+    store_b.record("ana", [_answer()])
+    store_b.flush()
+    analysis = registry_a.analysis("ana")
+    assert analysis["total_problems"] == 3
+    assert analysis["accuracy"] == 2 / 3
+
+
+def test_older_databases_gain_the_writer_column(tmp_path):
+    path = str(tmp_path / "progress.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE answers (id INTEGER PRIMARY KEY, learner_id TEXT NOT NULL, operation TEXT NOT NULL, "
+        "operand1 INTEGER, operand2 INTEGER, correct INTEGER NOT NULL, response_time REAL, "
+        "answered_at REAL NOT NULL)"
+    )
+    connection.execute("INSERT INTO answers (learner_id, operation, correct, answered_at) "
+                       "VALUES ('ana', 'addition', 1, 1.0)")
+    connection.commit()
+    connection.close()
+
+    store = ProgressStore(path)
+    store.record("ana", [_answer()])
+    store.flush()
+    assert len(store.fetch_answers("ana")) == 2
+    # Rows from before the migration count as another process's
+    assert len(store.fetch_others_answers("ana")) == 1
+    store.close()
+
+
+def test_recorded_answers_reach_statistics_mastery_and_store(app):
+    record_learner_answers(app.extensions, "ana", [_answer(), _answer(False)])
+
+    assert app.extensions["learner_progress"].analysis("ana")["total_problems"] == 2
+    assert app.extensions["adaptive_selector"].mastery("ana", "addition")[3][4] != \
+        app.extensions["adaptive_selector"].mastery("ben", "addition")[3][4]
+    app.extensions["progress_store"].flush()
+    assert len(app.extensions["progress_store"].fetch_answers("ana")) == 2
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A long interval keeps the background flusher out of the way
+    store = ProgressStore(str(tmp_path / "progress.db"), batch_size=100, flush_interval=60)
+    yield store
+    store.close()
+
+
+def test_flush_writes_buffered_answers_in_order(store):
+    store.record("ana", [_answer(), _answer(False)])
+    store.record("ben", [_answer()])
+    assert store.flush() == 3
+    assert store.flush() == 0
+    assert [answer["correct"] for answer in store.fetch_answers("ana")] == [True, False]
+
+
+def test_missing_answered_at_defaults_to_now(store):
+    store.record("ana", [_answer(answered_at=None), _answer(answered_at=5.0)])
+    assert store.flush() == 2
+    times = [answer["answered_at"] for answer in store.fetch_answers("ana")]
+    assert times[0] == 5.0 and times[1] > 5.0
+
+
+def test_rejected_rows_are_dead_lettered_without_losing_the_batch(store):
+    store.record("ana", [_answer(), _answer(operation=None), _answer(False)])
+    assert store.flush() == 2
+    assert [row[1] for row in store.dead_letters] == [None]
+    assert len(store.fetch_answers("ana")) == 2
+
+
+def test_rows_the_driver_refuses_are_dead_lettered(store):
+    store.record("ana", [_answer(), _answer(operand1=2 ** 70), _answer(response_time=[1])])
+    assert store.flush() == 1
+    assert [row[2] for row in store.dead_letters] == [2 ** 70, 3]
+    assert len(store.fetch_answers("ana")) == 1
+
+
+def test_background_flusher_survives_unexpected_errors(tmp_path, monkeypatch):
+    store = ProgressStore(str(tmp_path / "progress.db"), flush_interval=0.01)
+    flush = store.flush
+    failures = []
+
+    def fail_once():
+        if not failures:
+            failures.append(True)
+            raise RuntimeError("boom")
+        return flush()
+
+    monkeypatch.setattr(store, "flush", fail_once)
+    store.record("ana", [_answer()])
+    deadline = time.time() + 5
+    while not store._connection().execute("SELECT COUNT(*) FROM answers").fetchone()[0]:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert failures and store._flusher.is_alive()
+    store.close()
+
+
+@pytest.mark.parametrize("field, value, error", [
+    ("operand1", 2 ** 70, "Operands must be between 0 and 20"),
+    ("operand2", -1, "Operands must be between 0 and 20"),
+    ("response_time", float("inf"), "Response time must be a non-negative number of seconds"),
+])
+def test_out_of_range_answers_are_rejected(client, field, value, error):
+    response = client.post("/api/progress/ana/answers", json=_answer(**{field: value}))
+    assert response.status_code == 400
+    assert response.json["error"] == error
+
+
+def test_failed_flush_keeps_the_batch_for_the_next_one(store, monkeypatch):
+    store.record("ana", [_answer()])
+    insert = store._insert
+
+    def locked(rows):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "_insert", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+
+    # Answers recorded meanwhile stay behind the requeued batch
+    store.record("ana", [_answer(False)])
+    monkeypatch.setattr(store, "_insert", insert)
+    assert store.flush() == 2
+    assert [answer["correct"] for answer in store.fetch_answers("ana")] == [True, False]
@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from app.utils.rate_limit import SHARD_COUNT, AdmissionControl, TokenBucketLimiter
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATE_LIMITS", "/api/shapes=1:2")
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    monkeypatch.setenv("MAX_CONCURRENT_REQUESTS", "1")
+
+
+def _get(client, url):
+    # Like a real server, close the response once it is read
+    return client.get(url, buffered=True)
+
+
+def _stream_practice(client):
+    return client.post("/api/practice", json={"count": 50, "stream": True}, buffered=False)
+
+
+def test_over_limit_requests_get_429_with_retry_after(limits, client):
+    assert [_get(client, "/api/shapes").status_code for _ in range(2)] == [200, 200]
+
+    response = _get(client, "/api/shapes")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.json == {"success": False, "error": "Too many requests, please slow down"}
+    # Limits are per endpoint, and monitoring is never limited
+    assert _get(client, "/api/shapes/3").status_code == 200
+    assert all(_get(client, "/health").status_code == 200 for _ in range(5))
+    assert client.application.extensions["admission"].rejected_rate == 1
+
+
+def test_streamed_responses_hold_their_slot_until_closed(one_slot, client):
+    stream = _stream_practice(client)
+    assert stream.status_code == 200
+
+    busy = _get(client, "/api/shapes")
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "1"
+
+    stream.close()
+    assert _get(client, "/api/shapes").status_code == 200
+    # Buffered responses hand their slot back once read
+    assert _get(client, "/api/shapes").status_code == 200
+    assert client.application.extensions["admission"].rejected_concurrency == 1
+
+
+def test_failed_requests_release_their_slot(one_slot, app, client):
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+
+    @app.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    assert _get(client, "/boom").status_code == 500
+    assert _get(client, "/api/shapes").status_code == 200
+
+
+def test_concurrency_cap_defaults_below_the_thread_count(monkeypatch):
+    from app.config import ProductionConfig
+
+    monkeypatch.setenv("GUNICORN_THREADS", "8")
+    monkeypatch.delenv("MAX_CONCURRENT_REQUESTS", raising=False)
+    assert ProductionConfig().MAX_CONCURRENT_REQUESTS == 7
+
+
+def test_rejections_are_counted_across_threads():
+    admission = AdmissionControl(TokenBucketLimiter(rate=0.001, burst=1))
+
+    def hammer():
+        for _ in range(500):
+            admission.admit("client", "/api/practice")
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert admission.rejected_rate == 8 * 500 - 1
+
+
+def test_bucket_table_evicts_least_recently_used_keys():
+    limiter = TokenBucketLimiter(rate=0.001, burst=1, max_keys=2 * SHARD_COUNT)
+    # Three clients whose buckets land in the same stripe
+    clients = [f"client{n}" for n in range(1000)]
+    shard = hash((clients[0], "/api/practice")) % SHARD_COUNT
+    first, second, third = [c for c in clients if hash((c, "/api/practice")) % SHARD_COUNT == shard][:3]
+
+    assert limiter.acquire(first, "/api/practice") == 0
+    assert limiter.acquire(second, "/api/practice") == 0
+    assert limiter.acquire(first, "/api/practice") > 0
+    assert limiter.acquire(third, "/api/practice") == 0
+
+    # second was least recently used, so it starts over with a full bucket
+    assert limiter.acquire(second, "/api/practice") == 0
+    assert limiter.acquire(first, "/api/practice") == 0
+    assert len(limiter) <= 2 * SHARD_COUNT
@@ -0,0 +1,40 @@
+import gzip
+import json
+
+
+def test_shapes_are_served_with_a_strong_etag(client):
+    response = client.get("/api/shapes", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    etag, weak = response.get_etag()
+    assert etag and not weak
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+
+    # The same payload is served with the same ETag
+    assert client.get("/api/shapes", headers={"Accept-Encoding": "identity"}).get_etag() == (etag, False)
+
+
+def test_matching_if_none_match_gets_304(client):
+    etag = client.get("/api/shapes/7").headers["ETag"]
+
+    response = client.get("/api/shapes/7", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.headers["ETag"] == etag
+
+    stale = client.get("/api/shapes/7", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+
+
+def test_each_encoding_has_its_own_etag(client):
+    identity = client.get("/api/shapes", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/api/shapes", headers={"Accept-Encoding": "gzip"})
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.get_etag()[0] == f"{identity.get_etag()[0]}-gzip"
+    assert json.loads(gzip.decompress(gzipped.get_data())) == identity.json
+
+    # An identity ETag doesn't validate the gzip representation
+    response = client.get("/api/shapes", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": identity.headers["ETag"]
+    })
+    assert response.status_code == 200
@@ -0,0 +1,21 @@
+import pytest
+
+ENDPOINTS = [
+    ("/api/practice", {"count": 3}),
+    ("/api/practice/adaptive", {"learner_id": "ana", "count": 3}),
+    ("/api/worksheets", {"count": 3}),
+    ("/api/lessons", {"count": 3}),
+]
+
+
+@pytest.mark.parametrize("path, body", ENDPOINTS)
+@pytest.mark.parametrize("seed", [-1, True, 1.5, "7"])
+def test_invalid_seeds_are_rejected(client, path, body, seed):
+    response = client.post(path, json={**body, "seed": seed})
+    assert response.status_code == 400
+    assert response.json["error"] == "Seed must be a non-negative integer"
+
+
+@pytest.mark.parametrize("path, body", ENDPOINTS)
+def test_non_negative_seeds_are_accepted(client, path, body):
+    assert client.post(path, json={**body, "seed": 0}).status_code < 300
@@ -0,0 +1,83 @@
+import pytest
+
+from app.models.math_operations import MathShapeEngine
+
+
+def _expected_components(engine, number):
+    digits = [int(digit) for digit in str(number)]
+    labels = ("hundreds", "tens", "ones")[-len(digits):]
+    return [
+        {"shape": engine.shape_definitions[digit], "label": label} if index == 0 or digit else None
+        for index, (digit, label) in enumerate(zip(digits, labels))
+    ]
+
+
+@pytest.mark.parametrize("number", [21, 30, 47, 99, 100])
+def test_large_numbers_are_composed_from_their_digits(client, number):
+    response = client.get(f"/api/shapes/{number}")
+    assert response.status_code == 200
+    shape = response.json["shape"]
+    assert shape["type"] == "compound"
+
+    components = [
+        {"shape": component["shape"], "label": component["label"]} if component else None
+        for component in shape["components"]
+    ]
+    assert components == _expected_components(MathShapeEngine(), number)
+
+
+def test_every_number_up_to_100_has_a_shape(client):
+    for number in range(101):
+        assert client.get(f"/api/shapes/{number}").status_code == 200
+    assert client.get("/api/shapes/101").status_code == 400
+
+
+def test_compound_shapes_are_kept_in_a_bounded_lru():
+    engine = MathShapeEngine(shape_cache_size=4)
+    for number in range(10, 101):
+        engine.get_shape_for_number(number)
+    info = engine.shape_cache_info()
+    assert (info["size"], info["max_size"], info["misses"]) == (4, 4, 91)
+
+    engine.get_shape_for_number(100)
+    assert engine.shape_cache_info()["hits"] == 1
+    # Digits are resident and never go through the LRU
+    engine.get_shape_for_number(7)
+    assert engine.shape_cache_info()["hits"] == 1
+
+
+def _expand(base_shapes, shape):
+    """Full-format shape from a compact one"""
+    if "shape_ref" in shape:
+        return base_shapes[str(shape["shape_ref"])]
+    return {
+        **shape,
+        "components": [
+            {"shape": base_shapes[str(component.pop("shape_ref"))], **component} if component else None
+            for component in shape["components"]
+        ]
+    }
+
+
+def test_compact_shapes_expand_to_the_full_format(client):
+    full = client.get("/api/shapes").json
+    compact = client.get("/api/shapes?format=compact").json
+    assert compact["format"] == "compact"
+    assert compact["total_numbers"] == full["total_numbers"] == 21
+
+    expanded = {number: _expand(compact["base_shapes"], shape) for number, shape in compact["shapes"].items()}
+    assert expanded == full["shapes"]
+
+
+@pytest.mark.parametrize("number", [7, 47, 100])
+def test_compact_shape_expands_to_the_full_format(client, number):
+    full = client.get(f"/api/shapes/{number}").json
+    compact = client.get(f"/api/shapes/{number}?format=compact").json
+    assert _expand(compact["base_shapes"], compact["shape"]) == full["shape"]
+
+
+@pytest.mark.parametrize("path", ["/api/shapes?format=tiny", "/api/shapes/7?format=tiny"])
+def test_unknown_formats_are_rejected(client, path):
+    response = client.get(path)
+    assert response.status_code == 400
+    assert response.json["error"] == "Format must be 'full' or 'compact'"
@@ -0,0 +1,64 @@
+import struct
+
+import pytest
+
+from app.utils.wire_format import INDEX_FIELDS, MSGPACK_MIMETYPE, VECTOR_FIELDS
+
+msgpack = pytest.importorskip("msgpack")
+
+
+def _flatten(value):
+    return [number for item in value for number in (item if isinstance(item, list) else [item])]
+
+
+def _assert_matches(packed, expected, key=None):
+    """Compare a decoded MessagePack value with the JSON one, unpacking Float32/Uint32 buffers"""
+    if isinstance(packed, bytes):
+        flat = _flatten(expected)
+        if key in VECTOR_FIELDS:
+            assert struct.unpack(f"<{len(flat)}f", packed) == pytest.approx(flat, rel=1e-6, abs=1e-6)
+        else:
+            assert key in INDEX_FIELDS
+            assert list(struct.unpack(f"<{len(flat)}I", packed)) == flat
+    elif isinstance(packed, dict):
+        assert {str(k) for k in packed} == set(expected)
+        for k, value in packed.items():
+            _assert_matches(value, expected[str(k)], k)
+    elif isinstance(packed, list):
+        assert len(packed) == len(expected)
+        for item, expected_item in zip(packed, expected):
+            _assert_matches(item, expected_item)
+    else:
+        assert packed == pytest.approx(expected) if isinstance(packed, float) else packed == expected
+
+
+def _get_both(client, method, path, **kwargs):
+    as_json = getattr(client, method)(path, **kwargs)
+    as_msgpack = getattr(client, method)(path, headers={"Accept": MSGPACK_MIMETYPE}, **kwargs)
+    assert as_msgpack.mimetype == MSGPACK_MIMETYPE
+    assert "accept" in as_msgpack.vary.as_set()
+    return msgpack.unpackb(as_msgpack.get_data(), raw=False, strict_map_key=False), as_json.json
+
+
+@pytest.mark.parametrize("operation", [
+    {"operation": "addition", "operand1": 3, "operand2": 7},
+    {"operation": "subtraction", "operand1": 12, "operand2": 5, "keyframes": {"fps": 24}},
+])
+def test_msgpack_operation_matches_json(client, operation):
+    packed, expected = _get_both(client, "post", "/api/operation", json=operation)
+    _assert_matches(packed, expected)
+    assert isinstance(packed["transformation"]["steps"][0]["shapes"]["operand1"]["position"], bytes)
+
+
+def test_msgpack_geometry_matches_json(client):
+    packed, expected = _get_both(client, "get", "/api/shapes/8/geometry?lod=low")
+    _assert_matches(packed, expected)
+    mesh = packed["components"][0]["mesh"]
+    assert isinstance(mesh["vertices"], bytes) and isinstance(mesh["indices"], bytes)
+
+
+def test_json_is_served_unless_msgpack_is_preferred(client):
+    operation = {"operation": "addition", "operand1": 3, "operand2": 7}
+    for accept in ("*/*", f"application/json, {MSGPACK_MIMETYPE}", f"{MSGPACK_MIMETYPE};q=0.5, application/json"):
+        response = client.post("/api/operation", json=operation, headers={"Accept": accept})
+        assert response.mimetype == "application/json"
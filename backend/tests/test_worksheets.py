@@ -0,0 +1,42 @@
+import os
+import time
+
+from app import create_app
+
+STALE = time.time() - 2 * 86400
+
+
+def _touch(path, mtime):
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write("{}")
+    os.utime(path, (mtime, mtime))
+
+
+def test_startup_sweeps_old_job_files(tmp_path, monkeypatch):
+    directory = tmp_path / "worksheets"
+    directory.mkdir()
+    old_id, new_id = "a" * 32, "b" * 32
+    for name in (f"{old_id}.json", f"{old_id}.status.json", f"{old_id}.json.partial"):
+        _touch(directory / name, STALE)
+    _touch(directory / f"{new_id}.json", time.time())
+    _touch(directory / f"{new_id}.status.json", time.time())
+    _touch(directory / "notes.json", STALE)
+
+    monkeypatch.setenv("PROGRESS_DB_PATH", str(tmp_path / "progress.db"))
+    monkeypatch.setenv("WORKSHEET_DIR", str(directory))
+    monkeypatch.setenv("ENGINE_WARM_UP", "false")
+    app = create_app()
+    try:
+        assert sorted(os.listdir(directory)) == [f"{new_id}.json", f"{new_id}.status.json", "notes.json"]
+    finally:
+        app.extensions["progress_store"].close()
+        app.extensions["worksheet_jobs"].shutdown()
+
+
+def test_sweep_keeps_files_newer_than_max_age(app):
+    queue = app.extensions["worksheet_jobs"]
+    path = os.path.join(queue.directory, "c" * 32 + ".json")
+    _touch(path, STALE)
+    assert queue.sweep(3 * 86400) == 0
+    assert queue.sweep(86400) == 1
+    assert not os.path.exists(path)
@@ -0,0 +1,12 @@
+"""
+ShapeLearn Backend - Production WSGI Entry Point
+Serve with gunicorn using the bundled configuration:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+from app import create_app
+
+# Built once in the gunicorn master (preload_app) so workers share it after fork
+app = create_app(os.getenv('FLASK_CONFIG', 'production'))
@@ -1,5 +1,22 @@
 import axios from 'axios'
-import { NumberShape, CompoundShape, MathOperation, PracticeProblem } from '../types/math'
+import {
+  NumberShape,
+  CompoundShape,
+  MathOperation,
+  PracticeProblem,
+  AdaptivePracticeProblem,
+  BatchOperationRequest,
+  BatchOperationResult,
+  CompactShapeTable,
+  KeyframeOptions,
+  LessonHandlers,
+  LessonSession,
+  LevelOfDetail,
+  TessellatedShape,
+  Worksheet,
+  WorksheetJob,
+  WorksheetSection
+} from '../types/math'
 
 const API_BASE_URL = (import.meta as any).env?.VITE_API_URL || 'http://localhost:5000'
 
@@ -95,6 +112,41 @@ const getMockShapes = (): Record<number, NumberShape | CompoundShape> => {
   return shapes
 }
 
+// Mock calculation for when backend is not available
+const getMockOperation = (
+  operation: 'addition' | 'subtraction',
+  operand1: number,
+  operand2: number
+): MathOperation => {
+  const result = operation === 'addition' ? operand1 + operand2 : operand1 - operand2
+  const isComplementary = operation === 'addition' && operand1 + operand2 === 10
+
+  return {
+    success: true,
+    operation,
+    operand1,
+    operand2,
+    result,
+    transformation: {
+      type: operation,
+      operand1,
+      operand2,
+      result,
+      is_complementary: isComplementary,
+      steps: [
+        {
+          step: 1,
+          description: `${operand1} ${operation === 'addition' ? '+' : '-'} ${operand2} = ${result}`,
+          animation: 'simple_calculation',
+          duration: 1000,
+          shapes: {}
+        }
+      ]
+    },
+    equation: `${operand1} ${operation === 'addition' ? '+' : '-'} ${operand2} = ${result}`
+  }
+}
+
 // Health check
 export const healthCheck = async () => {
   try {
@@ -106,12 +158,39 @@ export const healthCheck = async () => {
   }
 }
 
-// Get all number shapes (0-20)
+// Expand a compact shape table into full shapes, giving each component its own copy
+const expandCompactShapes = (
+  table: CompactShapeTable
+): Record<number, NumberShape | CompoundShape> => {
+  const copyBaseShape = (id: number): NumberShape => {
+    const base = table.base_shapes[id]
+    return { ...base, geometry: { ...base.geometry } }
+  }
+
+  const shapes: Record<number, NumberShape | CompoundShape> = {}
+  for (const [key, shape] of Object.entries(table.shapes)) {
+    if ('shape_ref' in shape) {
+      shapes[Number(key)] = copyBaseShape(shape.shape_ref)
+    } else {
+      shapes[Number(key)] = {
+        ...shape,
+        components: shape.components.map((component) =>
+          component
+            ? { shape: copyBaseShape(component.shape_ref), position: component.position, label: component.label }
+            : null
+        )
+      }
+    }
+  }
+  return shapes
+}
+
+// Get all number shapes (0-20), fetched in the compact format to keep the payload small
 export const getAllShapes = async (): Promise<Record<number, NumberShape | CompoundShape>> => {
   try {
-    const response = await api.get('/api/shapes')
+    const response = await api.get('/api/shapes', { params: { format: 'compact' } })
     if (response.data.success) {
-      return response.data.shapes
+      return expandCompactShapes(response.data)
     }
     throw new Error(response.data.error || 'Failed to fetch shapes')
   } catch (error) {
@@ -138,17 +217,31 @@ export const getNumberShape = async (number: number): Promise<NumberShape | Comp
   }
 }
 
+// Get pre-tessellated geometry so low-end devices can skip building curved shapes
+export const getShapeGeometry = async (
+  number: number,
+  lod: LevelOfDetail = 'medium'
+): Promise<TessellatedShape> => {
+  const response = await api.get(`/api/shapes/${number}/geometry`, { params: { lod } })
+  if (response.data.success) {
+    return response.data
+  }
+  throw new Error(response.data.error || 'Failed to fetch shape geometry')
+}
+
 // Calculate math operation
 export const calculateOperation = async (
   operation: 'addition' | 'subtraction',
   operand1: number,
-  operand2: number
+  operand2: number,
+  keyframes?: KeyframeOptions | boolean
 ): Promise<MathOperation> => {
   try {
     const response = await api.post('/api/operation', {
       operation,
       operand1,
       operand2,
+      ...(keyframes ? { keyframes } : {}),
     })
     
     if (response.data.success) {
@@ -157,35 +250,27 @@ export const calculateOperation = async (
     throw new Error(response.data.error || 'Failed to calculate operation')
   } catch (error) {
     console.warn('Backend not available for operation, using mock calculation:', error)
-    
-    // Mock calculation
-    const result = operation === 'addition' ? operand1 + operand2 : operand1 - operand2
-    const isComplementary = operation === 'addition' && operand1 + operand2 === 10
-    
-    return {
-      success: true,
-      operation,
-      operand1,
-      operand2,
-      result,
-      transformation: {
-        type: operation,
-        operand1,
-        operand2,
-        result,
-        is_complementary: isComplementary,
-        steps: [
-          {
-            step: 1,
-            description: `${operand1} ${operation === 'addition' ? '+' : '-'} ${operand2} = ${result}`,
-            animation: 'simple_calculation',
-            duration: 1000,
-            shapes: {}
-          }
-        ]
-      },
-      equation: `${operand1} ${operation === 'addition' ? '+' : '-'} ${operand2} = ${result}`
+    return getMockOperation(operation, operand1, operand2)
+  }
+}
+
+// Calculate many math operations in one round trip (e.g. a whole worksheet)
+export const calculateOperationsBatch = async (
+  operations: BatchOperationRequest[]
+): Promise<BatchOperationResult[]> => {
+  try {
+    const response = await api.post('/api/operations/batch', { operations })
+
+    if (response.data.success) {
+      return response.data.results
     }
+    throw new Error(response.data.error || 'Failed to calculate operations')
+  } catch (error) {
+    console.warn('Backend not available for batch operations, using mock calculation:', error)
+    return operations.map(({ operation, operand1, operand2 }, index) => ({
+      index,
+      ...getMockOperation(operation, operand1, operand2)
+    }))
   }
 }
 
@@ -227,6 +312,129 @@ export const generatePracticeProblems = async (
   }
 }
 
+// Practice problems weighted towards the facts a learner finds hardest
+export const getAdaptivePracticeProblems = async (
+  learnerId: string,
+  skillLevel: 'beginner' | 'intermediate' | 'advanced' = 'beginner',
+  operationType: 'addition' | 'subtraction' = 'addition',
+  count: number = 5
+): Promise<AdaptivePracticeProblem[]> => {
+  try {
+    const response = await api.post('/api/practice/adaptive', {
+      learner_id: learnerId,
+      skill_level: skillLevel,
+      operation_type: operationType,
+      count,
+    })
+    
+    if (response.data.success) {
+      return response.data.problems
+    }
+    throw new Error(response.data.error || 'Failed to generate adaptive practice problems')
+  } catch (error) {
+    console.warn('Adaptive practice not available, using regular practice problems:', error)
+    return generatePracticeProblems(skillLevel, operationType, count)
+  }
+}
+
+// Worksheet exports are built in the background: submit, poll, then download
+export const submitWorksheet = async (
+  sections: WorksheetSection[],
+  options: { title?: string; seed?: number } = {}
+): Promise<WorksheetJob> => {
+  const response = await api.post('/api/worksheets', { sections, ...options })
+  if (response.data.success) {
+    return response.data.job
+  }
+  throw new Error(response.data.error || 'Failed to submit worksheet')
+}
+
+export const getWorksheetJob = async (jobId: string): Promise<WorksheetJob> => {
+  const response = await api.get(`/api/worksheets/${jobId}`)
+  if (response.data.success) {
+    return response.data.job
+  }
+  throw new Error(response.data.error || 'Failed to get worksheet status')
+}
+
+// Poll until the job finishes, then fetch the worksheet
+export const exportWorksheet = async (
+  sections: WorksheetSection[],
+  options: { title?: string; seed?: number } = {},
+  pollIntervalMs: number = 500
+): Promise<Worksheet> => {
+  let job = await submitWorksheet(sections, options)
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise(resolve => setTimeout(resolve, pollIntervalMs))
+    job = await getWorksheetJob(job.id)
+  }
+  if (job.status !== 'done' || !job.download_url) {
+    throw new Error(job.error || 'Worksheet export failed')
+  }
+  
+  const response = await api.get(job.download_url)
+  return response.data
+}
+
+// Guided lessons stream each equation and its steps over one connection
+export const startLesson = async (
+  skillLevel: 'beginner' | 'intermediate' | 'advanced' = 'beginner',
+  operationType: 'addition' | 'subtraction' = 'addition',
+  count: number = 10,
+  learnerId?: string
+): Promise<LessonSession> => {
+  const response = await api.post('/api/lessons', {
+    skill_level: skillLevel,
+    operation_type: operationType,
+    count,
+    learner_id: learnerId,
+  })
+  if (response.data.success) {
+    return response.data
+  }
+  throw new Error(response.data.error || 'Failed to start lesson')
+}
+
+// Subscribe to a lesson's events; call the returned function to disconnect
+export const openLessonStream = (
+  session: LessonSession,
+  handlers: LessonHandlers,
+  pace: boolean = true
+): (() => void) => {
+  const source = new EventSource(`${API_BASE_URL}${session.events_url}${pace ? '' : '?pace=false'}`)
+  const listen = (event: string, handler?: (data: any) => void) => {
+    source.addEventListener(event, (message) => {
+      handler?.(JSON.parse((message as MessageEvent).data))
+    })
+  }
+  
+  listen('problem', handlers.onProblem)
+  listen('step', handlers.onStep)
+  listen('feedback', handlers.onFeedback)
+  listen('complete', (summary) => {
+    source.close()
+    handlers.onComplete?.(summary)
+  })
+  listen('closed', () => {
+    source.close()
+    handlers.onClosed?.()
+  })
+  return () => source.close()
+}
+
+// Feedback and the next problem also arrive on the lesson stream
+export const answerLessonProblem = async (
+  session: LessonSession,
+  answer: number,
+  responseTime?: number
+): Promise<{ correct: boolean; expected: number; status: string }> => {
+  const response = await api.post(session.answers_url, { answer, response_time: responseTime })
+  if (response.data.success) {
+    return response.data
+  }
+  throw new Error(response.data.error || 'Failed to submit answer')
+}
+
 // Error handling utility
 export const isApiError = (error: any): boolean => {
   return error.response && error.response.data && !error.response.data.success
@@ -23,6 +23,50 @@ export interface CompoundShape {
   description: string
 }
 
+// Compact shape format: compounds reference base shapes by id instead of embedding them
+export interface ShapeRef {
+  shape_ref: number
+}
+
+export interface CompactCompoundShape {
+  type: 'compound'
+  components: Array<{
+    shape_ref: number
+    position: [number, number, number]
+    label: string
+  } | null>
+  color: string
+  description: string
+}
+
+export interface CompactShapeTable {
+  base_shapes: Record<number, NumberShape>
+  shapes: Record<number, ShapeRef | CompactCompoundShape>
+}
+
+// Pre-tessellated geometry for curved shapes; mesh is null for Three.js primitives
+export type LevelOfDetail = 'low' | 'medium' | 'high'
+
+export interface ShapeMesh {
+  vertices: number[]
+  normals: number[]
+  indices: number[]
+  vertex_count: number
+  index_count: number
+}
+
+export interface TessellatedShape {
+  number: number
+  lod: LevelOfDetail
+  components: Array<{
+    shape_ref: number
+    type: string
+    position: [number, number, number]
+    label: string | null
+    mesh: ShapeMesh | null
+  }>
+}
+
 export interface TransformationStep {
   step: number
   description: string
@@ -46,6 +90,28 @@ export interface MathTransformation {
   steps: TransformationStep[]
 }
 
+export type Easing = 'linear' | 'ease_in' | 'ease_out' | 'ease_in_out'
+
+export interface KeyframeOptions {
+  fps?: number
+  easing?: Easing
+}
+
+// One shape's samples: position and scale as flat xyz triples, opacity per frame
+export interface KeyframeTrack {
+  position: number[]
+  scale: number[]
+  opacity: number[]
+}
+
+export interface KeyframeTracks {
+  fps: number
+  easing: Easing
+  duration: number
+  frame_count: number
+  tracks: Record<string, KeyframeTrack>
+}
+
 export interface MathOperation {
   success: boolean
   operation: string
@@ -54,8 +120,19 @@ export interface MathOperation {
   result: number
   transformation: MathTransformation
   equation: string
+  keyframes?: KeyframeTracks
 }
 
+export interface BatchOperationRequest {
+  operation: 'addition' | 'subtraction'
+  operand1: number
+  operand2: number
+}
+
+export type BatchOperationResult =
+  | ({ index: number } & MathOperation)
+  | { index: number; success: false; error: string }
+
 export interface PracticeProblem {
   id: string
   operand1: number
@@ -65,6 +142,72 @@ export interface PracticeProblem {
   difficulty: 'easy' | 'medium' | 'hard'
 }
 
+// Adaptive practice adds the learner's estimated chance of solving the fact (0-1)
+export interface AdaptivePracticeProblem extends PracticeProblem {
+  mastery?: number
+}
+
+export interface WorksheetSection {
+  skill_level: 'beginner' | 'intermediate' | 'advanced'
+  operation_type: 'addition' | 'subtraction'
+  count: number
+}
+
+export interface WorksheetJob {
+  id: string
+  status: 'queued' | 'running' | 'done' | 'failed'
+  submitted_at: number
+  started_at: number | null
+  finished_at: number | null
+  problem_count: number | null
+  size: number | null
+  error: string | null
+  queue_wait_ms?: number
+  run_ms?: number
+  status_url: string
+  download_url?: string
+}
+
+export interface Worksheet {
+  title: string
+  created_at: number
+  sections: Array<WorksheetSection & { problems: PracticeProblem[] }>
+  shapes: Record<string, NumberShape | CompoundShape>
+}
+
+export interface LessonSession {
+  session_id: string
+  total: number
+  events_url: string
+  answers_url: string
+}
+
+export interface LessonProblemEvent {
+  index: number
+  total: number
+  problem: PracticeProblem
+  step_count: number
+}
+
+export interface LessonStepEvent extends TransformationStep {
+  index: number
+}
+
+export interface LessonFeedback {
+  index: number
+  answer: number
+  correct: boolean
+  expected: number
+}
+
+export interface LessonHandlers {
+  onProblem?: (event: LessonProblemEvent) => void
+  onStep?: (event: LessonStepEvent) => void
+  onFeedback?: (event: LessonFeedback) => void
+  onComplete?: (summary: { correct: number; total: number }) => void
+  onClosed?: () => void
+}
+
 export interface APIResponse<T> {
   success: boolean
   data?: T